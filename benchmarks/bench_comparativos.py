@@ -0,0 +1,106 @@
+# ================================================================
+# bench_comparativos.py – Top N + "Demais municípios" × abordagem antiga (BLOCO 7)
+# ================================================================
+# Uso:  python benchmarks/bench_comparativos.py [--n 78 780 5570 55700]
+#
+# Para cada tamanho de base, mede tempo e tamanho do JSON das figuras:
+# - antiga: sort_values completo + head(N) + melt + barras para todos os N
+# - nova:   top_n_com_demais (seleção parcial) + figuras limitadas
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fundeb_graficos import (  # noqa: E402
+    MAX_MUNICIPIOS_GRAFICO,
+    figura_composicao,
+    figura_estrutura_percentual,
+    tamanho_payload,
+    top_n_com_demais,
+)
+
+
+def base_aleatoria(n, semente=0):
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        "MUNICÍPIO": [f"MUNICIPIO {i:05d}" for i in range(n)],
+        "Fundeb_Base": rng.lognormal(17, 1, n),
+        "Compl_VAAT": np.where(rng.random(n) < 0.4, rng.lognormal(15, 1, n), 0.0),
+        "Compl_VAAR": np.where(rng.random(n) < 0.6, rng.lognormal(13, 1, n), 0.0),
+        "ICMS_Educacional": rng.lognormal(14, 1, n),
+    })
+    df["Complementacoes"] = df["Compl_VAAT"] + df["Compl_VAAR"]
+    df["Total_Receitas_Chave"] = df["Fundeb_Base"] + df["Complementacoes"] + df["ICMS_Educacional"]
+    return df
+
+
+def abordagem_antiga(df, qtd):
+    df_top = df.sort_values("Total_Receitas_Chave", ascending=False).head(qtd)
+
+    fig_bar = go.Figure()
+    for col in ["Fundeb_Base", "Compl_VAAT", "Compl_VAAR", "ICMS_Educacional"]:
+        fig_bar.add_trace(go.Bar(y=df_top["MUNICÍPIO"], x=df_top[col], orientation="h"))
+    fig_bar.update_layout(barmode="stack", height=max(400, 20 * len(df_top)))
+
+    df_dep = df_top.copy()
+    df_dep["Total_Recursos"] = df_dep[["Fundeb_Base", "Compl_VAAT", "Compl_VAAR", "ICMS_Educacional"]].sum(axis=1)
+    for col in ["Fundeb_Base", "Compl_VAAT", "Compl_VAAR", "ICMS_Educacional"]:
+        df_dep[f"perc_{col}"] = df_dep[col] / df_dep["Total_Recursos"]
+    df_long = df_dep.melt(
+        id_vars=["MUNICÍPIO"],
+        value_vars=[c for c in df_dep.columns if c.startswith("perc_")],
+        var_name="Fonte",
+        value_name="Percentual",
+    )
+    fig_stack = px.bar(df_long, y="MUNICÍPIO", x="Percentual", color="Fonte", orientation="h")
+    fig_stack.update_layout(height=max(500, 25 * len(df_dep)))
+    return fig_bar, fig_stack
+
+
+def abordagem_nova(df, qtd):
+    df_top = top_n_com_demais(
+        df,
+        "Total_Receitas_Chave",
+        min(qtd, MAX_MUNICIPIOS_GRAFICO),
+        ["Fundeb_Base", "Complementacoes", "Compl_VAAT", "Compl_VAAR",
+         "ICMS_Educacional", "Total_Receitas_Chave"],
+    )
+    return figura_composicao(df_top, "", "benchmark"), figura_estrutura_percentual(df_top)
+
+
+def medir(func, df, qtd, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        figs = func(df, qtd)
+        bytes_json = sum(tamanho_payload(f) for f in figs)
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos), bytes_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do BLOCO 7 (Comparativos) por tamanho de base")
+    parser.add_argument("--n", type=int, nargs="+", default=[78, 780, 5570, 55700],
+                        help="tamanhos da base (nº de municípios)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'N':>7} {'exibidos':>9} | {'antiga (s)':>10} {'JSON (KB)':>10} | {'nova (s)':>9} {'JSON (KB)':>10}")
+    for n in args.n:
+        df = base_aleatoria(n)
+        # pior caso do slider antigo: todos os municípios
+        t_ant, b_ant = medir(abordagem_antiga, df, n, args.repeticoes)
+        t_nov, b_nov = medir(abordagem_nova, df, n, args.repeticoes)
+        print(f"{n:>7} {min(n, MAX_MUNICIPIOS_GRAFICO):>9} | "
+              f"{t_ant:>10.3f} {b_ant / 1024:>10.0f} | {t_nov:>9.3f} {b_nov / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# ================================================================
+# bench_etapas.py – Tempo e memória de cada etapa do painel, por escala
+# ================================================================
+# Uso:
+#   python benchmarks/gerar_dados_sinteticos.py        # gera benchmarks/dados/escala_*x
+#   python benchmarks/bench_etapas.py                  # 1x, 10x e 100x
+#   python benchmarks/bench_etapas.py --escalas 1 10 --etapas carregar_dados validar_base
+#
+# Cada etapa é cronometrada (melhor de N repetições) e depois executada
+# mais uma vez sob tracemalloc para medir o pico de memória alocada.
+# Os resultados são acrescentados, com a versão do código (git), ao
+# arquivo --historico (JSON Lines), e a saída compara cada etapa com a
+# medição mais recente de outra versão – para acompanhar a evolução.
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import plotly.express as px
+
+PASTA_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_REPO)
+
+from fundeb_dados import (  # noqa: E402
+    agregados_ano,
+    estatisticas_complementacao,
+    evolucao_anual,
+    filtrar_anos_analise,
+    formatar_reais,
+    ler_base,
+    ler_mapa,
+    ler_repasses,
+    regras_alerta,
+    serie_municipio,
+    tabela_variacoes,
+    tabela_variacoes_exibicao,
+    validar_base,
+)
+from fundeb_graficos import (  # noqa: E402
+    figura_composicao,
+    figura_estrutura_percentual,
+    figura_repasses,
+    tamanho_payload,
+    top_n_com_demais,
+)
+
+PASTA_DADOS = os.path.join(PASTA_REPO, "benchmarks", "dados")
+HISTORICO = os.path.join(PASTA_REPO, "benchmarks", "historico_etapas.jsonl")
+
+
+def versao_codigo():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=PASTA_REPO,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def etapas(pasta):
+    """
+    Lista ordenada de (nome, função) com as etapas do painel. O estado
+    produzido por uma etapa (ex.: a base carregada) alimenta as seguintes.
+    """
+    estado = {}
+    caminho = os.path.join(pasta, "loa.xlsx")
+    caminho_geo = os.path.join(pasta, "es_municipios.geojson")
+
+    def carregar_dados():
+        df, perdas = ler_base(caminho)
+        estado["perdas"] = perdas
+        estado["df"] = filtrar_anos_analise(df)
+        estado["ano"] = int(estado["df"]["ANO"].max())
+        estado["df_ano"] = estado["df"][estado["df"]["ANO"] == estado["ano"]]
+        estado["municipio"] = str(estado["df_ano"]["MUNICÍPIO"].iloc[0])
+
+    def carregar_mapa():
+        estado["mapa"] = ler_mapa(caminho_geo)
+
+    def validar():
+        codigos = {str(f["properties"]["CD_MUN"]) for f in estado["mapa"]["features"]}
+        validar_base(estado["df"], estado["perdas"], codigos)
+
+    def visao_geral():
+        agregados_ano(estado["df_ano"])
+        evolucao_anual(estado["df"])
+
+    def diagnostico():
+        tabela_variacoes_exibicao(tabela_variacoes(serie_municipio(estado["df"], estado["municipio"])))
+
+    def complementacoes():
+        for coluna in ["Compl_VAAT", "Compl_VAAR"]:
+            estatisticas_complementacao(estado["df_ano"], coluna, estado["municipio"])
+            estado["df_ano"][coluna].to_numpy().argsort(kind="stable")
+
+    def comparativos():
+        df_base = estado["df_ano"].copy()
+        df_base["Complementacoes"] = df_base["Compl_VAAF"] + df_base["Compl_VAAT"] + df_base["Compl_VAAR"]
+        df_base["Total_Receitas_Chave"] = df_base["Fundeb_Total"] + df_base["ICMS_Educacional"]
+        df_top = top_n_com_demais(
+            df_base, "Total_Receitas_Chave", 20,
+            ["Fundeb_Base", "Complementacoes", "Compl_VAAT", "Compl_VAAR",
+             "ICMS_Educacional", "Total_Receitas_Chave"],
+        )
+        tamanho_payload(figura_composicao(df_top, estado["municipio"], "benchmark"))
+        tamanho_payload(figura_estrutura_percentual(df_top))
+
+    def insights():
+        regras_alerta(estado["df"], estado["df_ano"], estado["ano"])
+
+    def formatacao():
+        for coluna in ["Fundeb_Base", "Compl_VAAT", "Compl_VAAR", "ICMS_Educacional"]:
+            estado["df_ano"][coluna].map(formatar_reais)
+
+    def repasses_mensais():
+        caminho_rep = os.path.join(pasta, "repasses_mensais.csv")
+        if not os.path.exists(caminho_rep):
+            return
+        rep = ler_repasses(caminho_rep)
+        codigos = rep["Código IBGE"].drop_duplicates().head(100)
+        sel = rep[rep["Código IBGE"].isin(codigos) & (rep["Transferência"] == "Fundeb")]
+        sel = sel.assign(MUNICÍPIO=sel["Código IBGE"].astype(str))
+        tamanho_payload(figura_repasses(sel, "Fundeb")[0])
+
+    def mapa_coropletico():
+        df_mapa = estado["df_ano"].copy()
+        fig = px.choropleth(
+            df_mapa,
+            geojson=estado["mapa"],
+            locations="Codigo_IBGE_str",
+            featureidkey="properties.CD_MUN",
+            color="Fundeb_Total",
+            hover_name="MUNICÍPIO",
+        )
+        tamanho_payload(fig)
+
+    return [
+        ("carregar_dados", carregar_dados),
+        ("carregar_mapa", carregar_mapa),
+        ("validar_base", validar),
+        ("visao_geral", visao_geral),
+        ("diagnostico", diagnostico),
+        ("complementacoes", complementacoes),
+        ("comparativos", comparativos),
+        ("insights", insights),
+        ("formatar_reais", formatacao),
+        ("repasses_mensais", repasses_mensais),
+        ("mapa_coropletico", mapa_coropletico),
+    ]
+
+
+def medir(func, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    func()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico
+
+
+def ultima_medicao_anterior(historico, versao):
+    """{(escala, etapa): registro} da medição mais recente de outra versão."""
+    anteriores = {}
+    if not os.path.exists(historico):
+        return anteriores
+    with open(historico, encoding="utf-8") as f:
+        for linha in f:
+            reg = json.loads(linha)
+            if reg["versao"] != versao:
+                anteriores[(reg["escala"], reg["etapa"])] = reg
+    return anteriores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de cada etapa do painel Fundeb por escala.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--dados", default=PASTA_DADOS, help="pasta com escala_<k>x/")
+    parser.add_argument("--etapas", nargs="*", help="executa só estas etapas (e as que as alimentam)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--historico", default=HISTORICO, help="arquivo JSON Lines de resultados")
+    args = parser.parse_args()
+
+    versao = versao_codigo()
+    anteriores = ultima_medicao_anterior(args.historico, versao)
+    registros = []
+    agora = datetime.datetime.now().isoformat(timespec="seconds")
+
+    print(f"versão {versao}")
+    print(f"{'escala':>6} {'etapa':<18} {'tempo (s)':>10} {'pico (MB)':>10} {'vs. anterior':>13}")
+    for escala in args.escalas:
+        pasta = os.path.join(args.dados, f"escala_{escala}x")
+        if not os.path.exists(pasta):
+            print(f"{escala:>5}x  pasta {pasta} não encontrada – rode gerar_dados_sinteticos.py")
+            continue
+
+        for nome, func in etapas(pasta):
+            # etapas de carga sempre rodam: alimentam as demais
+            if args.etapas and nome not in args.etapas and nome not in ("carregar_dados", "carregar_mapa"):
+                continue
+            tempo, pico = medir(func, args.repeticoes)
+
+            ref = anteriores.get((escala, nome))
+            comparacao = f"{tempo / ref['tempo_s']:>12.2f}x" if ref and ref["tempo_s"] > 0 else f"{'-':>13}"
+            print(f"{escala:>5}x {nome:<18} {tempo:>10.4f} {pico / 1e6:>10.1f} {comparacao}")
+
+            registros.append({
+                "data": agora, "versao": versao, "escala": escala,
+                "etapa": nome, "tempo_s": tempo, "pico_bytes": pico,
+            })
+
+    if registros:
+        with open(args.historico, "a", encoding="utf-8") as f:
+            for reg in registros:
+                f.write(json.dumps(reg, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# ================================================================
+# bench_tabelas.py – Tabelas em texto formatado × números + column_config
+# ================================================================
+# Uso:  python benchmarks/bench_tabelas.py [--n 78 780 5570 55700]
+#
+# Para a tabela do Comparativos (município + 4 colunas em R$), mede o
+# tempo no servidor e o tamanho do payload Arrow enviado ao navegador:
+# - antiga: cada célula vira texto com formatar_reais
+# - nova:   colunas float64; o formato (coluna_reais do fundeb.py) é
+#           aplicado no navegador e não entra no payload
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fundeb_dados import formatar_reais  # noqa: E402
+
+COLUNAS_REAIS = ["Fundeb base", "Complementações", "ICMS Educacional", "Total (Fundeb + ICMS Educ.)"]
+
+
+def tabela_aleatoria(n, semente=0):
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({"Município": [f"MUNICIPIO {i:05d}" for i in range(n)]})
+    for c in COLUNAS_REAIS:
+        df[c] = rng.lognormal(16, 1.2, n).round(2)
+    return df
+
+
+def abordagem_antiga(df):
+    exib = df.copy()
+    for c in COLUNAS_REAIS:
+        exib[c] = exib[c].map(formatar_reais)
+    return convert_pandas_df_to_arrow_bytes(exib)
+
+
+def abordagem_nova(df):
+    return convert_pandas_df_to_arrow_bytes(df)
+
+
+def medir(func, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        payload = func(df)
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload e custo de formatação das tabelas")
+    parser.add_argument("--n", type=int, nargs="+", default=[78, 780, 5570, 55700],
+                        help="nº de linhas (municípios) da tabela")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'N':>7} | {'texto (s)':>9} {'Arrow (KB)':>10} | {'números (s)':>11} {'Arrow (KB)':>10}")
+    for n in args.n:
+        df = tabela_aleatoria(n)
+        t_ant, b_ant = medir(abordagem_antiga, df, args.repeticoes)
+        t_nov, b_nov = medir(abordagem_nova, df, args.repeticoes)
+        print(f"{n:>7} | {t_ant:>9.3f} {b_ant / 1024:>10.0f} | {t_nov:>11.3f} {b_nov / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# ================================================================
+# gerar_dados_sinteticos.py – Planilhas e mapas sintéticos em escala
+# ================================================================
+# Uso:
+#   python benchmarks/gerar_dados_sinteticos.py                 # 1x, 10x e 100x
+#   python benchmarks/gerar_dados_sinteticos.py --escalas 10 --anos 2020 2025
+#
+# Gera, para cada escala k, a pasta <saida>/escala_<k>x com:
+# - loa.xlsx: abas "Planilha1" e "Habilitação VAAT 2026" com os mesmos
+#   nomes de coluna da planilha real e os mesmos formatos de célula
+#   ("-" para ausentes, "R$ 5.664,21" no VAAT mínimo, números como texto)
+# - es_municipios.geojson: um polígono por município (propriedade CD_MUN),
+#   em malha com fronteiras compartilhadas e bordas irregulares
+# - repasses_mensais.csv: repasses decendiais (ou mensais) de Fundeb,
+#   complementações e ICMS cota-parte que somam os valores anuais da
+#   planilha (--repasses nenhum para não gerar)
+# - indices_icms.csv: notas dos municípios nos componentes do índice do
+#   ICMS Educacional, por ano (simulador de pesos)
+# - despesas_siope.csv: extrato das despesas declaradas ao SIOPE, com
+#   parte dos municípios abaixo dos mínimos legais (conformidade fiscal)
+# - censo_escolar/matriculas_<ano>.csv (com --censo N): microdados de
+#   matrícula no leiaute do INEP (uma linha por matrícula, separador ";",
+#   latin-1), em média N matrículas por município e ano
+#
+# 1x = 78 municípios (como o ES); 100x = 7.800 municípios.
+# As distribuições foram calibradas na planilha real do ES.
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MUNICIPIOS_POR_ESCALA = 78
+
+# Códigos de UF do IBGE (municípios distribuídos entre eles nas escalas maiores)
+UFS = [32, 31, 33, 35, 29, 41, 42, 43, 52, 51, 50, 53, 21, 22, 23, 24, 25, 26, 27, 28,
+       11, 12, 13, 14, 15, 16, 17]
+
+PREFIXOS = ["SAO", "SANTA", "NOVA", "BOA", "AGUA", "ALTO", "BARRA DE", "CONCEICAO DO",
+            "PEDRA", "RIO", "SERRA", "VILA", "PORTO", "CAMPO", "MONTE", "BOM JESUS DO"]
+RADICAIS = ["ESPERANCA", "VISTA", "TERESA", "LEOPOLDINA", "JETIBA", "DOCE", "AZUL",
+            "BRANCA", "MARIA", "PRETO", "CASTELO", "IBIRACU", "MUCURICI", "ITARANA",
+            "LINHARES", "GUACUI", "VENDA", "ALEGRE", "ICONHA", "PANCAS"]
+
+VAAT_MINIMO_POR_ANO = {2021: 4846.26, 2022: 5664.21, 2023: 8031.01, 2024: 8196.52, 2025: 8481.21}
+
+COL_COEF_VAAR = "Coeficientes de distribuição da complementação da\nUnião-VAAR"
+COL_VERIFICACAO = "Veficação  § 4º do art. 13 da  Lei nº 14.113/20"
+
+
+def nomes_municipios(codigos, rng):
+    """
+    Nomes únicos dentro de cada UF e repetidos entre UFs, como no país
+    (~240 nomes em mais de um estado): as escalas maiores exercitam os
+    homônimos na busca, nas seções e nos relatórios.
+    """
+    combinacoes = np.array([f"{p} {r}" for p in PREFIXOS for r in RADICAIS])
+    nomes = np.empty(len(codigos), dtype=object)
+    uf = np.asarray(codigos) // 100000
+    for u in np.unique(uf):
+        idx = np.flatnonzero(uf == u)
+        escolhidos = rng.choice(combinacoes, size=min(len(idx), len(combinacoes)), replace=False)
+        for k, i in enumerate(idx):
+            # acima das combinações disponíveis, os restantes ganham um sufixo
+            nomes[i] = escolhidos[k] if k < len(escolhidos) else f"{escolhidos[k % len(escolhidos)]} {k:04d}"
+    return nomes.tolist()
+
+
+def codigos_ibge(n):
+    uf = np.array([UFS[i % len(UFS)] for i in range(n)]) if n > MUNICIPIOS_POR_ESCALA else np.full(n, 32)
+    seq = np.zeros(n, dtype=int)
+    for u in np.unique(uf):
+        idx = np.flatnonzero(uf == u)
+        seq[idx] = np.arange(len(idx)) + 1
+    dv = (seq * 7 + uf) % 10
+    return uf * 100000 + seq * 10 + dv
+
+
+def _br(valor):
+    """Número no formato brasileiro com prefixo R$ (ex.: R$ 5.664,21)."""
+    return "R$ " + f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _com_tracos(valores):
+    """Converte para object, com "-" no lugar de NaN (como na planilha real)."""
+    return pd.Series(valores, dtype="object").where(~pd.isna(valores), "-")
+
+
+def gerar_planilha(n_municipios, anos, rng):
+    codigos = codigos_ibge(n_municipios)
+    nomes = nomes_municipios(codigos, rng)
+
+    # "porte" do município escala todas as receitas e despesas
+    porte = rng.lognormal(18.2, 0.55, n_municipios)
+    vaat_base = rng.lognormal(8.6, 0.22, n_municipios)
+    coef_vaar = rng.dirichlet(np.ones(n_municipios)) * (rng.random(n_municipios) < 0.6)
+
+    linhas = []
+    for k, ano in enumerate(anos):
+        crescimento = 1.06 ** k
+        ruido = lambda s=0.05: rng.lognormal(0, s, n_municipios)  # noqa: E731
+
+        orcamento = porte * crescimento * ruido()
+        fundeb_est = 0.20 * orcamento * ruido()
+        fundeb_real = fundeb_est * ruido(0.08)
+        icms_est = 0.25 * orcamento * ruido()
+        icms_real = icms_est * ruido(0.08)
+        icms_educ = np.where(rng.random(n_municipios) < 0.2, 0.1 * icms_real, 0.0)
+
+        vaat_min = VAAT_MINIMO_POR_ANO.get(ano)
+        vaat_antes = vaat_base * crescimento * ruido(0.03)
+        if vaat_min is None:
+            vaat_antes = np.full(n_municipios, np.nan)
+            compl_vaat = np.full(n_municipios, np.nan)
+            vaat_com = np.full(n_municipios, np.nan)
+        else:
+            matriculas = fundeb_real / vaat_antes
+            compl_vaat = np.where(vaat_antes < vaat_min, (vaat_min - vaat_antes) * matriculas, np.nan)
+            vaat_com = np.maximum(vaat_antes, vaat_min)
+
+        recebe_vaar = ano >= 2023
+        coef = np.where(recebe_vaar & (coef_vaar > 0), coef_vaar, np.nan)
+        compl_vaar = coef * 2.0e9 * (n_municipios / MUNICIPIOS_POR_ESCALA) * 0.05
+
+        realizado = ano >= 2021
+        habilitado = rng.choice(
+            ["Habilitado para o cálculo do VAAT.",
+             "Inabilitado. Inobservância do art. 38 da Lei nº 14.113/20.", "-"],
+            size=n_municipios, p=[0.95, 0.04, 0.01],
+        )
+
+        linhas.append(pd.DataFrame({
+            "Código IBGE": codigos,
+            "MUNICÍPIO": nomes,
+            "ANO": ano,
+            # orçamento e despesa costumam vir incompletos na fonte
+            "Orçamento": np.where(rng.random(n_municipios) < 0.5, orcamento.round(0), np.nan),
+            "Despesa Educação": np.where(rng.random(n_municipios) < 0.5, (0.3 * orcamento * ruido()).round(0), np.nan),
+            "Receita Cota-parte ICMS Estimada": icms_est.round(0),
+            "Receita Fundeb Estimada": fundeb_est.round(0),
+            "Cota-parte ICMS Realizada": _com_tracos(np.where(realizado, icms_real.round(2), np.nan)),
+            "ICMS Educacional": icms_educ.round(2),
+            "Receita total do Fundeb Realizada": _com_tracos(np.where(realizado, fundeb_real.round(2), np.nan)),
+            "VAAF": 0,
+            "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)": _com_tracos(vaat_antes.round(2)),
+            "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)": _com_tracos(vaat_com.round(2)),
+            "Complementação da União-VAAT (art. 16, VI) (R$)": _com_tracos(compl_vaat.round(2)),
+            COL_COEF_VAAR: _com_tracos(coef),
+            "Complementação da União-VAAR (R$)": _com_tracos(compl_vaar.round(2)),
+            "Habilitado ao VAAT?": np.where(realizado, habilitado, None),
+            "VAAT Mínimo Brasil": _br(vaat_min) if vaat_min is not None else None,
+        }))
+
+    planilha = pd.concat(linhas, ignore_index=True).sort_values(["Código IBGE", "ANO"])
+
+    habilitacao = pd.DataFrame({
+        "UF": "ES",
+        "Ente Federado": [n.title() for n in nomes],
+        "Código IBGE": codigos,
+        COL_VERIFICACAO: "Habilitado para o cálculo do VAAT.",
+        "Pendência identificada": np.nan,
+    })
+    return planilha, habilitacao
+
+
+# coluna da planilha -> transferência no arquivo de repasses
+COLUNAS_REPASSES = {
+    "Receita total do Fundeb Realizada": "Fundeb",
+    "Complementação da União-VAAT (art. 16, VI) (R$)": "Complementação VAAT",
+    "Complementação da União-VAAR (R$)": "Complementação VAAR",
+    "Cota-parte ICMS Realizada": "ICMS cota-parte",
+}
+
+DIAS_REPASSE = {"decendial": [10, 20, 28], "mensal": [28]}
+
+
+def gerar_repasses(planilha, rng, frequencia="decendial"):
+    """
+    Divide o valor anual de cada transferência em repasses mensais ou
+    decendiais, com sazonalidade e ruído, mantendo a soma do ano.
+    """
+    dias = DIAS_REPASSE[frequencia]
+    n_por_ano = 12 * len(dias)
+    meses = np.repeat(np.arange(1, 13), len(dias))
+    sazonal = 1 + 0.15 * np.sin(2 * np.pi * (meses - 1) / 12)
+
+    partes = []
+    for coluna, transferencia in COLUNAS_REPASSES.items():
+        anual = pd.to_numeric(planilha[coluna], errors="coerce").to_numpy()
+        ok = np.flatnonzero(anual > 0)
+        pesos = sazonal * rng.lognormal(0, 0.15, (len(ok), n_por_ano))
+        valores = anual[ok, None] * pesos / pesos.sum(axis=1, keepdims=True)
+
+        anos = planilha["ANO"].to_numpy()[ok]
+        datas = pd.to_datetime({
+            "year": np.repeat(anos, n_por_ano),
+            "month": np.tile(meses, len(ok)),
+            "day": np.tile(np.tile(dias, 12), len(ok)),
+        })
+        partes.append(pd.DataFrame({
+            "Código IBGE": np.repeat(planilha["Código IBGE"].to_numpy()[ok], n_por_ano),
+            "Data": datas.dt.strftime("%Y-%m-%d"),
+            "Transferência": transferencia,
+            "Valor": valores.ravel().round(2),
+        }))
+    return pd.concat(partes, ignore_index=True)
+
+
+# TP_ETAPA_ENSINO -> probabilidade (creche, pré, anos iniciais, finais, médio, EJA, outras)
+ETAPAS_SINTETICAS = {1: 0.10, 2: 0.10, 14: 0.08, 15: 0.08, 16: 0.08, 17: 0.08, 18: 0.08,
+                     19: 0.08, 20: 0.07, 21: 0.07, 41: 0.06, 25: 0.03, 69: 0.04, 39: 0.01}
+
+
+def gerar_censo(planilha, rng, media_por_municipio, pasta):
+    """
+    Um CSV de microdados de matrícula por ano do Censo (ano da planilha
+    - 1), com colunas extras que o painel não lê (testam a projeção).
+    """
+    os.makedirs(pasta, exist_ok=True)
+    codigos = planilha["Código IBGE"].unique()
+    etapas = np.array(list(ETAPAS_SINTETICAS))
+    probs = np.array(list(ETAPAS_SINTETICAS.values()))
+    probs = probs / probs.sum()
+    arquivos = []
+    for ano in sorted(planilha["ANO"].unique() - 1):
+        n_mun = rng.poisson(media_por_municipio * rng.lognormal(0, 0.8, len(codigos)) / np.exp(0.32))
+        n = int(n_mun.sum())
+        df = pd.DataFrame({
+            "NU_ANO_CENSO": np.full(n, ano),
+            "ID_MATRICULA": np.arange(n) + 10**8,
+            "NU_IDADE": rng.integers(0, 70, n),
+            "TP_SEXO": rng.integers(1, 3, n),
+            "TP_ETAPA_ENSINO": rng.choice(etapas, n, p=probs),
+            "CO_MUNICIPIO": np.repeat(codigos, n_mun),
+            "TP_DEPENDENCIA": rng.choice([2, 3, 4], n, p=[0.3, 0.6, 0.1]),
+        })
+        caminho = os.path.join(pasta, f"matriculas_{ano}.csv")
+        df.to_csv(caminho, sep=";", index=False, encoding="latin-1")
+        arquivos.append(caminho)
+    return arquivos
+
+
+COMPONENTES_ICMS_SINTETICOS = ["Aprendizagem", "Fluxo", "Atendimento"]
+
+
+def gerar_indices_icms(planilha, rng):
+    """
+    Notas (0 a 1) de cada município nos COMPONENTES_ICMS_SINTETICOS, por
+    ano, correlacionadas com a participação do município no ICMS
+    Educacional do ano (o simulador parte de valores plausíveis).
+    """
+    df = planilha[["Código IBGE", "ANO"]].copy()
+    educ = pd.to_numeric(planilha["ICMS Educacional"], errors="coerce").fillna(0)
+    participacao = educ / educ.groupby(planilha["ANO"]).transform("sum").replace(0, np.nan)
+    base = participacao.rank(pct=True).fillna(0.5).to_numpy()
+    for componente in COMPONENTES_ICMS_SINTETICOS:
+        nota = 0.6 * base + 0.4 * rng.uniform(0, 1, len(df))
+        df[componente] = np.clip(nota, 0, 1).round(3)
+    return df
+
+# coluna do extrato -> (média, desvio) da razão sobre a receita de referência
+RAZOES_SIOPE = {
+    "Despesa MDE": (0.27, 0.02),
+    "Fundeb remuneração": (0.76, 0.05),
+    "Fundeb não aplicado": (0.05, 0.03),
+    "VAAT educação infantil": (0.56, 0.06),
+    "VAAT capital": (0.18, 0.03),
+}
+
+
+def gerar_despesas_siope(planilha, rng):
+    """
+    Extrato do SIOPE dos anos realizados: cada despesa é uma razão sorteada
+    (RAZOES_SIOPE) da sua receita de referência, de modo que alguns
+    municípios fiquem abaixo (ou acima, no saldo não aplicado) do limite.
+    """
+    fundeb = pd.to_numeric(planilha["Receita total do Fundeb Realizada"], errors="coerce")
+    vaat = pd.to_numeric(planilha["Complementação da União-VAAT (art. 16, VI) (R$)"], errors="coerce").fillna(0)
+    vaar = pd.to_numeric(planilha["Complementação da União-VAAR (R$)"], errors="coerce").fillna(0)
+    icms = pd.to_numeric(planilha["Cota-parte ICMS Realizada"], errors="coerce")
+    ok = (fundeb > 0).to_numpy()
+
+    n = int(ok.sum())
+    receitas = {
+        "Despesa MDE": (icms / 0.45)[ok].to_numpy(),
+        "Fundeb remuneração": (fundeb + vaat)[ok].to_numpy(),
+        "Fundeb não aplicado": (fundeb + vaat + vaar)[ok].to_numpy(),
+        "VAAT educação infantil": vaat[ok].to_numpy(),
+        "VAAT capital": vaat[ok].to_numpy(),
+    }
+    df = pd.DataFrame({
+        "Código IBGE": planilha["Código IBGE"].to_numpy()[ok],
+        "ANO": planilha["ANO"].to_numpy()[ok],
+        "Receita de impostos": receitas["Despesa MDE"].round(2),
+    })
+    for coluna, (media, desvio) in RAZOES_SIOPE.items():
+        razao = np.clip(rng.normal(media, desvio, n), 0, None)
+        df[coluna] = (razao * receitas[coluna]).round(2)
+    return df
+
+
+def gerar_geojson(codigos, rng, subdivisoes=8, lon0=-41.5, lat0=-21.5, passo=0.25):
+    """
+    Malha de polígonos com fronteiras compartilhadas: cada lado da célula
+    é subdividido em `subdivisoes` segmentos, com vértices deslocados
+    aleatoriamente (o mesmo vértice vale para as duas células vizinhas).
+    """
+    n = len(codigos)
+    lado = int(np.ceil(np.sqrt(n)))
+    pontos = lado * subdivisoes + 1
+    fino = passo / subdivisoes
+    jx = rng.uniform(-0.3, 0.3, (pontos, pontos)) * fino
+    jy = rng.uniform(-0.3, 0.3, (pontos, pontos)) * fino
+
+    def vertice(gx, gy):
+        return [round(lon0 + gx * fino + jx[gx, gy], 6), round(lat0 + gy * fino + jy[gx, gy], 6)]
+
+    features = []
+    for i, codigo in enumerate(codigos):
+        cx, cy = (i % lado) * subdivisoes, (i // lado) * subdivisoes
+        s = subdivisoes
+        anel = (
+            [vertice(cx + t, cy) for t in range(s)] +
+            [vertice(cx + s, cy + t) for t in range(s)] +
+            [vertice(cx + s - t, cy + s) for t in range(s)] +
+            [vertice(cx, cy + s - t) for t in range(s)]
+        )
+        anel.append(anel[0])
+        features.append({
+            "type": "Feature",
+            "properties": {"CD_MUN": str(codigo)},
+            "geometry": {"type": "Polygon", "coordinates": [anel]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def gerar_escala(escala, anos, pasta_saida, semente, repasses="decendial", censo=0):
+    rng = np.random.default_rng(semente + escala)
+    n = MUNICIPIOS_POR_ESCALA * escala
+
+    planilha, habilitacao = gerar_planilha(n, anos, rng)
+    geojson = gerar_geojson(planilha["Código IBGE"].unique(), rng)
+
+    pasta = os.path.join(pasta_saida, f"escala_{escala}x")
+    os.makedirs(pasta, exist_ok=True)
+    with pd.ExcelWriter(os.path.join(pasta, "loa.xlsx")) as writer:
+        planilha.to_excel(writer, sheet_name="Planilha1", index=False)
+        habilitacao.to_excel(writer, sheet_name="Habilitação VAAT 2026", index=False)
+    with open(os.path.join(pasta, "es_municipios.geojson"), "w", encoding="utf-8") as f:
+        json.dump(geojson, f)
+    if repasses != "nenhum":
+        gerar_repasses(planilha, rng, repasses).to_csv(
+            os.path.join(pasta, "repasses_mensais.csv"), sep=";", decimal=",", index=False
+        )
+    gerar_indices_icms(planilha, rng).to_csv(
+        os.path.join(pasta, "indices_icms.csv"), sep=";", decimal=",", index=False
+    )
+    gerar_despesas_siope(planilha, rng).to_csv(
+        os.path.join(pasta, "despesas_siope.csv"), sep=";", decimal=",", index=False
+    )
+    if censo > 0:
+        gerar_censo(planilha, rng, censo, os.path.join(pasta, "censo_escolar"))
+
+    return pasta, len(planilha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera planilhas e mapas sintéticos em escala.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--anos", type=int, nargs=2, default=[2020, 2025], metavar=("INICIO", "FIM"))
+    parser.add_argument("--saida", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados"))
+    parser.add_argument("--semente", type=int, default=2024)
+    parser.add_argument("--repasses", choices=["decendial", "mensal", "nenhum"], default="decendial",
+                        help="frequência do arquivo de repasses")
+    parser.add_argument("--censo", type=int, default=0, metavar="N",
+                        help="gera microdados do Censo com ~N matrículas por município e ano (0 = não gera)")
+    args = parser.parse_args()
+
+    anos = list(range(args.anos[0], args.anos[1] + 1))
+    for escala in args.escalas:
+        pasta, n_linhas = gerar_escala(escala, anos, args.saida, args.semente, args.repasses, args.censo)
+        print(f"{escala:>4}x: {n_linhas} linhas ({MUNICIPIOS_POR_ESCALA * escala} municípios) em {pasta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# ================================================================
+# orcamento_importacao.py – Verifica o custo de importação do painel
+# ================================================================
+# Uso:
+#   python benchmarks/orcamento_importacao.py
+#   python benchmarks/orcamento_importacao.py --orcamento-ms 1500
+#
+# O primeiro rerun do fundeb.py em um worker novo paga a importação dos
+# módulos do topo do arquivo antes de desenhar qualquer coisa. Este script
+# falha (código 1) quando:
+# - algum módulo pesado (MODULOS_ADIADOS) passa a ser importado no topo
+#   do fundeb.py, em vez de dentro da seção que o usa
+# - fundeb_dados passa a importar, direta ou indiretamente, um módulo pesado
+# - o tempo de importação dos módulos do topo excede o orçamento
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+PASTA_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARQUIVO_APP = os.path.join(PASTA_REPO, "fundeb.py")
+
+# Módulos que só podem ser importados dentro das seções que os usam
+MODULOS_ADIADOS = ["plotly", "fundeb_graficos"]
+
+# Módulos que não podem ser carregados, nem indiretamente, pelos imports do
+# topo (o streamlit já traz o núcleo do plotly; o plotly.express não)
+MODULOS_PESADOS = ["plotly.express", "fundeb_graficos"]
+
+ORCAMENTO_MS = 2000
+
+
+def importacoes_do_topo(caminho):
+    """Módulos importados diretamente no corpo do módulo (fora de if/def)."""
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos += [a.name for a in no.names]
+        elif isinstance(no, ast.ImportFrom) and no.module:
+            modulos.append(no.module)
+    return modulos
+
+
+def eh_adiado(modulo):
+    return any(modulo == m or modulo.startswith(m + ".") for m in MODULOS_ADIADOS)
+
+
+def tempos_importacao(modulos):
+    """
+    Roda `python -X importtime` em um processo novo importando `modulos`.
+    Retorna ({módulo de topo: ms acumulados}, conjunto de todos os módulos carregados).
+    """
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=PASTA_REPO, capture_output=True, text=True, check=True,
+    ).stderr
+
+    tempos, carregados = {}, set()
+    padrao = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+    for linha in saida.splitlines():
+        m = padrao.match(linha)
+        if not m:
+            continue
+        nome = m.group(4)
+        carregados.add(nome)
+        # só entradas de nível superior: as aninhadas já estão no acumulado
+        if nome in modulos and len(m.group(3)) == 1:
+            tempos[nome] = int(m.group(2)) / 1000
+    return tempos, carregados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de importação do painel Fundeb.")
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_MS)
+    args = parser.parse_args()
+
+    falhas = []
+
+    topo = importacoes_do_topo(ARQUIVO_APP)
+    falhas += [f"fundeb.py importa '{m}' no topo do arquivo" for m in topo if eh_adiado(m)]
+
+    tempos, carregados = tempos_importacao(topo)
+    falhas += [
+        f"módulo pesado '{m}' carregado pelos imports do topo do fundeb.py"
+        for m in MODULOS_PESADOS if m in carregados
+    ]
+
+    total = sum(tempos.values())
+    print("Importações do topo do fundeb.py:")
+    for m in topo:
+        print(f"  {m:<20} {tempos.get(m, 0.0):>8.1f} ms")
+    print(f"  {'total':<20} {total:>8.1f} ms (orçamento {args.orcamento_ms:.0f} ms)")
+    if total > args.orcamento_ms:
+        falhas.append(f"importação do topo levou {total:.0f} ms > orçamento de {args.orcamento_ms:.0f} ms")
+
+    adiados, _ = tempos_importacao(["streamlit", "plotly.express", "fundeb_graficos"])
+    adiado = adiados.get("plotly.express", 0.0) + adiados.get("fundeb_graficos", 0.0)
+    print(f"Adiado para as seções com gráficos: {adiado:.1f} ms (plotly.express + fundeb_graficos)")
+
+    if falhas:
+        print("\nFALHAS:")
+        for f in falhas:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nOK: dentro do orçamento.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# ================================================================
+# teste_carga.py – Teste de carga do painel com sessões simultâneas
+# ================================================================
+# Uso:
+#   python benchmarks/teste_carga.py --sessoes 20 50 100
+#   python benchmarks/teste_carga.py --sessoes 20 --salvar linha_base.json
+#   python benchmarks/teste_carga.py --sessoes 20 --linha-base linha_base.json --tolerancia 0.25
+#
+# Cada sessão é um AppTest do Streamlit rodando o fundeb.py sem navegador.
+# As sessões de um mesmo nível rodam em threads do mesmo processo – como
+# no servidor do Streamlit – e compartilham o st.cache_data. Cada sessão
+# executa um roteiro aleatório (semente fixa) de trocas de ano, município
+# e seção. Ao final, são relatados:
+# - latência dos reruns (p50/p95/p99), geral e por seção
+# - memória residente adicional por sessão (estimada)
+# - taxa de acerto do st.cache_data, por função
+# O script termina com código 1 quando há erros ou quando o p95 de algum
+# nível piora além da tolerância em relação à linha de base.
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARQUIVO_APP = "fundeb.py"
+
+# Peso de cada tipo de interação no roteiro das sessões
+MIX_INTERACOES = {
+    "secao": 0.5,
+    "municipio": 0.3,
+    "ano": 0.2,
+}
+
+ROTULO_ANO = "Ano de análise"
+ROTULO_MUNICIPIO = "Município (para análises focadas)"
+ROTULO_BUSCA = "Buscar município (nome ou código IBGE)"
+
+
+# ---------------- Contagem de acertos do st.cache_data ----------------
+_acertos = Counter()
+_falhas = Counter()
+_trava_contagem = threading.Lock()
+
+
+def instrumentar_cache():
+    """
+    Envolve DataCache.read_result (API interna do Streamlit) para contar
+    acertos e falhas por função. Se a API mudar, a contagem é desativada.
+    """
+    try:
+        from streamlit.runtime.caching.cache_data_api import DataCache
+        from streamlit.runtime.caching.cache_errors import CacheKeyNotFoundError
+    except ImportError:
+        return False
+
+    original = DataCache.read_result
+
+    def read_result(self, value_key):
+        nome = getattr(self, "display_name", "?")
+        try:
+            resultado = original(self, value_key)
+        except CacheKeyNotFoundError:
+            with _trava_contagem:
+                _falhas[nome] += 1
+            raise
+        with _trava_contagem:
+            _acertos[nome] += 1
+        return resultado
+
+    DataCache.read_result = read_result
+    return True
+
+
+def memoria_residente():
+    """RSS atual do processo em bytes (pico, fora do Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _widget(lista, rotulo):
+    for w in lista:
+        if w.label == rotulo:
+            return w
+    raise LookupError(f"widget '{rotulo}' não encontrado")
+
+
+def _nomes(opcoes):
+    """Nomes dos municípios a partir das opções exibidas ("NOME · código")."""
+    return [o.split(" · ")[0] for o in opcoes]
+
+
+def sessao(id_sessao, args, inicio):
+    """Executa o roteiro de uma sessão; retorna [(ação, seção, segundos, erro)]."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(args.semente * 1000 + id_sessao)
+    medicoes = []
+
+    at = AppTest.from_file(os.path.join(args.pasta, ARQUIVO_APP), default_timeout=args.timeout)
+    inicio.wait()
+
+    t0 = time.perf_counter()
+    at.run()
+    medicoes.append(("inicial", "inicial", time.perf_counter() - t0, bool(at.exception) or bool(at.error)))
+    if at.exception or not at.sidebar.radio:
+        return medicoes
+
+    menu = at.sidebar.radio[0]
+    secoes = list(menu.options)
+    anos = list(_widget(at.sidebar.selectbox, ROTULO_ANO).options)
+    # a caixa de seleção só tem os resultados da busca: as sessões buscam
+    # pelo início de nomes já vistos e escolhem um dos resultados
+    municipios = _nomes(_widget(at.sidebar.selectbox, ROTULO_MUNICIPIO).options)
+
+    for _ in range(args.interacoes):
+        acao = rng.choices(list(MIX_INTERACOES), weights=list(MIX_INTERACOES.values()))[0]
+        if acao == "secao":
+            at.sidebar.radio[0].set_value(rng.choice(secoes))
+        elif acao == "ano":
+            _widget(at.sidebar.selectbox, ROTULO_ANO).set_value(rng.choice(anos))
+        else:
+            busca = rng.choice(municipios)[:rng.randint(2, 5)]
+            _widget(at.sidebar.text_input, ROTULO_BUSCA).set_value(busca)
+            at.run()
+            resultados = _nomes(_widget(at.sidebar.selectbox, ROTULO_MUNICIPIO).options)
+            municipios = list(dict.fromkeys(municipios + resultados))
+            _widget(at.sidebar.selectbox, ROTULO_MUNICIPIO).set_value(rng.choice(resultados))
+
+        secao = at.sidebar.radio[0].value
+        t0 = time.perf_counter()
+        at.run()
+        dt = time.perf_counter() - t0
+        medicoes.append((acao, secao, dt, bool(at.exception) or bool(at.error)))
+
+    return medicoes
+
+
+def percentis(valores):
+    v = np.asarray(valores)
+    return {
+        "p50": float(np.percentile(v, 50)),
+        "p95": float(np.percentile(v, 95)),
+        "p99": float(np.percentile(v, 99)),
+        "media": float(statistics.fmean(v)),
+        "n": int(len(v)),
+    }
+
+
+def rodar_nivel(n_sessoes, args):
+    _acertos.clear()
+    _falhas.clear()
+    rss_antes = memoria_residente()
+
+    inicio = threading.Barrier(n_sessoes)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessoes) as pool:
+        futuros = [pool.submit(sessao, i, args, inicio) for i in range(n_sessoes)]
+        medicoes = [m for f in futuros for m in f.result()]
+    duracao = time.perf_counter() - t0
+
+    rss_depois = memoria_residente()
+
+    por_secao = defaultdict(list)
+    for _, secao, dt, _ in medicoes:
+        por_secao[secao].append(dt)
+
+    cache = {
+        nome: {
+            "acertos": _acertos[nome],
+            "falhas": _falhas[nome],
+            "taxa": _acertos[nome] / max(1, _acertos[nome] + _falhas[nome]),
+        }
+        for nome in sorted(set(_acertos) | set(_falhas))
+    }
+
+    return {
+        "sessoes": n_sessoes,
+        "reruns": len(medicoes),
+        "erros": sum(1 for m in medicoes if m[3]),
+        "duracao_s": duracao,
+        "reruns_por_s": len(medicoes) / duracao,
+        "latencia": percentis([m[2] for m in medicoes]),
+        "latencia_por_secao": {s: percentis(v) for s, v in sorted(por_secao.items())},
+        "memoria_por_sessao_mb": max(0, rss_depois - rss_antes) / n_sessoes / 1e6,
+        "cache": cache,
+    }
+
+
+def imprimir(res):
+    lat = res["latencia"]
+    print(f"\n=== {res['sessoes']} sessões – {res['reruns']} reruns em {res['duracao_s']:.1f} s "
+          f"({res['reruns_por_s']:.1f}/s), {res['erros']} com erro")
+    print(f"latência (s): p50 {lat['p50']:.3f} | p95 {lat['p95']:.3f} | p99 {lat['p99']:.3f}")
+    print(f"memória adicional por sessão: {res['memoria_por_sessao_mb']:.1f} MB")
+    for secao, p in res["latencia_por_secao"].items():
+        print(f"  {secao:<45} n={p['n']:>4}  p50 {p['p50']:.3f}  p95 {p['p95']:.3f}  p99 {p['p99']:.3f}")
+    for nome, c in res["cache"].items():
+        print(f"  cache {nome:<40} acertos {c['acertos']:>5}  falhas {c['falhas']:>4}  taxa {c['taxa']*100:.1f}%")
+
+
+def regressoes(resultados, linha_base, tolerancia):
+    base = {r["sessoes"]: r for r in linha_base["niveis"]}
+    falhas = []
+    for r in resultados:
+        ref = base.get(r["sessoes"])
+        if ref is None:
+            continue
+        limite = ref["latencia"]["p95"] * (1 + tolerancia)
+        if r["latencia"]["p95"] > limite:
+            falhas.append(
+                f"{r['sessoes']} sessões: p95 {r['latencia']['p95']:.3f} s > "
+                f"{limite:.3f} s (linha de base {ref['latencia']['p95']:.3f} s + {tolerancia*100:.0f}%)"
+            )
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do painel Fundeb com sessões simultâneas.")
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--interacoes", type=int, default=10, help="interações por sessão")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de um rerun (s)")
+    parser.add_argument("--pasta", default=PASTA_APP, help="pasta com fundeb.py e os dados")
+    parser.add_argument("--salvar", help="grava os resultados (JSON) para servir de linha de base")
+    parser.add_argument("--linha-base", help="resultados anteriores (JSON) para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="piora máxima aceita no p95 em relação à linha de base")
+    parser.add_argument("--limite-p95", type=float, help="p95 máximo absoluto (s)")
+    args = parser.parse_args()
+
+    # silencia os avisos de "missing ScriptRunContext" das threads do pool
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    os.chdir(args.pasta)
+    sys.path.insert(0, args.pasta)
+    if not instrumentar_cache():
+        print("Aviso: contagem de acertos do cache indisponível nesta versão do Streamlit.")
+
+    resultados = []
+    for n in args.sessoes:
+        res = rodar_nivel(n, args)
+        imprimir(res)
+        resultados.append(res)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump({"niveis": resultados}, f, ensure_ascii=False, indent=1)
+
+    falhas = [f"{r['sessoes']} sessões: {r['erros']} reruns com erro" for r in resultados if r["erros"]]
+    if args.limite_p95 is not None:
+        falhas += [
+            f"{r['sessoes']} sessões: p95 {r['latencia']['p95']:.3f} s > limite {args.limite_p95:.3f} s"
+            for r in resultados if r["latencia"]["p95"] > args.limite_p95
+        ]
+    if args.linha_base:
+        with open(args.linha_base, encoding="utf-8") as f:
+            falhas += regressoes(resultados, json.load(f), args.tolerancia)
+
+    if falhas:
+        print("\nREGRESSÕES:")
+        for f in falhas:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nOK: nenhuma regressão encontrada.")
+
+
+if __name__ == "__main__":
+    main()
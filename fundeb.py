@@ -1,1178 +1,1466 @@
-# ================================================================
-# fundeb.py – Painel Fundeb, VAAT, VAAR & ICMS – Zetta
-# ================================================================
-import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import json
-import os
-
-# ================================================================
-# FUNÇÃO DE FORMATAÇÃO MONETÁRIA (PADRÃO BRASILEIRO, SEM DECIMAIS)
-# ================================================================
-def formatar_reais(valor):
-    """
-    Converte valores numéricos para o padrão brasileiro:
-    R$ 1.234.567
-
-    - Sempre sem casas decimais
-    - Aceita valores None e NaN
-    """
-    if valor is None or pd.isna(valor):
-        return "-"
-
-    try:
-        valor_fmt = f"{float(valor):,.0f}"
-        valor_br = (
-            valor_fmt
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        return f"R$ {valor_br}"
-    except Exception:
-        return "-"
-
-
-# ================================================================
-# BLOCO 1 – CONFIGURAÇÕES GERAIS E ESTILO
-# ================================================================
-st.set_page_config(
-    page_title="Painel Fundeb & Complementações – Zetta",
-    page_icon="💰",
-    layout="wide"
-)
-
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@300;400;600;700&display=swap');
-html, body, [class*="css"] {
-    font-family: 'Montserrat', sans-serif;
-    color:#5F6169;
-}
-
-/* Cards grandes do topo */
-.big-card{
-    background:#3A0057;
-    color:#fff;
-    padding:28px;
-    border-radius:14px;
-    text-align:center;
-    box-shadow:0 0 12px rgba(0,0,0,.15);
-    height:180px;                /* força mesma altura nos 3 cards */
-    display:flex;
-    flex-direction:column;
-    justify-content:center;
-}
-
-/* Cards menores */
-.small-card,.white-card{
-    padding:22px;
-    border-radius:12px;
-    text-align:center;
-    border:1px solid #E0E0E0;
-    box-shadow:0 0 6px rgba(0,0,0,.08);
-}
-.small-card{
-    background:#F3F3F3;
-    color:#3A0057;
-}
-.white-card{
-    background:#fff;
-    color:#3A0057;
-}
-
-/* Abas */
-.stTabs [data-baseweb="tab-list"] { gap: 10px; }
-.stTabs [data-baseweb="tab"] {
-  background:#fff;
-  color:#3A0057;
-  border:1px solid #E5D9EF;
-  border-radius:10px;
-  padding:10px 16px;
-}
-.stTabs [aria-selected="true"] {
-  background:#3A0057 !important;
-  color:#fff !important;
-}
-
-/* Tabelas */
-.dataframe td, .dataframe th {
-  text-align: center !important;
-  vertical-align: middle !important;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# ================================================================
-# BLOCO 2 – CARREGAMENTO UNIVERSAL DE DADOS
-# ================================================================
-@st.cache_data(show_spinner=True)
-def carregar_dados():
-    import pandas as pd
-    import numpy as np
-
-    nome_arquivo = "loa.xlsx"
-
-    caminhos_possiveis = [
-        nome_arquivo,
-        os.path.join("data", nome_arquivo),
-        os.path.join("dados", nome_arquivo),
-        os.path.join("Data", nome_arquivo),
-        os.path.join("Dados", nome_arquivo),
-    ]
-
-    caminho_encontrado = None
-    for c in caminhos_possiveis:
-        if os.path.exists(c):
-            caminho_encontrado = c
-            break
-
-    if caminho_encontrado is None:
-        st.error(f"""
-        ❌ Arquivo não encontrado.
-
-        Coloque o arquivo:
-        **{nome_arquivo}**
-
-        ➤ na mesma pasta do *fundeb.py*  
-        **OU**  
-        ➤ dentro da pasta **data/** ou **dados/**.
-        """)
-        st.stop()
-
-    # Carrega planilha principal
-    df = pd.read_excel(caminho_encontrado, sheet_name="Planilha1")
-
-    # Remove espaços extras no início/fim dos nomes de coluna
-    df.columns = [c.strip() for c in df.columns]
-
-    # ---------------- Função de conversão numérica inteligente ----------------
-    def _coerce_numeric(col):
-        """
-        Converte para número aceitando:
-        - Formato BR: 1.234,56   (usa vírgula)
-        - Formato "padrão": 4067327.36 (sem vírgula, ponto como decimal)
-        - Remove 'R$', espaços, traços, etc.
-        """
-        if pd.api.types.is_numeric_dtype(col):
-            return col
-
-        col = col.astype(str)
-        col = col.str.replace("R$", "", regex=False)
-        col = col.str.strip()
-
-        # onde tiver vírgula, tratamos como formato brasileiro
-        mask_comma = col.str.contains(",", regex=False)
-
-        col2 = col.copy()
-        # Formato BR: 1.234,56 -> 1234.56
-        col2[mask_comma] = (
-            col2[mask_comma]
-            .str.replace(".", "", regex=False)
-            .str.replace(",", ".", regex=False)
-        )
-        # onde NÃO tiver vírgula, mantemos como está (ponto já é decimal)
-        col2[~mask_comma] = col2[~mask_comma]
-
-        col2 = col2.replace(
-            {"-": np.nan, "--": np.nan, "nan": np.nan, "None": np.nan, "": np.nan}
-        )
-        return pd.to_numeric(col2, errors="coerce")
-
-    # Lista de colunas numéricas (pelo nome exato que está na planilha)
-    num_cols = [
-        "Orçamento",
-        "Despesa Educação",
-        "Receita Cota-parte ICMS Estimada",
-        "Receita Fundeb Estimada",
-        "Cota-parte ICMS Realizada",
-        "ICMS Educacional",
-        "Receita total do Fundeb Realizada",
-        "VAAF",
-        "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)",
-        "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)",
-        "Complementação da União-VAAT (art. 16, VI) (R$)",
-        "Complementação da União-VAAR (R$)",
-        "VAAT Mínimo Brasil",
-    ]
-
-    for c in num_cols:
-        if c in df.columns:
-            df[c] = _coerce_numeric(df[c])
-
-    # Ajuste de tipos de ano e código IBGE
-    if "ANO" in df.columns:
-        df["ANO"] = pd.to_numeric(df["ANO"], errors="coerce").astype("Int64")
-    if "Código IBGE" in df.columns:
-        df["Código IBGE"] = pd.to_numeric(df["Código IBGE"], errors="coerce").astype("Int64")
-
-    # ---------------- Colunas derivadas ----------------
-    # Fundeb base: receita da contribuição (quando existir), senão total do Fundeb
-    if "Receita da contribuição de estados e municípios ao Fundeb" in df.columns:
-        df["Fundeb_Base"] = df["Receita da contribuição de estados e municípios ao Fundeb"]
-    elif "Receita total do Fundeb Realizada" in df.columns:
-        df["Fundeb_Base"] = df["Receita total do Fundeb Realizada"]
-    else:
-        df["Fundeb_Base"] = 0
-
-    # Complementações – aqui usamos as colunas "da União"
-    df["Compl_VAAF"] = 0  # ES não recebe VAAF, deixamos explícito
-    df["Compl_VAAT"] = df.get("Complementação da União-VAAT (art. 16, VI) (R$)", 0).fillna(0)
-    df["Compl_VAAR"] = df.get("Complementação da União-VAAR (R$)", 0).fillna(0)
-
-    df["Fundeb_Total"] = (
-        df["Fundeb_Base"] +
-        df["Compl_VAAF"] +
-        df["Compl_VAAT"] +
-        df["Compl_VAAR"]
-    )
-
-    df["ICMS_Educacional"] = df.get("ICMS Educacional", 0).fillna(0)
-    df["ICMS_CotaParte"] = df.get("Cota-parte ICMS Realizada", np.nan)
-
-    df["Orcamento_Total"] = df.get("Orçamento", np.nan)
-    df["Despesa_Educacao"] = df.get("Despesa Educação", np.nan)
-
-    df["Recursos_Educacao_Ampliados"] = df["Fundeb_Total"] + df["ICMS_Educacional"]
-
-    df["Dep_Fundeb_orcamento"] = df["Fundeb_Total"] / df["Orcamento_Total"]
-    df["Dep_Fundeb_despesa_educ"] = df["Fundeb_Total"] / df["Despesa_Educacao"]
-
-    # Não estamos usando a aba "Habilitação VAAT 2026" neste painel,
-    # então apenas garantimos que, se algum dia entrar, não quebre nada.
-    abas = pd.ExcelFile(caminho_encontrado).sheet_names
-    if "Habilitação VAAT 2026" in abas:
-        df_vaat_hab = pd.read_excel(caminho_encontrado, sheet_name="Habilitação VAAT 2026")
-        if "Código IBGE" in df_vaat_hab.columns:
-            df_vaat_hab["Código IBGE"] = pd.to_numeric(
-                df_vaat_hab["Código IBGE"], errors="coerce"
-            ).astype("Int64")
-            df = df.merge(
-                df_vaat_hab[["Código IBGE", "Veficação  § 4º do art. 13 da  Lei nº 14.113/20"]],
-                on="Código IBGE",
-                how="left"
-            )
-            df.rename(
-                columns={"Veficação  § 4º do art. 13 da  Lei nº 14.113/20": "Status_VAAT_2026"},
-                inplace=True
-            )
-
-    return df
-
-
-# ================================================================
-# BLOCO 2b – CARREGAMENTO DO MAPA (GEOJSON)
-# ================================================================
-@st.cache_data(show_spinner=True)
-def carregar_mapa_es():
-    caminho_geo = "es_municipios.geojson"  # mesmo nível do fundeb.py
-
-    if not os.path.exists(caminho_geo):
-        st.error(
-            "Arquivo 'es_municipios.geojson' não encontrado.\n\n"
-            "Coloque o arquivo na mesma pasta do 'fundeb.py'."
-        )
-        st.stop()
-
-    with open(caminho_geo, "r", encoding="utf-8") as f:
-        geojson_es = json.load(f)
-
-    return geojson_es
-
-
-df = carregar_dados()
-mapa_es = carregar_mapa_es()
-
-# Remove 2020 de todas as análises
-if "ANO" in df.columns:
-    df = df[df["ANO"].notna()]
-    df = df[df["ANO"] >= 2021]
-
-# Código IBGE como string (7 dígitos) para ligar com o mapa
-if "Código IBGE" in df.columns:
-    df["Codigo_IBGE_str"] = (
-        df["Código IBGE"]
-        .astype("Int64")
-        .astype(str)
-        .str.zfill(7)
-    )
-
-# ================================================================
-# BLOCO 3 – SIDEBAR E NAVEGAÇÃO
-# ================================================================
-st.sidebar.image("assets/logotipo_zetta_branco.png", use_container_width=True)
-st.sidebar.title("Navegação")
-
-anos_disponiveis = sorted([int(a) for a in df["ANO"].dropna().unique()])
-ano_sel = st.sidebar.selectbox("Ano de análise", anos_disponiveis, index=len(anos_disponiveis)-1)
-
-municipios = sorted(df["MUNICÍPIO"].astype(str).unique())
-municipio_sel = st.sidebar.selectbox("Município (para análises focadas)", municipios)
-
-menu = st.sidebar.radio(
-    "Escolha a seção:",
-    [
-        "📊 Visão geral dos recursos",
-        "💰 Fundeb – Diagnóstico",
-        "🏛️ Complementações da União (VAAT & VAAR)",
-        "📈 Comparativos e cruzamentos",
-        "🗺️ Mapa estadual (visão conceitual)",
-        "💡 Insights automáticos",
-        "📎 Downloads"
-    ],
-    index=0
-)
-
-df_ano = df[df["ANO"] == ano_sel].copy()
-
-# ================================================================
-# BLOCO 4 – SEÇÃO: VISÃO GERAL DOS RECURSOS
-# ================================================================
-if menu == "📊 Visão geral dos recursos":
-    st.title(f"📊 Visão Geral dos Recursos Educacionais – Espírito Santo ({ano_sel})")
-
-    if df_ano.empty:
-        st.warning("Não há dados para o ano selecionado.")
-    else:
-        # Agregados estaduais
-        total_fundeb_base = df_ano["Fundeb_Base"].sum(skipna=True)
-        total_compl = (df_ano["Compl_VAAF"] + df_ano["Compl_VAAT"] + df_ano["Compl_VAAR"]).sum(skipna=True)
-        total_icms_educ = df_ano["ICMS_Educacional"].sum(skipna=True)
-
-        total_orcamento = df_ano["Orcamento_Total"].sum(skipna=True)
-        total_desp_educ = df_ano["Despesa_Educacao"].sum(skipna=True)
-
-        dep_fundeb_educ = total_fundeb_base / total_desp_educ if total_desp_educ > 0 else np.nan
-        dep_fundeb_orc = total_fundeb_base / total_orcamento if total_orcamento > 0 else np.nan
-
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            st.markdown(f"""
-            <div class="big-card">
-                <h3>Fundeb base</h3>
-                <h1 style='font-size:34px;margin-top:-4px;'>{formatar_reais(total_fundeb_base)}</h1>
-            </div>
-            """, unsafe_allow_html=True)
-        with c2:
-            st.markdown(f"""
-            <div class="big-card">
-                <h3>Complementações (VAAF + VAAT + VAAR)</h3>
-                <h1 style='font-size:34px;margin-top:-4px;'>{formatar_reais(total_compl)}</h1>
-            </div>
-            """, unsafe_allow_html=True)
-        with c3:
-            st.markdown(f"""
-            <div class="big-card">
-                <h3>ICMS Educacional</h3>
-                <h1 style='font-size:34px;margin-top:-4px;'>{formatar_reais(total_icms_educ)}</h1>
-            </div>
-            """, unsafe_allow_html=True)
-
-        st.markdown("---")
-        st.markdown(f"""
-        **Peso do Fundeb base:**
-
-        • Fundeb base / Despesa em educação: 
-        **{(dep_fundeb_educ*100 if pd.notna(dep_fundeb_educ) else 0):.1f}%**  
-        • Fundeb base / Orçamento total da prefeitura:
-        **{(dep_fundeb_orc*100 if pd.notna(dep_fundeb_orc) else 0):.1f}%**
-        """)
-
-        st.markdown("---")
-        st.subheader("Evolução anual – Fundeb base, complementações e ICMS Educacional")
-
-        evol = (
-            df.groupby("ANO", as_index=False)
-            .agg(
-                Fundeb_Base=("Fundeb_Base", "sum"),
-                Compl_VAAF=("Compl_VAAF", "sum"),
-                Compl_VAAT=("Compl_VAAT", "sum"),
-                Compl_VAAR=("Compl_VAAR", "sum"),
-                ICMS_Educacional=("ICMS_Educacional", "sum")
-            )
-            .dropna(subset=["ANO"])
-            .sort_values("ANO")
-        )
-        evol["Complementacoes"] = evol["Compl_VAAF"] + evol["Compl_VAAT"] + evol["Compl_VAAR"]
-
-        # >>> NOVO: gráfico de barras empilhadas em vez de linhas
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=evol["ANO"], y=evol["Fundeb_Base"],
-            name="Fundeb base"
-        ))
-        fig.add_trace(go.Bar(
-            x=evol["ANO"], y=evol["Complementacoes"],
-            name="Complementações (VAAF+VAAT+VAAR)"
-        ))
-        fig.add_trace(go.Bar(
-            x=evol["ANO"], y=evol["ICMS_Educacional"],
-            name="ICMS Educacional"
-        ))
-        fig.update_layout(
-            template="simple_white",
-            height=420,
-            xaxis_title="Ano",
-            yaxis_title="Valor (R$)",
-            barmode="stack",
-            title="Evolução dos principais recursos educacionais (Estado + municípios do ES)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-# ================================================================
-# BLOCO 5 – SEÇÃO: FUNDEB – DIAGNÓSTICO
-# ================================================================
-elif menu == "💰 Fundeb – Diagnóstico":
-    st.title("💰 Fundeb – Diagnóstico por município")
-
-    df_mun = df[df["MUNICÍPIO"] == municipio_sel].copy()
-    df_mun = df_mun.sort_values("ANO")
-
-    if df_mun.empty:
-        st.warning("Não há dados para o município selecionado.")
-    else:
-        st.markdown(f"### {municipio_sel} – Fundeb base e complementações ao longo do tempo")
-
-        df_mun["Complementacoes"] = (
-            df_mun["Compl_VAAF"] +
-            df_mun["Compl_VAAT"] +
-            df_mun["Compl_VAAR"]
-        )
-
-        fig_fund_mun = go.Figure()
-        fig_fund_mun.add_trace(go.Bar(
-            x=df_mun["ANO"],
-            y=df_mun["Fundeb_Base"],
-            name="Fundeb base"
-        ))
-        fig_fund_mun.add_trace(go.Bar(
-            x=df_mun["ANO"],
-            y=df_mun["Complementacoes"],
-            name="Complementações (VAAF+VAAT+VAAR)"
-        ))
-        fig_fund_mun.update_layout(
-            barmode="stack",
-            template="simple_white",
-            height=420,
-            xaxis_title="Ano",
-            yaxis_title="Valor (R$)",
-            title=f"Fundeb base e complementações – {municipio_sel}"
-        )
-        st.plotly_chart(fig_fund_mun, use_container_width=True)
-
-        st.markdown("#### Tabela – Fundeb base, complementações e total (com variações ano a ano)")
-
-        base_tab = df_mun[["ANO", "Fundeb_Base", "Complementacoes", "Fundeb_Total"]].copy()
-        base_tab = base_tab.sort_values("ANO")
-
-        base_tab["Dif_abs_Base"] = base_tab["Fundeb_Base"].diff()
-        base_tab["Dif_perc_Base"] = base_tab["Fundeb_Base"].pct_change()
-
-        base_tab["Dif_abs_Compl"] = base_tab["Complementacoes"].diff()
-        base_tab["Dif_perc_Compl"] = base_tab["Complementacoes"].pct_change()
-
-        base_tab["Dif_abs_Total"] = base_tab["Fundeb_Total"].diff()
-        base_tab["Dif_perc_Total"] = base_tab["Fundeb_Total"].pct_change()
-
-        base_exib = base_tab.copy()
-
-        base_exib["Fundeb_Base"] = base_exib["Fundeb_Base"].map(formatar_reais)
-        base_exib["Complementacoes"] = base_exib["Complementacoes"].map(formatar_reais)
-        base_exib["Fundeb_Total"] = base_exib["Fundeb_Total"].map(formatar_reais)
-
-        base_exib["Dif_abs_Base"] = base_exib["Dif_abs_Base"].map(formatar_reais)
-        base_exib["Dif_abs_Compl"] = base_exib["Dif_abs_Compl"].map(formatar_reais)
-        base_exib["Dif_abs_Total"] = base_exib["Dif_abs_Total"].map(formatar_reais)
-
-        base_exib["Dif_perc_Base"] = base_exib["Dif_perc_Base"].map(
-            lambda v: f"{v*100:+.1f}%" if pd.notna(v) else "-"
-        )
-        base_exib["Dif_perc_Compl"] = base_exib["Dif_perc_Compl"].map(
-            lambda v: f"{v*100:+.1f}%" if pd.notna(v) else "-"
-        )
-        base_exib["Dif_perc_Total"] = base_exib["Dif_perc_Total"].map(
-            lambda v: f"{v*100:+.1f}%" if pd.notna(v) else "-"
-        )
-
-        base_exib.rename(columns={
-            "Fundeb_Base": "Fundeb base",
-            "Complementacoes": "Complementações",
-            "Fundeb_Total": "Fundeb total",
-            "Dif_abs_Base": "Dif. abs. Fundeb base",
-            "Dif_perc_Base": "Dif. % Fundeb base",
-            "Dif_abs_Compl": "Dif. abs. Complementações",
-            "Dif_perc_Compl": "Dif. % Complementações",
-            "Dif_abs_Total": "Dif. abs. Fundeb total",
-            "Dif_perc_Total": "Dif. % Fundeb total",
-        }, inplace=True)
-
-        st.dataframe(
-            base_exib.set_index("ANO"),
-            use_container_width=True
-        )
-
-        st.caption(
-            "Fundeb base = receita do Fundeb antes das complementações. "
-            "Complementações = VAAF + VAAT + VAAR. "
-            "Fundeb total = Fundeb base + complementações."
-        )
-
-# ================================================================
-# BLOCO 6 – SEÇÃO: COMPLEMENTAÇÕES DA UNIÃO (VAAT & VAAR)
-# ================================================================
-elif menu == "🏛️ Complementações da União (VAAT & VAAR)":
-    st.title("🏛️ Complementações da União – VAAT & VAAR")
-
-    st.info(
-        "O Espírito Santo, por não estar abaixo do valor mínimo por aluno do VAAF, "
-        "não recebe a complementação VAAF – nem o Estado, nem seus municípios. "
-        "Por isso, os valores de VAAF permanecem zerados nesta base."
-    )
-
-    if df_ano.empty:
-        st.warning("Não há dados para o ano selecionado.")
-    else:
-        # ---------------- VAAT ----------------
-        st.subheader("🔹 Complementação VAAT – mínimo Brasil, valores e complementos")
-
-        df_vaat = df_ano.copy()
-        df_vaat["Recebe_VAAT"] = df_vaat["Compl_VAAT"] > 0
-
-        col_vaat1, col_vaat2 = st.columns([1.4, 1])
-        with col_vaat1:
-            qtde_recebe = int(df_vaat["Recebe_VAAT"].sum())
-            st.markdown(f"""
-            <div class="white-card">
-                <h4>Municípios que recebem VAAT – {ano_sel}</h4>
-                <h2 style='margin-top:-4px;'>{qtde_recebe} de {len(df_vaat)}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        with col_vaat2:
-            valor_total_vaat = df_vaat["Compl_VAAT"].sum(skipna=True)
-            st.markdown(f"""
-            <div class="small-card">
-                <h4>Total de complementação VAAT</h4>
-                <h2 style='margin-top:-4px;'>{formatar_reais(valor_total_vaat)}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-
-        st.markdown("#### VAAT mínimo, valor com complementação e complementação recebida")
-        cols_exibir = [
-            "MUNICÍPIO",
-            "VAAT Mínimo Brasil",
-            "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)",
-            "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)",
-            "Compl_VAAT",
-        ]
-        df_vaat_sorted = df_vaat.sort_values("Compl_VAAT", ascending=False)
-        df_vaat_tab = df_vaat_sorted[cols_exibir].copy()
-        df_vaat_tab.rename(columns={
-            "VAAT Mínimo Brasil": "VAAT mínimo (Brasil)",
-            "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)": "VAAT antes da compl. (R$)",
-            "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)": "VAAT após compl. (R$)",
-            "Compl_VAAT": "Complementação VAAT (R$)",
-        }, inplace=True)
-
-        for c in [
-            "VAAT mínimo (Brasil)",
-            "VAAT antes da compl. (R$)",
-            "VAAT após compl. (R$)",
-            "Complementação VAAT (R$)",
-        ]:
-            df_vaat_tab[c] = df_vaat_tab[c].map(formatar_reais)
-
-        # >>> NOVO: data_editor desabilitado, permitindo ordenar clicando no cabeçalho
-        st.data_editor(
-            df_vaat_tab,
-            use_container_width=True,
-            hide_index=True,
-            disabled=True,
-            key="tabela_vaat"
-        )
-
-        # Estatísticas VAAT (mín, mediana, média, máx + município selecionado)
-        st.markdown("#### Estatísticas da complementação VAAT")
-        valores_vaat_validos = df_vaat["Compl_VAAT"][df_vaat["Compl_VAAT"] > 0]
-        if not valores_vaat_validos.empty:
-            med_vaat = valores_vaat_validos.median()
-            media_vaat = valores_vaat_validos.mean()
-            minimo_vaat = valores_vaat_validos.min()
-            maximo_vaat = valores_vaat_validos.max()
-            valor_mun_vaat = df_vaat.loc[df_vaat["MUNICÍPIO"] == municipio_sel, "Compl_VAAT"]
-            valor_mun_vaat = float(valor_mun_vaat.iloc[0]) if not valor_mun_vaat.empty else np.nan
-
-            c1, c2, c3, c4, c5 = st.columns(5)
-            c1.metric("Mínimo (entre os que recebem)", formatar_reais(minimo_vaat))
-            c2.metric("Mediana", formatar_reais(med_vaat))
-            c3.metric("Média", formatar_reais(media_vaat))
-            c4.metric("Máximo", formatar_reais(maximo_vaat))
-            c5.metric(f"{municipio_sel}", formatar_reais(valor_mun_vaat))
-
-            # >>> NOVO: “reguinha” visual tipo bullet chart
-            st.markdown("##### Distribuição visual dos valores de VAAT (entre os que recebem)")
-            fig_vaat_stats = go.Figure()
-
-            # Faixa de fundo (0 a máximo)
-            fig_vaat_stats.add_trace(go.Bar(
-                x=[maximo_vaat],
-                y=["VAAT"],
-                orientation="h",
-                marker=dict(color="rgba(106,27,154,0.15)"),
-                showlegend=False,
-                hoverinfo="skip"
-            ))
-
-            # Marcadores
-            fig_vaat_stats.add_trace(go.Scatter(
-                x=[minimo_vaat], y=["VAAT"],
-                mode="markers",
-                marker=dict(color="#6A1B9A", size=10, symbol="circle"),
-                name="Mínimo"
-            ))
-            fig_vaat_stats.add_trace(go.Scatter(
-                x=[med_vaat], y=["VAAT"],
-                mode="markers",
-                marker=dict(color="#311B92", size=11, symbol="diamond"),
-                name="Mediana"
-            ))
-            fig_vaat_stats.add_trace(go.Scatter(
-                x=[media_vaat], y=["VAAT"],
-                mode="markers",
-                marker=dict(color="#4527A0", size=11, symbol="square"),
-                name="Média"
-            ))
-            if pd.notna(valor_mun_vaat):
-                fig_vaat_stats.add_trace(go.Scatter(
-                    x=[valor_mun_vaat], y=["VAAT"],
-                    mode="markers+text",
-                    marker=dict(color="#D500F9", size=12, symbol="triangle-up"),
-                    text=[municipio_sel],
-                    textposition="top center",
-                    name=f"{municipio_sel}"
-                ))
-
-            fig_vaat_stats.update_layout(
-                template="simple_white",
-                height=220,
-                xaxis_title="Valor da complementação VAAT (R$)",
-                yaxis_showticklabels=False,
-                margin=dict(l=40, r=10, t=20, b=40),
-            )
-            st.plotly_chart(fig_vaat_stats, use_container_width=True)
-
-        else:
-            st.info("Nenhum município recebeu VAAT no ano selecionado na base utilizada.")
-
-        st.markdown("#### Mapa – Municípios que recebem VAAT")
-        df_vaat_mapa = df_vaat.copy()
-        df_vaat_mapa["Codigo_IBGE_str"] = (
-            df_vaat_mapa["Código IBGE"]
-            .astype("Int64")
-            .astype(str)
-            .str.zfill(7)
-        )
-        # zeros viram NaN para ficarem sem cor
-        df_vaat_mapa["Compl_VAAT_plot"] = df_vaat_mapa["Compl_VAAT"].replace(0, np.nan)
-
-        fig_vaat_mapa = px.choropleth(
-            df_vaat_mapa,
-            geojson=mapa_es,
-            locations="Codigo_IBGE_str",
-            featureidkey="properties.CD_MUN",
-            color="Compl_VAAT_plot",
-            hover_name="MUNICÍPIO",
-            color_continuous_scale="Purples",
-            labels={"Compl_VAAT_plot": "VAAT (R$)"},
-        )
-        fig_vaat_mapa.update_geos(
-            fitbounds="locations",
-            visible=False,
-            lonaxis_range=[-41.5, -39.0],
-            lataxis_range=[-21.5, -18.0],
-        )
-        fig_vaat_mapa.update_layout(
-            margin=dict(t=0, b=0, l=0, r=0),
-            height=500,
-            coloraxis_colorbar_title="VAAT (R$)"
-        )
-        st.plotly_chart(fig_vaat_mapa, use_container_width=True)
-
-        st.markdown("---")
-        st.subheader("🔹 Complementação VAAR – habilitação, ranking e disparidades")
-
-        df_vaar = df_ano.copy()
-        df_vaar["Recebe_VAAR"] = df_vaar["Compl_VAAR"] > 0
-        df_vaar["Status_VAAR"] = np.where(df_vaar["Recebe_VAAR"], "Habilitado (recebeu VAAR)", "Não habilitado")
-
-        # Cards para VAAR
-        col_vaar1, col_vaar2 = st.columns([1.4, 1])
-        with col_vaar1:
-            qtde_recebe_vaar = int(df_vaar["Recebe_VAAR"].sum())
-            st.markdown(f"""
-            <div class="white-card">
-                <h4>Municípios que recebem VAAR – {ano_sel}</h4>
-                <h2 style='margin-top:-4px;'>{qtde_recebe_vaar} de {len(df_vaar)}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        with col_vaar2:
-            valor_total_vaar = df_vaar["Compl_VAAR"].sum(skipna=True)
-            st.markdown(f"""
-            <div class="small-card">
-                <h4>Total de complementação VAAR</h4>
-                <h2 style='margin-top:-4px;'>{formatar_reais(valor_total_vaar)}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-
-        st.markdown("#### Ranking VAAR – valores recebidos por município")
-        rank_vaar = df_vaar[["MUNICÍPIO", "Compl_VAAR"]].copy()
-        rank_vaar = rank_vaar.sort_values("Compl_VAAR", ascending=False)
-
-        rank_vaar_exib = rank_vaar.copy()
-        rank_vaar_exib["Compl_VAAR"] = rank_vaar_exib["Compl_VAAR"].map(
-            lambda v: formatar_reais(v) if v > 0 else "-"
-        )
-
-        st.data_editor(
-            rank_vaar_exib,
-            use_container_width=True,
-            hide_index=True,
-            disabled=True,
-            key="tabela_vaar"
-        )
-
-        st.markdown("#### Disparidade nos valores de VAAR recebidos")
-        valores_validos = df_vaar["Compl_VAAR"][df_vaar["Compl_VAAR"] > 0]
-        if not valores_validos.empty:
-            med = valores_validos.median()
-            media = valores_validos.mean()
-            minimo = valores_validos.min()
-            maximo = valores_validos.max()
-            valor_mun_vaar = df_vaar.loc[df_vaar["MUNICÍPIO"] == municipio_sel, "Compl_VAAR"]
-            valor_mun_vaar = float(valor_mun_vaar.iloc[0]) if not valor_mun_vaar.empty else np.nan
-
-            c1, c2, c3, c4, c5 = st.columns(5)
-            c1.metric("Mínimo (entre os que recebem)", formatar_reais(minimo))
-            c2.metric("Mediana", formatar_reais(med))
-            c3.metric("Média", formatar_reais(media))
-            c4.metric("Máximo", formatar_reais(maximo))
-            c5.metric(f"{municipio_sel}", formatar_reais(valor_mun_vaar))
-
-            st.markdown("##### Distribuição visual dos valores de VAAR (entre os que recebem)")
-            fig_vaar_stats = go.Figure()
-
-            fig_vaar_stats.add_trace(go.Bar(
-                x=[maximo],
-                y=["VAAR"],
-                orientation="h",
-                marker=dict(color="rgba(142,36,170,0.15)"),
-                showlegend=False,
-                hoverinfo="skip"
-            ))
-            fig_vaar_stats.add_trace(go.Scatter(
-                x=[minimo], y=["VAAR"],
-                mode="markers",
-                marker=dict(color="#8E24AA", size=10, symbol="circle"),
-                name="Mínimo"
-            ))
-            fig_vaar_stats.add_trace(go.Scatter(
-                x=[med], y=["VAAR"],
-                mode="markers",
-                marker=dict(color="#5E35B1", size=11, symbol="diamond"),
-                name="Mediana"
-            ))
-            fig_vaar_stats.add_trace(go.Scatter(
-                x=[media], y=["VAAR"],
-                mode="markers",
-                marker=dict(color="#3949AB", size=11, symbol="square"),
-                name="Média"
-            ))
-            if pd.notna(valor_mun_vaar):
-                fig_vaar_stats.add_trace(go.Scatter(
-                    x=[valor_mun_vaar], y=["VAAR"],
-                    mode="markers+text",
-                    marker=dict(color="#D500F9", size=12, symbol="triangle-up"),
-                    text=[municipio_sel],
-                    textposition="top center",
-                    name=f"{municipio_sel}"
-                ))
-
-            fig_vaar_stats.update_layout(
-                template="simple_white",
-                height=220,
-                xaxis_title="Valor da complementação VAAR (R$)",
-                yaxis_showticklabels=False,
-                margin=dict(l=40, r=10, t=20, b=40),
-            )
-            st.plotly_chart(fig_vaar_stats, use_container_width=True)
-
-        else:
-            st.info("Nenhum município recebeu VAAR no ano selecionado na base utilizada.")
-
-        st.markdown("#### Mapa – Municípios que receberam VAAR")
-        df_vaar_mapa = df_vaar.copy()
-        df_vaar_mapa["Codigo_IBGE_str"] = (
-            df_vaar_mapa["Código IBGE"]
-            .astype("Int64")
-            .astype(str)
-            .str.zfill(7)
-        )
-        df_vaar_mapa["Compl_VAAR_plot"] = df_vaar_mapa["Compl_VAAR"].replace(0, np.nan)
-
-        fig_vaar_mapa = px.choropleth(
-            df_vaar_mapa,
-            geojson=mapa_es,
-            locations="Codigo_IBGE_str",
-            featureidkey="properties.CD_MUN",
-            color="Compl_VAAR_plot",
-            hover_name="MUNICÍPIO",
-            color_continuous_scale="Tealrose",
-            labels={"Compl_VAAR_plot": "VAAR (R$)"},
-        )
-        fig_vaar_mapa.update_geos(
-            fitbounds="locations",
-            visible=False,
-            lonaxis_range=[-41.5, -39.0],
-            lataxis_range=[-21.5, -18.0],
-        )
-        fig_vaar_mapa.update_layout(
-            margin=dict(t=0, b=0, l=0, r=0),
-            height=500,
-            coloraxis_colorbar_title="VAAR (R$)"
-        )
-        st.plotly_chart(fig_vaar_mapa, use_container_width=True)
-
-# ================================================================
-# BLOCO 7 – SEÇÃO: COMPARATIVOS E CRUZAMENTOS
-# ================================================================
-elif menu == "📈 Comparativos e cruzamentos":
-    st.title("📈 Comparativos e cruzamentos – Fundeb, ICMS e complementações")
-
-    if df_ano.empty:
-        st.warning("Não há dados para o ano selecionado.")
-    else:
-        # --------------------------------------------------------
-        # Seleção de quantidade de municípios (para melhorar leitura)
-        # --------------------------------------------------------
-        n_total = len(df_ano)
-        n_default = min(20, n_total)
-        qtd_mun = st.slider(
-            "Quantidade de municípios a exibir (ordenados pelo total de recursos):",
-            min_value=5,
-            max_value=n_total,
-            value=n_default,
-            step=1,
-        )
-
-        df_base = df_ano.copy()
-        df_base["Complementacoes"] = (
-            df_base["Compl_VAAF"] +
-            df_base["Compl_VAAT"] +
-            df_base["Compl_VAAR"]
-        )
-        df_base["Total_Receitas_Chave"] = df_base["Fundeb_Total"] + df_base["ICMS_Educacional"]
-
-        df_top = df_base.sort_values("Total_Receitas_Chave", ascending=False).head(qtd_mun)
-
-        # --------------------------------------------------------
-        # A) TABELA – Fundeb base, complementações, ICMS e total
-        # --------------------------------------------------------
-        st.markdown("### Tabela – Recursos educacionais por município")
-
-        tab_exib = df_top[[
-            "MUNICÍPIO",
-            "Fundeb_Base",
-            "Complementacoes",
-            "ICMS_Educacional",
-            "Total_Receitas_Chave"
-        ]].copy()
-
-        tab_exib["Fundeb_Base"] = tab_exib["Fundeb_Base"].map(formatar_reais)
-        tab_exib["Complementacoes"] = tab_exib["Complementacoes"].map(formatar_reais)
-        tab_exib["ICMS_Educacional"] = tab_exib["ICMS_Educacional"].map(formatar_reais)
-        tab_exib["Total_Receitas_Chave"] = tab_exib["Total_Receitas_Chave"].map(formatar_reais)
-
-        tab_exib.rename(columns={
-            "MUNICÍPIO": "Município",
-            "Fundeb_Base": "Fundeb base",
-            "Complementacoes": "Complementações",
-            "ICMS_Educacional": "ICMS Educacional",
-            "Total_Receitas_Chave": "Total (Fundeb + ICMS Educ.)"
-        }, inplace=True)
-
-        st.dataframe(tab_exib.set_index("Município"), use_container_width=True)
-
-        # --------------------------------------------------------
-        # B) GRÁFICO – Barras empilhadas horizontais (subset)
-        # --------------------------------------------------------
-        st.markdown("### Gráfico – Composição dos recursos educacionais por município")
-
-        df_tot = df_top.copy()
-        df_tot = df_tot.sort_values("Total_Receitas_Chave", ascending=True)
-
-        def cores_por_municipio(series_mun, cor_normal, cor_dest):
-            return [
-                cor_dest if m == municipio_sel else cor_normal
-                for m in series_mun
-            ]
-
-        fig_bar = go.Figure()
-        fig_bar.add_trace(go.Bar(
-            y=df_tot["MUNICÍPIO"],
-            x=df_tot["Fundeb_Base"],
-            name="Fundeb base",
-            orientation="h",
-            marker=dict(color=cores_por_municipio(df_tot["MUNICÍPIO"], "#C2A4CF", "#3A0057")),
-        ))
-        fig_bar.add_trace(go.Bar(
-            y=df_tot["MUNICÍPIO"],
-            x=df_tot["Compl_VAAT"],
-            name="Compl. VAAT",
-            orientation="h",
-            marker=dict(color=cores_por_municipio(df_tot["MUNICÍPIO"], "#B3E6FF", "#0077B6")),
-        ))
-        fig_bar.add_trace(go.Bar(
-            y=df_tot["MUNICÍPIO"],
-            x=df_tot["Compl_VAAR"],
-            name="Compl. VAAR",
-            orientation="h",
-            marker=dict(color=cores_por_municipio(df_tot["MUNICÍPIO"], "#FFE0B2", "#FF8C00")),
-        ))
-        fig_bar.add_trace(go.Bar(
-            y=df_tot["MUNICÍPIO"],
-            x=df_tot["ICMS_Educacional"],
-            name="ICMS Educacional",
-            orientation="h",
-            marker=dict(color=cores_por_municipio(df_tot["MUNICÍPIO"], "#D0F0C0", "#228B22")),
-        ))
-        fig_bar.update_layout(
-            barmode="stack",
-            template="simple_white",
-            height=max(400, 20 * len(df_tot)),  # altura cresce com nº de municípios
-            title=f"Recursos educacionais por município – {ano_sel}",
-            xaxis_title="Valor (R$)",
-            yaxis_title="Município",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0.0)
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
-
-        # --------------------------------------------------------
-        # C) Estrutura percentual dos recursos (mesmo subset)
-        # --------------------------------------------------------
-        st.markdown("### Estrutura percentual dos recursos educacionais por município")
-
-        df_dep = df_top.copy()
-        df_dep["Total_Recursos"] = (
-            df_dep["Fundeb_Base"] +
-            df_dep["Compl_VAAT"] +
-            df_dep["Compl_VAAR"] +
-            df_dep["ICMS_Educacional"]
-        )
-        df_dep = df_dep[df_dep["Total_Recursos"] > 0].copy()
-
-        for col in ["Fundeb_Base", "Compl_VAAT", "Compl_VAAR", "ICMS_Educacional"]:
-            df_dep[f"perc_{col}"] = df_dep[col] / df_dep["Total_Recursos"]
-
-        df_long = df_dep.melt(
-            id_vars=["MUNICÍPIO"],
-            value_vars=["perc_Fundeb_Base", "perc_Compl_VAAT", "perc_Compl_VAAR", "perc_ICMS_Educacional"],
-            var_name="Fonte",
-            value_name="Percentual"
-        )
-        df_long["Fonte"] = df_long["Fonte"].replace({
-            "perc_Fundeb_Base": "Fundeb base",
-            "perc_Compl_VAAT": "Compl. VAAT",
-            "perc_Compl_VAAR": "Compl. VAAR",
-            "perc_ICMS_Educacional": "ICMS Educacional",
-        })
-
-        fig_stack = px.bar(
-            df_long,
-            y="MUNICÍPIO",
-            x="Percentual",
-            color="Fonte",
-            orientation="h",
-            labels={"MUNICÍPIO": "Município", "Percentual": "Participação no total de recursos"},
-        )
-        fig_stack.update_layout(
-            template="simple_white",
-            height=max(500, 25 * len(df_dep)),
-            xaxis_tickformat=".0%",
-            title="Estrutura percentual dos recursos educacionais por município",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0.0)
-        )
-        fig_stack.update_yaxes(automargin=True)
-        st.plotly_chart(fig_stack, use_container_width=True)
-
-# ================================================================
-# BLOCO 8 – SEÇÃO: MAPA ESTADUAL (AGORA REAL)
-# ================================================================
-elif menu == "🗺️ Mapa estadual (visão conceitual)":
-    st.title("🗺️ Mapa estadual – recursos educacionais")
-
-    if df_ano.empty:
-        st.warning("Não há dados para o ano selecionado.")
-    else:
-        st.markdown("Escolha qual indicador deseja visualizar no mapa:")
-
-        opcoes_indicador = {
-            "Fundeb base (Receita da contribuição de estados e municípios ao Fundeb)": "Fundeb_Base",
-            "Complementações (VAAF + VAAT + VAAR)": "Compl_Total",
-            "Fundeb total (base + complementações)": "Fundeb_Total",
-            "ICMS Educacional": "ICMS_Educacional",
-        }
-
-        df_mapa = df_ano.copy()
-        df_mapa["Compl_Total"] = (
-            df_mapa["Compl_VAAF"] +
-            df_mapa["Compl_VAAT"] +
-            df_mapa["Compl_VAAR"]
-        )
-
-        escolha = st.selectbox(
-            "Indicador para o mapa:",
-            list(opcoes_indicador.keys())
-        )
-        col_ind = opcoes_indicador[escolha]
-
-        df_mapa["Codigo_IBGE_str"] = (
-            df_mapa["Código IBGE"]
-            .astype("Int64")
-            .astype(str)
-            .str.zfill(7)
-        )
-        df_mapa["valor_plot"] = df_mapa[col_ind].replace(0, np.nan)
-
-        fig_mapa = px.choropleth(
-            df_mapa,
-            geojson=mapa_es,
-            locations="Codigo_IBGE_str",
-            featureidkey="properties.CD_MUN",
-            color="valor_plot",
-            hover_name="MUNICÍPIO",
-            color_continuous_scale="Viridis",
-            labels={"valor_plot": "Valor (R$)"},
-        )
-        fig_mapa.update_geos(
-            fitbounds="locations",
-            visible=False,
-            lonaxis_range=[-41.5, -39.0],
-            lataxis_range=[-21.5, -18.0],
-        )
-        fig_mapa.update_layout(
-            margin=dict(t=0, b=0, l=0, r=0),
-            height=520,
-            coloraxis_colorbar_title="R$"
-        )
-
-        st.plotly_chart(fig_mapa, use_container_width=True)
-
-# ================================================================
-# BLOCO 9 – SEÇÃO: INSIGHTS AUTOMÁTICOS
-# ================================================================
-elif menu == "💡 Insights automáticos":
-    st.title("💡 Insights automáticos – alertas estratégicos")
-
-    if df_ano.empty:
-        st.warning("Não há dados para o ano selecionado.")
-    else:
-        st.markdown(f"### Ano de referência: {ano_sel}")
-
-        anos_ordenados = sorted(df["ANO"].dropna().unique())
-        insights = []
-
-        # 1) Fundeb caindo há 3 anos
-        if len(anos_ordenados) >= 3:
-            ultimos3 = anos_ordenados[-3:]
-            df_3 = df[df["ANO"].isin(ultimos3)].copy()
-
-            queda_mun = []
-            for mun, grupo in df_3.groupby("MUNICÍPIO"):
-                g = grupo.sort_values("ANO")
-                if len(g) == 3:
-                    vals = g["Fundeb_Total"].values
-                    if np.all(np.diff(vals) < 0):
-                        queda_mun.append(mun)
-            if queda_mun:
-                insights.append(
-                    f"- ⚠️ **Fundeb em queda contínua nos últimos 3 anos** em: {', '.join(sorted(queda_mun))}."
-                )
-
-        # 2) Municípios não habilitados ao VAAR (sem recebimento)
-        df_vaar_ano = df_ano.copy()
-        nao_hab = df_vaar_ano.loc[df_vaar_ano["Compl_VAAR"] <= 0, "MUNICÍPIO"].tolist()
-        if nao_hab:
-            insights.append(
-                f"- 🚫 **Municípios que não receberam VAAR em {ano_sel}** (podem estar deixando recursos na mesa): "
-                f"{', '.join(sorted(nao_hab))}."
-            )
-
-        # 3) Dependência elevada do Fundeb (>= 50% da despesa em educação)
-        dep_alta = df_ano[df_ano["Dep_Fundeb_despesa_educ"] >= 0.50]
-        if not dep_alta.empty:
-            lista = dep_alta["MUNICÍPIO"].tolist()
-            insights.append(
-                f"- 📌 **Municípios em que o Fundeb representa 50% ou mais da despesa em educação**: "
-                f"{', '.join(sorted(lista))}."
-            )
-
-        # 4) Municípios com ICMS Educacional relativamente baixo (1º quartil)
-        q1_icms = df_ano["ICMS_Educacional"].quantile(0.25)
-        icms_baixo = df_ano[df_ano["ICMS_Educacional"] <= q1_icms]["MUNICÍPIO"].tolist()
-        if icms_baixo:
-            insights.append(
-                "- 💡 **Municípios com ICMS Educacional relativamente baixo (até o 1º quartil)**: "
-                f"{', '.join(sorted(icms_baixo))}."
-            )
-
-        if insights:
-            st.markdown("#### Principais alertas gerados automaticamente")
-            for item in insights:
-                st.markdown(item)
-        else:
-            st.info("Não foram identificados alertas relevantes com as regras atuais. Mesmo assim, o painel "
-                    "pode ser explorado para identificar oportunidades específicas.")
-
-# ================================================================
-# BLOCO 10 – SEÇÃO: DOWNLOADS
-# ================================================================
-elif menu == "📎 Downloads":
-    st.title("📎 Downloads – bases consolidadas")
-
-    st.markdown("""
-    Aqui você pode exportar as bases utilizadas no painel para aprofundar análises
-    em Excel, R, Python ou qualquer outra ferramenta.
-    """)
-
-    csv_completo = df.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig")
-
-    st.download_button(
-        "⬇️ Baixar base completa (todos os anos e municípios)",
-        data=csv_completo,
-        file_name="fundeb_icms_complementacoes_es.csv",
-        mime="text/csv",
-    )
-
-    if not df_ano.empty:
-        csv_ano = df_ano.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig")
-        st.download_button(
-            f"⬇️ Baixar base filtrada para {ano_sel}",
-            data=csv_ano,
-            file_name=f"fundeb_icms_complementacoes_es_{ano_sel}.csv",
-            mime="text/csv",
-        )
-
-# ================================================================
-# RODAPÉ
-# ================================================================
-st.markdown(
-    """
-    <hr style='margin-top:40px;'>
-    <div style='text-align:center; color:#7E7E7E; font-size:13px;'>
-        Desenvolvido por <b>Zetta Inteligência em Dados</b> · Painel Fundeb, Complementações & ICMS · 2025
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+# ================================================================
+# fundeb.py – Painel Fundeb, VAAT, VAAR & ICMS – Zetta
+# ================================================================
+from functools import reduce
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# plotly, fundeb_graficos e o GeoJSON são carregados só pelas seções que
+# desenham gráficos ou mapas: a barra lateral e os cards aparecem antes.
+
+from fundeb_cache import (
+    MAX_CONSULTAS,
+    carregar_mapa_es,
+    carregar_revisoes,
+    carregar_validacao,
+    comparacoes_revisoes,
+    conformidade,
+    dados_ano,
+    dados_anos_recentes,
+    dados_municipio,
+    dados_repasses,
+    figura_evolucao,
+    fonte_dados,
+    grafo_municipios,
+    histogramas,
+    indice_municipios,
+    indices_icms,
+    momentos_cruzamento,
+    observador_dados,
+    opcoes_navegacao,
+    perfil_memoria,
+    periodo_repasses,
+    simulacao_icms,
+    versao_vigente,
+    visao_geral_ano,
+    vizinhanca_indicador,
+)
+from fundeb_dados import (
+    COLUNAS_REPASSES,
+    COLUNAS_SIOPE,
+    INDICADORES_CRUZAMENTO,
+    INDICADORES_HISTOGRAMA,
+    NOME_DESPESAS_SIOPE,
+    NOME_INDICES_ICMS,
+    NOME_REPASSES,
+    REGRAS_CONFORMIDADE,
+    ROTULOS_VARIACOES,
+    SUBCONJUNTOS_HISTOGRAMA,
+    TOLERANCIA_RECONCILIACAO,
+    TRANSFERENCIAS,
+    combinar_momentos,
+    componentes_icms,
+    estatisticas_complementacao,
+    formatar_reais,
+    formatar_variacao,
+    matriz_correlacao,
+    nomes_exibicao,
+    regras_alerta,
+    serie_municipio,
+    tabela_variacoes,
+)
+from fundeb_vizinhanca import INDICADORES_VIZINHANCA, SIGNIFICANCIA_MORAN, moran_global
+
+# ================================================================
+# BLOCO 1 – CONFIGURAÇÕES GERAIS E ESTILO
+# ================================================================
+st.set_page_config(
+    page_title="Painel Fundeb & Complementações – Zetta",
+    page_icon="💰",
+    layout="wide"
+)
+
+st.markdown("""
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@300;400;600;700&display=swap');
+html, body, [class*="css"] {
+    font-family: 'Montserrat', sans-serif;
+    color:#5F6169;
+}
+
+/* Cards grandes do topo */
+.big-card{
+    background:#3A0057;
+    color:#fff;
+    padding:28px;
+    border-radius:14px;
+    text-align:center;
+    box-shadow:0 0 12px rgba(0,0,0,.15);
+    height:180px;                /* força mesma altura nos 3 cards */
+    display:flex;
+    flex-direction:column;
+    justify-content:center;
+}
+
+/* Cards menores */
+.small-card,.white-card{
+    padding:22px;
+    border-radius:12px;
+    text-align:center;
+    border:1px solid #E0E0E0;
+    box-shadow:0 0 6px rgba(0,0,0,.08);
+}
+.small-card{
+    background:#F3F3F3;
+    color:#3A0057;
+}
+.white-card{
+    background:#fff;
+    color:#3A0057;
+}
+
+/* Abas */
+.stTabs [data-baseweb="tab-list"] { gap: 10px; }
+.stTabs [data-baseweb="tab"] {
+  background:#fff;
+  color:#3A0057;
+  border:1px solid #E5D9EF;
+  border-radius:10px;
+  padding:10px 16px;
+}
+.stTabs [aria-selected="true"] {
+  background:#3A0057 !important;
+  color:#fff !important;
+}
+
+/* Tabelas */
+.dataframe td, .dataframe th {
+  text-align: center !important;
+  vertical-align: middle !important;
+}
+</style>
+""", unsafe_allow_html=True)
+
+# ================================================================
+# BLOCO 1b – TABELAS PAGINADAS, ORDENADAS E FILTRADAS NO SERVIDOR
+# ================================================================
+TAMANHO_PAGINA = 25
+
+
+# Formatos aplicados no navegador (st.column_config): as colunas vão no
+# payload Arrow como números – menor que o texto já formatado, ordenação
+# numérica no st.dataframe e nenhuma formatação célula a célula no
+# servidor. "localized" segue o idioma do navegador (1.234.567 em pt-BR);
+# o `step` fixa as casas decimais.
+def coluna_reais(rotulo):
+    """Valores em reais, sem casas decimais."""
+    return st.column_config.NumberColumn(
+        rotulo if "R$" in rotulo else f"{rotulo} (R$)", format="localized", step=1
+    )
+
+
+def coluna_inteiro(rotulo):
+    return st.column_config.NumberColumn(rotulo, format="localized", step=1)
+
+
+def coluna_percentual(rotulo):
+    """Razões (0,123) exibidas como percentual com uma casa (12,3%)."""
+    return st.column_config.NumberColumn(rotulo, format="percent", step=0.001)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+def ordens_de_classificacao(_tabela, chave_cache, colunas):
+    """
+    Pré-calcula, para cada coluna numérica, a ordem crescente e a
+    decrescente das linhas (NaN sempre ao final).
+
+    `_tabela` não entra no hash do cache: a `chave_cache` (tabela, versão
+    dos dados e ano) identifica o conteúdo. Limitado a MAX_CONSULTAS
+    entradas, para que as ordens de versões antigas saiam da memória.
+    """
+    ordens = {}
+    for c in colunas:
+        valores = _tabela[c].to_numpy(dtype="float64", na_value=np.nan)
+        ordens[(c, True)] = np.argsort(valores, kind="stable")
+        ordens[(c, False)] = np.argsort(-valores, kind="stable")
+    return ordens
+
+
+def tabela_paginada(tabela, chave, chave_cache, formatos, coluna_busca, ordem_padrao):
+    """
+    Exibe `tabela` com ordenação, filtro e paginação feitos no servidor:
+    apenas a página visível é enviada ao navegador, com os números
+    formatados por ele.
+
+    - formatos: {coluna numérica: st.column_config (coluna_reais, ...)}
+    - coluna_busca: coluna de texto usada no filtro por nome
+    - ordem_padrao: coluna numérica usada na ordenação inicial (decrescente)
+      e no filtro "Somente quem recebe"
+    """
+    colunas_num = list(formatos.keys())
+    ordens = ordens_de_classificacao(tabela, chave_cache, tuple(colunas_num))
+
+    c_ord, c_dir, c_busca, c_pos = st.columns([2, 1, 2, 1.2])
+    col_ord = c_ord.selectbox(
+        "Ordenar por", colunas_num, index=colunas_num.index(ordem_padrao), key=f"{chave}_ordem"
+    )
+    crescente = c_dir.radio(
+        "Sentido", ["Decrescente", "Crescente"], horizontal=True, key=f"{chave}_sentido"
+    ) == "Crescente"
+    busca = c_busca.text_input(f"Filtrar {coluna_busca.lower()}", key=f"{chave}_busca")
+    somente_pos = c_pos.checkbox(
+        "Somente quem recebe", value=False, key=f"{chave}_positivos",
+        help=f"Mantém apenas as linhas com {ordem_padrao} maior que zero."
+    )
+
+    ordem = ordens[(col_ord, crescente)]
+
+    filtro = np.ones(len(tabela), dtype=bool)
+    if busca:
+        filtro &= tabela[coluna_busca].astype(str).str.contains(busca, case=False, regex=False).to_numpy()
+    if somente_pos:
+        filtro &= (tabela[ordem_padrao] > 0).fillna(False).to_numpy(dtype=bool)
+    ordem = ordem[filtro[ordem]]
+
+    n_linhas = len(ordem)
+    n_paginas = max(1, -(-n_linhas // TAMANHO_PAGINA))
+    pagina = st.number_input(
+        f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1, step=1,
+        key=f"{chave}_pagina"
+    )
+    inicio = (int(pagina) - 1) * TAMANHO_PAGINA
+    fim = min(inicio + TAMANHO_PAGINA, n_linhas)
+
+    pagina_df = tabela.iloc[ordem[inicio:fim]]
+
+    st.dataframe(pagina_df, use_container_width=True, hide_index=True, column_config=formatos)
+    st.caption(
+        f"Exibindo {inicio + 1 if n_linhas else 0}–{fim} de {n_linhas} municípios "
+        f"(de {len(tabela)} no ano)."
+    )
+
+
+# ================================================================
+# BLOCO 1c – FIGURAS COM LIMITE DE PAYLOAD
+# ================================================================
+def exibir_figura(fig):
+    """
+    Envia a figura ao navegador apenas se o JSON couber em
+    LIMITE_PAYLOAD_BYTES; caso contrário, mostra um aviso. O tamanho é
+    estimado pela contagem de pontos (fundeb_graficos.excede_payload):
+    só figuras perto do limite são serializadas para medir.
+    """
+    from fundeb_graficos import LIMITE_PAYLOAD_BYTES, excede_payload
+
+    excede, tamanho = excede_payload(fig)
+    if excede:
+        st.warning(
+            f"Gráfico omitido: {tamanho / 1e6:.1f} MB excede o limite de "
+            f"{LIMITE_PAYLOAD_BYTES / 1e6:.1f} MB. Reduza a quantidade de municípios."
+        )
+        return
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# ================================================================
+# BLOCO 3 – SIDEBAR E NAVEGAÇÃO
+# ================================================================
+# Logo e título saem antes da carga da base (primeira pintura mais rápida)
+st.sidebar.image("assets/logotipo_zetta_branco.png", use_container_width=True)
+st.sidebar.title("Navegação")
+
+# Versão dos dados desta execução (BLOCO 2f do fundeb_cache.py), lida uma
+# só vez: todas as seções veem a mesma base, mesmo que a recarga a quente
+# troque a versão vigente no meio da execução
+observador_dados()
+versao = versao_vigente()
+if st.session_state.get("versao_dados") not in (None, versao):
+    st.toast("Os dados foram atualizados: o painel já mostra a planilha nova.", icon="🔄")
+st.session_state["versao_dados"] = versao
+
+# As seções consultam só o que exibem (ver fundeb_consultas.py); 2020 já
+# vem excluído de todas as análises
+anos_disponiveis, _ = opcoes_navegacao(versao)
+ano_sel = st.sidebar.selectbox("Ano de análise", anos_disponiveis, index=len(anos_disponiveis)-1)
+
+# Busca no índice (fundeb_busca.py): só os melhores resultados vão para a
+# caixa de seleção, e não a lista inteira de municípios. As opções são
+# códigos IBGE (nomes se repetem entre estados), exibidas como "nome – UF"
+indice_mun = indice_municipios(versao)
+busca_mun = st.sidebar.text_input(
+    "Buscar município (nome ou código IBGE)", key="busca_municipio", placeholder="ex.: vitoria ou 3205309"
+)
+opcoes_mun = indice_mun.buscar(busca_mun)
+atual_mun = st.session_state.get("municipio_sel")
+if not busca_mun and atual_mun in indice_mun and atual_mun not in opcoes_mun:
+    opcoes_mun = [atual_mun] + opcoes_mun[:-1]
+if not opcoes_mun:
+    st.sidebar.caption("Nenhum município encontrado.")
+    opcoes_mun = [atual_mun] if atual_mun in indice_mun else indice_mun.buscar("")
+
+codigo_sel = st.sidebar.selectbox(
+    "Município (para análises focadas)",
+    opcoes_mun,
+    key="municipio_sel",
+    format_func=indice_mun.rotulo,
+)
+municipio_sel = indice_mun.nome(codigo_sel)
+
+menu = st.sidebar.radio(
+    "Escolha a seção:",
+    [
+        "📊 Visão geral dos recursos",
+        "💰 Fundeb – Diagnóstico",
+        "📅 Repasses mensais",
+        "🏛️ Complementações da União (VAAT & VAAR)",
+        "📈 Comparativos e cruzamentos",
+        "🗺️ Mapa estadual (visão conceitual)",
+        "🧮 Simulador do ICMS Educacional",
+        "🧭 Vizinhança e agrupamentos",
+        "✅ Conformidade fiscal",
+        "💡 Insights automáticos",
+        "🩺 Qualidade dos dados",
+        "🔁 Revisões dos dados",
+        "📎 Downloads"
+    ],
+    index=0
+)
+st.sidebar.caption(f"Versão dos dados: {versao[-8:]}")
+
+df_ano = dados_ano(versao, ano_sel)
+
+# ================================================================
+# BLOCO 4 – SEÇÃO: VISÃO GERAL DOS RECURSOS
+# ================================================================
+if menu == "📊 Visão geral dos recursos":
+    st.title(f"📊 Visão Geral dos Recursos Educacionais – Espírito Santo ({ano_sel})")
+
+    if df_ano.empty:
+        st.warning("Não há dados para o ano selecionado.")
+    else:
+        # Agregados estaduais (em cache por ano; ver fundeb_cache.py)
+        agregados = visao_geral_ano(versao, ano_sel)
+        total_fundeb_base = agregados["fundeb_base"]
+        total_compl = agregados["complementacoes"]
+        total_icms_educ = agregados["icms_educacional"]
+        dep_fundeb_educ = agregados["dep_fundeb_educ"]
+        dep_fundeb_orc = agregados["dep_fundeb_orc"]
+
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.markdown(f"""
+            <div class="big-card">
+                <h3>Fundeb base</h3>
+                <h1 style='font-size:34px;margin-top:-4px;'>{formatar_reais(total_fundeb_base)}</h1>
+            </div>
+            """, unsafe_allow_html=True)
+        with c2:
+            st.markdown(f"""
+            <div class="big-card">
+                <h3>Complementações (VAAF + VAAT + VAAR)</h3>
+                <h1 style='font-size:34px;margin-top:-4px;'>{formatar_reais(total_compl)}</h1>
+            </div>
+            """, unsafe_allow_html=True)
+        with c3:
+            st.markdown(f"""
+            <div class="big-card">
+                <h3>ICMS Educacional</h3>
+                <h1 style='font-size:34px;margin-top:-4px;'>{formatar_reais(total_icms_educ)}</h1>
+            </div>
+            """, unsafe_allow_html=True)
+
+        st.markdown("---")
+        st.markdown(f"""
+        **Peso do Fundeb base:**
+
+        • Fundeb base / Despesa em educação: 
+        **{(dep_fundeb_educ*100 if pd.notna(dep_fundeb_educ) else 0):.1f}%**  
+        • Fundeb base / Orçamento total da prefeitura:
+        **{(dep_fundeb_orc*100 if pd.notna(dep_fundeb_orc) else 0):.1f}%**
+        """)
+
+        st.markdown("---")
+        st.subheader("Evolução anual – Fundeb base, complementações e ICMS Educacional")
+
+        fig = figura_evolucao(versao)
+        st.plotly_chart(fig, use_container_width=True)
+
+# ================================================================
+# BLOCO 5 – SEÇÃO: FUNDEB – DIAGNÓSTICO
+# ================================================================
+elif menu == "💰 Fundeb – Diagnóstico":
+    st.title("💰 Fundeb – Diagnóstico por município")
+
+    df_mun = serie_municipio(dados_municipio(versao, codigo_sel), municipio_sel, codigo_sel)
+
+    if df_mun.empty:
+        st.warning("Não há dados para o município selecionado.")
+    else:
+        st.markdown(f"### {municipio_sel} – Fundeb base e complementações ao longo do tempo")
+
+        from fundeb_graficos import figura_fundeb_municipio
+
+        fig_fund_mun = figura_fundeb_municipio(df_mun, municipio_sel)
+        st.plotly_chart(fig_fund_mun, use_container_width=True)
+
+        st.markdown("#### Tabela – Fundeb base, complementações e total (com variações ano a ano)")
+
+        base_tab = tabela_variacoes(df_mun)
+
+        st.dataframe(
+            base_tab.rename(columns=ROTULOS_VARIACOES).set_index("ANO"),
+            use_container_width=True,
+            column_config={
+                rotulo: coluna_percentual(rotulo) if c.startswith("Dif_perc") else coluna_reais(rotulo)
+                for c, rotulo in ROTULOS_VARIACOES.items()
+            },
+        )
+
+        st.caption(
+            "Fundeb base = receita do Fundeb antes das complementações. "
+            "Complementações = VAAF + VAAT + VAAR. "
+            "Fundeb total = Fundeb base + complementações."
+        )
+
+        # Indicadores por aluno: só quando há microdados do Censo Escolar
+        if "Matriculas_Ponderadas" in df_mun.columns and df_mun["Matriculas_Ponderadas"].notna().any():
+            st.markdown("#### Fundeb por aluno – matrículas da rede municipal (Censo Escolar)")
+            por_aluno = df_mun[["ANO", "Matriculas", "Matriculas_Ponderadas", "Fundeb_por_aluno"]].copy()
+            por_aluno["VAAT antes da compl. (planilha)"] = df_mun.get(
+                "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)", np.nan
+            )
+            por_aluno["ANO"] = por_aluno["ANO"].astype(int)
+            por_aluno.rename(columns={
+                "Matriculas": "Matrículas",
+                "Matriculas_Ponderadas": "Matrículas ponderadas",
+                "Fundeb_por_aluno": "Fundeb total por matrícula ponderada",
+            }, inplace=True)
+            st.dataframe(
+                por_aluno.set_index("ANO"),
+                use_container_width=True,
+                column_config={
+                    "Matrículas": coluna_inteiro("Matrículas"),
+                    "Matrículas ponderadas": coluna_inteiro("Matrículas ponderadas"),
+                    "Fundeb total por matrícula ponderada": coluna_reais("Fundeb total por matrícula ponderada"),
+                    "VAAT antes da compl. (planilha)": coluna_reais("VAAT antes da compl. (planilha)"),
+                },
+            )
+            st.caption(
+                "Matrículas do Censo Escolar do ano anterior (base da distribuição do Fundeb), "
+                "ponderadas pelos fatores de referência de cada etapa."
+            )
+
+# ================================================================
+# BLOCO 5b – SEÇÃO: REPASSES MENSAIS
+# ================================================================
+elif menu == "📅 Repasses mensais":
+    st.title("📅 Repasses mensais – acompanhamento dentro do ano")
+
+    periodo = periodo_repasses(versao)
+
+    if periodo is None:
+        st.info(
+            f"Para acompanhar os repasses ao longo do ano, coloque o arquivo **{NOME_REPASSES}** "
+            "na mesma pasta da planilha, com as colunas "
+            f"{', '.join(f'*{c}*' for c in COLUNAS_REPASSES)} (separador \";\", decimal \",\")."
+        )
+    else:
+        c_transf, c_gran = st.columns([2, 1])
+        transferencia = c_transf.selectbox("Transferência", TRANSFERENCIAS)
+        granularidade = c_gran.radio("Granularidade", ["Como recebido", "Mensal"], horizontal=True)
+
+        from fundeb_graficos import MAX_SERIES_REPASSES
+
+        # opções (códigos IBGE) = já escolhidos + município da barra lateral +
+        # resultados da busca (não a lista inteira); a seleção inicial é
+        # semeada uma vez no session_state, pois um default fora das opções
+        # derruba o widget
+        busca_rep = st.text_input("Buscar municípios para adicionar", key="busca_repasses")
+        if "municipios_rep" not in st.session_state:
+            st.session_state["municipios_rep"] = [codigo_sel]
+        escolhidos_rep = list(st.session_state["municipios_rep"])
+        opcoes_rep = list(dict.fromkeys([*escolhidos_rep, codigo_sel, *indice_mun.buscar(busca_rep)]))
+        municipios_rep = st.multiselect(
+            "Municípios", opcoes_rep, key="municipios_rep", max_selections=MAX_SERIES_REPASSES,
+            format_func=indice_mun.rotulo,
+        )
+
+        inicio, fim = st.slider(
+            "Período",
+            min_value=periodo[0].date(),
+            max_value=periodo[1].date(),
+            value=(periodo[0].date(), periodo[1].date()),
+            format="MM/YYYY",
+        )
+
+        if not municipios_rep:
+            st.info("Escolha ao menos um município.")
+        else:
+            df_rep = dados_repasses(
+                versao, tuple(municipios_rep), transferencia, inicio, fim, granularidade == "Mensal"
+            )
+
+            if df_rep.empty:
+                st.warning("Não há repasses desta transferência para os municípios e o período escolhidos.")
+            else:
+                from fundeb_graficos import figura_repasses
+                fig_rep, n_pontos, n_desenhados = figura_repasses(df_rep, transferencia)
+                exibir_figura(fig_rep)
+                if n_desenhados < n_pontos:
+                    desenhados_txt = f"{n_desenhados:,}".replace(",", ".")
+                    pontos_txt = f"{n_pontos:,}".replace(",", ".")
+                    st.caption(
+                        f"{desenhados_txt} de {pontos_txt} pontos desenhados: cada linha foi reduzida "
+                        "no servidor (LTTB), preservando picos e vales."
+                    )
+
+                totais = (
+                    df_rep.groupby("MUNICÍPIO", observed=True)["Valor"]
+                    .agg(["sum", "count"])
+                    .rename(columns={"sum": "Total no período", "count": "Repasses"})
+                    .sort_values("Total no período", ascending=False)
+                )
+                st.dataframe(
+                    totais,
+                    use_container_width=True,
+                    column_config={"Total no período": coluna_reais("Total no período")},
+                )
+
+# ================================================================
+# BLOCO 6 – SEÇÃO: COMPLEMENTAÇÕES DA UNIÃO (VAAT & VAAR)
+# ================================================================
+elif menu == "🏛️ Complementações da União (VAAT & VAAR)":
+    st.title("🏛️ Complementações da União – VAAT & VAAR")
+
+    st.info(
+        "O Espírito Santo, por não estar abaixo do valor mínimo por aluno do VAAF, "
+        "não recebe a complementação VAAF – nem o Estado, nem seus municípios. "
+        "Por isso, os valores de VAAF permanecem zerados nesta base."
+    )
+
+    if df_ano.empty:
+        st.warning("Não há dados para o ano selecionado.")
+    else:
+        import plotly.express as px
+        from fundeb_graficos import figura_histograma, figura_reguinha
+
+        mapa_es = carregar_mapa_es(versao)
+
+        # ---------------- VAAT ----------------
+        st.subheader("🔹 Complementação VAAT – mínimo Brasil, valores e complementos")
+
+        df_vaat = df_ano.copy()
+
+        col_vaat1, col_vaat2 = st.columns([1.4, 1])
+        with col_vaat1:
+            qtde_recebe = int(df_vaat["Recebe_VAAT"].sum())
+            st.markdown(f"""
+            <div class="white-card">
+                <h4>Municípios que recebem VAAT – {ano_sel}</h4>
+                <h2 style='margin-top:-4px;'>{qtde_recebe} de {len(df_vaat)}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+        with col_vaat2:
+            valor_total_vaat = df_vaat["Compl_VAAT"].sum(skipna=True)
+            st.markdown(f"""
+            <div class="small-card">
+                <h4>Total de complementação VAAT</h4>
+                <h2 style='margin-top:-4px;'>{formatar_reais(valor_total_vaat)}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+
+        st.markdown("#### VAAT mínimo, valor com complementação e complementação recebida")
+        cols_exibir = [
+            "MUNICÍPIO",
+            "VAAT Mínimo Brasil",
+            "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)",
+            "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)",
+            "Compl_VAAT",
+        ]
+        df_vaat_tab = df_vaat[cols_exibir].reset_index(drop=True)
+        df_vaat_tab.rename(columns={
+            "VAAT Mínimo Brasil": "VAAT mínimo (Brasil)",
+            "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)": "VAAT antes da compl. (R$)",
+            "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)": "VAAT após compl. (R$)",
+            "Compl_VAAT": "Complementação VAAT (R$)",
+        }, inplace=True)
+
+        # >>> NOVO: ordenação, filtro e paginação no servidor (valores numéricos)
+        tabela_paginada(
+            df_vaat_tab,
+            chave="tabela_vaat",
+            chave_cache=f"tabela_vaat_{versao}_{ano_sel}",
+            formatos={
+                c: coluna_reais(c)
+                for c in ["VAAT mínimo (Brasil)", "VAAT antes da compl. (R$)",
+                          "VAAT após compl. (R$)", "Complementação VAAT (R$)"]
+            },
+            coluna_busca="MUNICÍPIO",
+            ordem_padrao="Complementação VAAT (R$)",
+        )
+
+        # Estatísticas VAAT (mín, mediana, média, máx + município selecionado)
+        st.markdown("#### Estatísticas da complementação VAAT")
+        estat_vaat = estatisticas_complementacao(df_vaat, "Compl_VAAT", municipio_sel, codigo_sel)
+        if estat_vaat is not None:
+            c1, c2, c3, c4, c5 = st.columns(5)
+            c1.metric("Mínimo (entre os que recebem)", formatar_reais(estat_vaat["minimo"]))
+            c2.metric("Mediana", formatar_reais(estat_vaat["mediana"]))
+            c3.metric("Média", formatar_reais(estat_vaat["media"]))
+            c4.metric("Máximo", formatar_reais(estat_vaat["maximo"]))
+            c5.metric(f"{municipio_sel}", formatar_reais(estat_vaat["valor_municipio"]))
+
+            # >>> NOVO: “reguinha” visual tipo bullet chart
+            st.markdown("##### Distribuição visual dos valores de VAAT (entre os que recebem)")
+            fig_vaat_stats = figura_reguinha(estat_vaat, "VAAT", municipio_sel)
+            st.plotly_chart(fig_vaat_stats, use_container_width=True)
+
+            st.markdown("##### Histograma dos valores de VAAT (entre os que recebem)")
+            st.plotly_chart(figura_histograma(
+                histogramas(versao)["Compl_VAAT"], ano_sel, "Recebem VAAT",
+                "Complementação VAAT (R$)", estat_vaat["valor_municipio"], municipio_sel,
+            ), use_container_width=True)
+
+        else:
+            st.info("Nenhum município recebeu VAAT no ano selecionado na base utilizada.")
+
+        st.markdown("#### Mapa – Municípios que recebem VAAT")
+        df_vaat_mapa = df_vaat.copy()
+        # zeros viram NaN para ficarem sem cor
+        df_vaat_mapa["Compl_VAAT_plot"] = df_vaat_mapa["Compl_VAAT"].replace(0, np.nan)
+
+        fig_vaat_mapa = px.choropleth(
+            df_vaat_mapa,
+            geojson=mapa_es,
+            locations="Codigo_IBGE_str",
+            featureidkey="properties.CD_MUN",
+            color="Compl_VAAT_plot",
+            hover_name="MUNICÍPIO",
+            color_continuous_scale="Purples",
+            labels={"Compl_VAAT_plot": "VAAT (R$)"},
+        )
+        fig_vaat_mapa.update_geos(
+            fitbounds="locations",
+            visible=False,
+            lonaxis_range=[-41.5, -39.0],
+            lataxis_range=[-21.5, -18.0],
+        )
+        fig_vaat_mapa.update_layout(
+            margin=dict(t=0, b=0, l=0, r=0),
+            height=500,
+            coloraxis_colorbar_title="VAAT (R$)"
+        )
+        st.plotly_chart(fig_vaat_mapa, use_container_width=True)
+
+        st.markdown("---")
+        st.subheader("🔹 Complementação VAAR – habilitação, ranking e disparidades")
+
+        df_vaar = df_ano.copy()
+        df_vaar["Status_VAAR"] = np.where(df_vaar["Recebe_VAAR"], "Habilitado (recebeu VAAR)", "Não habilitado")
+
+        # Cards para VAAR
+        col_vaar1, col_vaar2 = st.columns([1.4, 1])
+        with col_vaar1:
+            qtde_recebe_vaar = int(df_vaar["Recebe_VAAR"].sum())
+            st.markdown(f"""
+            <div class="white-card">
+                <h4>Municípios que recebem VAAR – {ano_sel}</h4>
+                <h2 style='margin-top:-4px;'>{qtde_recebe_vaar} de {len(df_vaar)}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+        with col_vaar2:
+            valor_total_vaar = df_vaar["Compl_VAAR"].sum(skipna=True)
+            st.markdown(f"""
+            <div class="small-card">
+                <h4>Total de complementação VAAR</h4>
+                <h2 style='margin-top:-4px;'>{formatar_reais(valor_total_vaar)}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+
+        st.markdown("#### Ranking VAAR – valores recebidos por município")
+        rank_vaar = df_vaar[["MUNICÍPIO", "Compl_VAAR"]].reset_index(drop=True)
+
+        tabela_paginada(
+            rank_vaar,
+            chave="tabela_vaar",
+            chave_cache=f"tabela_vaar_{versao}_{ano_sel}",
+            formatos={"Compl_VAAR": coluna_reais("Complementação VAAR")},
+            coluna_busca="MUNICÍPIO",
+            ordem_padrao="Compl_VAAR",
+        )
+
+        st.markdown("#### Disparidade nos valores de VAAR recebidos")
+        estat_vaar = estatisticas_complementacao(df_vaar, "Compl_VAAR", municipio_sel, codigo_sel)
+        if estat_vaar is not None:
+            c1, c2, c3, c4, c5 = st.columns(5)
+            c1.metric("Mínimo (entre os que recebem)", formatar_reais(estat_vaar["minimo"]))
+            c2.metric("Mediana", formatar_reais(estat_vaar["mediana"]))
+            c3.metric("Média", formatar_reais(estat_vaar["media"]))
+            c4.metric("Máximo", formatar_reais(estat_vaar["maximo"]))
+            c5.metric(f"{municipio_sel}", formatar_reais(estat_vaar["valor_municipio"]))
+
+            st.markdown("##### Distribuição visual dos valores de VAAR (entre os que recebem)")
+            fig_vaar_stats = figura_reguinha(estat_vaar, "VAAR", municipio_sel)
+            st.plotly_chart(fig_vaar_stats, use_container_width=True)
+
+            st.markdown("##### Histograma dos valores de VAAR (entre os que recebem)")
+            st.plotly_chart(figura_histograma(
+                histogramas(versao)["Compl_VAAR"], ano_sel, "Recebem VAAR",
+                "Complementação VAAR (R$)", estat_vaar["valor_municipio"], municipio_sel,
+            ), use_container_width=True)
+
+        else:
+            st.info("Nenhum município recebeu VAAR no ano selecionado na base utilizada.")
+
+        st.markdown("#### Mapa – Municípios que receberam VAAR")
+        df_vaar_mapa = df_vaar.copy()
+        df_vaar_mapa["Compl_VAAR_plot"] = df_vaar_mapa["Compl_VAAR"].replace(0, np.nan)
+
+        fig_vaar_mapa = px.choropleth(
+            df_vaar_mapa,
+            geojson=mapa_es,
+            locations="Codigo_IBGE_str",
+            featureidkey="properties.CD_MUN",
+            color="Compl_VAAR_plot",
+            hover_name="MUNICÍPIO",
+            color_continuous_scale="Tealrose",
+            labels={"Compl_VAAR_plot": "VAAR (R$)"},
+        )
+        fig_vaar_mapa.update_geos(
+            fitbounds="locations",
+            visible=False,
+            lonaxis_range=[-41.5, -39.0],
+            lataxis_range=[-21.5, -18.0],
+        )
+        fig_vaar_mapa.update_layout(
+            margin=dict(t=0, b=0, l=0, r=0),
+            height=500,
+            coloraxis_colorbar_title="VAAR (R$)"
+        )
+        st.plotly_chart(fig_vaar_mapa, use_container_width=True)
+
+# ================================================================
+# BLOCO 7 – SEÇÃO: COMPARATIVOS E CRUZAMENTOS
+# ================================================================
+elif menu == "📈 Comparativos e cruzamentos":
+    st.title("📈 Comparativos e cruzamentos – Fundeb, ICMS e complementações")
+
+    if df_ano.empty:
+        st.warning("Não há dados para o ano selecionado.")
+    else:
+        from fundeb_graficos import (
+            LIMITE_BARRAS,
+            MAX_MUNICIPIOS_GRAFICO,
+            figura_composicao,
+            figura_correlacao,
+            figura_dispersao,
+            figura_estrutura_percentual,
+            figura_histograma,
+            top_n_com_demais,
+            usa_webgl,
+        )
+
+        # --------------------------------------------------------
+        # Seleção de quantidade de municípios (para melhorar leitura)
+        # --------------------------------------------------------
+        n_total = len(df_ano)
+        n_default = min(20, n_total)
+        qtd_mun = st.slider(
+            "Quantidade de municípios a exibir (ordenados pelo total de recursos):",
+            min_value=min(5, n_total),
+            max_value=min(n_total, MAX_MUNICIPIOS_GRAFICO),
+            value=n_default,
+            step=1,
+        )
+
+        # homônimos de outros estados ganham a UF no nome (barras e pontos
+        # distintos); o destaque é o nome exibido do município selecionado
+        df_base = df_ano.copy()
+        df_base["MUNICÍPIO"] = nomes_exibicao(df_base)
+        nome_destaque = df_base.loc[(df_base["Código IBGE"] == codigo_sel).fillna(False), "MUNICÍPIO"]
+        nome_destaque = nome_destaque.iloc[0] if not nome_destaque.empty else municipio_sel
+        df_base["Complementacoes"] = (
+            df_base["Compl_VAAF"] +
+            df_base["Compl_VAAT"] +
+            df_base["Compl_VAAR"]
+        )
+        df_base["Total_Receitas_Chave"] = df_base["Fundeb_Total"] + df_base["ICMS_Educacional"]
+
+        # Top N por seleção parcial + linha "Demais municípios" com a soma do restante
+        df_top = top_n_com_demais(
+            df_base,
+            "Total_Receitas_Chave",
+            qtd_mun,
+            ["Fundeb_Base", "Complementacoes", "Compl_VAAT", "Compl_VAAR",
+             "ICMS_Educacional", "Total_Receitas_Chave"],
+        )
+
+        # --------------------------------------------------------
+        # A) TABELA – Fundeb base, complementações, ICMS e total
+        # --------------------------------------------------------
+        st.markdown("### Tabela – Recursos educacionais por município")
+
+        tab_exib = df_top[[
+            "MUNICÍPIO",
+            "Fundeb_Base",
+            "Complementacoes",
+            "ICMS_Educacional",
+            "Total_Receitas_Chave"
+        ]].copy()
+
+        tab_exib.rename(columns={
+            "MUNICÍPIO": "Município",
+            "Fundeb_Base": "Fundeb base",
+            "Complementacoes": "Complementações",
+            "ICMS_Educacional": "ICMS Educacional",
+            "Total_Receitas_Chave": "Total (Fundeb + ICMS Educ.)"
+        }, inplace=True)
+
+        st.dataframe(
+            tab_exib.set_index("Município"),
+            use_container_width=True,
+            column_config={c: coluna_reais(c) for c in tab_exib.columns if c != "Município"},
+        )
+
+        # --------------------------------------------------------
+        # B) GRÁFICO – Barras empilhadas horizontais (subset)
+        # --------------------------------------------------------
+        st.markdown("### Gráfico – Composição dos recursos educacionais por município")
+
+        if usa_webgl(len(df_top)):
+            st.caption(
+                f"Com mais de {LIMITE_BARRAS} municípios, cada ponto é um município na sua "
+                "posição do ranking."
+            )
+
+        fig_bar = figura_composicao(
+            df_top, nome_destaque, f"Recursos educacionais por município – {ano_sel}"
+        )
+        exibir_figura(fig_bar)
+
+        # --------------------------------------------------------
+        # C) Estrutura percentual dos recursos (mesmo subset)
+        # --------------------------------------------------------
+        st.markdown("### Estrutura percentual dos recursos educacionais por município")
+
+        fig_stack = figura_estrutura_percentual(df_top)
+        exibir_figura(fig_stack)
+
+        # --------------------------------------------------------
+        # D) Distribuição dos indicadores (histogramas pré-calculados)
+        # --------------------------------------------------------
+        st.markdown("### Distribuição dos indicadores entre os municípios")
+
+        hists = histogramas(versao)
+        d1, d2 = st.columns(2)
+        indicador_hist = d1.selectbox(
+            "Indicador", [c for c in INDICADORES_HISTOGRAMA if c in hists], key="indicador_hist"
+        )
+        subconjunto_hist = d2.radio(
+            "Municípios", list(SUBCONJUNTOS_HISTOGRAMA), horizontal=True, key="subconjunto_hist"
+        )
+        hist = hists[indicador_hist]
+        valor_mun_hist = df_ano.loc[(df_ano["Código IBGE"] == codigo_sel).fillna(False), indicador_hist]
+        exibir_figura(figura_histograma(
+            hist, ano_sel, subconjunto_hist, indicador_hist,
+            float(valor_mun_hist.iloc[0]) if not valor_mun_hist.empty else np.nan, municipio_sel,
+        ))
+        fora_hist = int(hist["fora"][subconjunto_hist][np.searchsorted(hist["anos"], ano_sel)])
+        if fora_hist:
+            st.caption(f"{fora_hist} município(s) com valor zerado ou negativo ficam fora da escala log.")
+
+        # --------------------------------------------------------
+        # E) Cruzamentos – correlação e dispersão entre indicadores
+        # --------------------------------------------------------
+        st.markdown("### Cruzamentos – correlação entre indicadores")
+
+        momentos = momentos_cruzamento(versao)
+        anos_corr = st.multiselect(
+            "Anos considerados na correlação", list(momentos), default=[ano_sel], key="anos_corr"
+        )
+        if not anos_corr:
+            st.info("Selecione ao menos um ano.")
+        else:
+            corr = matriz_correlacao(reduce(combinar_momentos, [momentos[a] for a in sorted(anos_corr)]))
+            st.caption("Correlação de Pearson; cada par usa os municípios (e anos) com os dois indicadores preenchidos.")
+            exibir_figura(figura_correlacao(corr))
+
+        st.markdown(f"#### Dispersão entre dois indicadores – {ano_sel}")
+        e1, e2, e3 = st.columns([2, 2, 1])
+        eixo_x = e1.selectbox("Eixo X", INDICADORES_CRUZAMENTO, index=0, key="cruz_x")
+        eixo_y = e2.selectbox("Eixo Y", INDICADORES_CRUZAMENTO, index=2, key="cruz_y")
+        log_cruz = e3.checkbox("Escala log", value=True, key="cruz_log")
+        fig_disp, n_validos, n_desenhados = figura_dispersao(df_base, eixo_x, eixo_y, nome_destaque, log=log_cruz)
+        if n_desenhados < n_validos:
+            st.caption(f"{n_desenhados:,} de {n_validos:,}".replace(",", ".") +
+                       " municípios desenhados (pontos sobrepostos raleados; isolados preservados).")
+        exibir_figura(fig_disp)
+
+# ================================================================
+# BLOCO 8 – SEÇÃO: MAPA ESTADUAL (AGORA REAL)
+# ================================================================
+elif menu == "🗺️ Mapa estadual (visão conceitual)":
+    st.title("🗺️ Mapa estadual – recursos educacionais")
+
+    if df_ano.empty:
+        st.warning("Não há dados para o ano selecionado.")
+    else:
+        import plotly.express as px
+
+        mapa_es = carregar_mapa_es(versao)
+
+        st.markdown("Escolha qual indicador deseja visualizar no mapa:")
+
+        opcoes_indicador = {
+            "Fundeb base (Receita da contribuição de estados e municípios ao Fundeb)": "Fundeb_Base",
+            "Complementações (VAAF + VAAT + VAAR)": "Compl_Total",
+            "Fundeb total (base + complementações)": "Fundeb_Total",
+            "ICMS Educacional": "ICMS_Educacional",
+        }
+
+        df_mapa = df_ano.copy()
+        df_mapa["Compl_Total"] = (
+            df_mapa["Compl_VAAF"] +
+            df_mapa["Compl_VAAT"] +
+            df_mapa["Compl_VAAR"]
+        )
+
+        escolha = st.selectbox(
+            "Indicador para o mapa:",
+            list(opcoes_indicador.keys())
+        )
+        col_ind = opcoes_indicador[escolha]
+
+        df_mapa["valor_plot"] = df_mapa[col_ind].replace(0, np.nan)
+
+        fig_mapa = px.choropleth(
+            df_mapa,
+            geojson=mapa_es,
+            locations="Codigo_IBGE_str",
+            featureidkey="properties.CD_MUN",
+            color="valor_plot",
+            hover_name="MUNICÍPIO",
+            color_continuous_scale="Viridis",
+            labels={"valor_plot": "Valor (R$)"},
+        )
+        fig_mapa.update_geos(
+            fitbounds="locations",
+            visible=False,
+            lonaxis_range=[-41.5, -39.0],
+            lataxis_range=[-21.5, -18.0],
+        )
+        fig_mapa.update_layout(
+            margin=dict(t=0, b=0, l=0, r=0),
+            height=520,
+            coloraxis_colorbar_title="R$"
+        )
+
+        st.plotly_chart(fig_mapa, use_container_width=True)
+
+# ================================================================
+# BLOCO 8b – SEÇÃO: SIMULADOR DO ICMS EDUCACIONAL
+# ================================================================
+elif menu == "🧮 Simulador do ICMS Educacional":
+    st.title("🧮 Simulador do ICMS Educacional – pesos do índice de qualidade")
+
+    indices = indices_icms(versao)
+    montante = float(df_ano["ICMS_Educacional"].sum()) if not df_ano.empty else 0.0
+
+    if indices is None:
+        st.info(
+            f"Para simular a distribuição, coloque o arquivo **{NOME_INDICES_ICMS}** na mesma pasta da "
+            "planilha, com as colunas *Código IBGE*, *ANO* (opcional) e uma coluna com a nota de cada "
+            "componente do índice (separador \";\", decimal \",\")."
+        )
+    elif not componentes_icms(indices):
+        st.warning(f"O arquivo {NOME_INDICES_ICMS} não tem colunas de componentes além de Código IBGE e ANO.")
+    elif montante <= 0:
+        st.warning(f"Não há ICMS Educacional realizado em {ano_sel}. Escolha outro ano na barra lateral.")
+    else:
+        componentes = componentes_icms(indices)
+        st.markdown(
+            f"O ICMS Educacional realizado em {ano_sel} (**{formatar_reais(montante)}**) é redistribuído "
+            "em cada cenário: cada componente reparte a sua parcela (o seu peso) na proporção da nota do "
+            "município no total estadual do componente. Edite, inclua ou remova cenários na tabela."
+        )
+
+        # Cenários: uma linha por conjunto de pesos (todos calculados de uma vez)
+        cenarios_padrao = pd.DataFrame(
+            [["Pesos iguais", *[1.0] * len(componentes)]]
+            + [[f"Ênfase em {c}", *[2.0 if d == c else 1.0 for d in componentes]] for c in componentes],
+            columns=["Cenário", *componentes],
+        )
+        cenarios_editados = st.data_editor(
+            cenarios_padrao,
+            key="cenarios_icms",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                c: st.column_config.NumberColumn(c, min_value=0.0, step=0.5, format="%.2f") for c in componentes
+            },
+        )
+
+        reservados = {"Código IBGE", "MUNICÍPIO", "Codigo_IBGE_str", "Realizado"}
+        cenarios = []
+        for linha in cenarios_editados.itertuples(index=False):
+            nome = str(linha[0]).strip() if pd.notna(linha[0]) else ""
+            pesos = tuple(float(p) if pd.notna(p) else 0.0 for p in linha[1:])
+            if nome and nome not in reservados and nome not in dict(cenarios) and sum(pesos) > 0:
+                cenarios.append((nome, pesos))
+
+        if not cenarios:
+            st.info("Inclua ao menos um cenário com nome e algum peso maior que zero.")
+        else:
+            simulacao = simulacao_icms(versao, ano_sel, tuple(cenarios))
+            nomes = [nome for nome, _ in cenarios]
+            diferencas = simulacao[nomes].to_numpy() - simulacao[["Realizado"]].to_numpy()
+            linha_sel = (simulacao["Código IBGE"] == codigo_sel).fillna(False).to_numpy(dtype=bool)
+
+            # -------------------------------------------------
+            # A) RESUMO DOS CENÁRIOS
+            # -------------------------------------------------
+            st.subheader("A) Resumo dos cenários")
+            resumo = pd.DataFrame({
+                "Cenário": nomes,
+                "Municípios que ganham": (diferencas >= 1).sum(axis=0),
+                "Municípios que perdem": (diferencas <= -1).sum(axis=0),
+                "Maior ganho": diferencas.max(axis=0),
+                "Maior perda": diferencas.min(axis=0),
+                f"Diferença – {municipio_sel}": diferencas[linha_sel][0] if linha_sel.any() else np.nan,
+            })
+            st.dataframe(
+                resumo,
+                use_container_width=True,
+                hide_index=True,
+                column_config={c: coluna_reais(c) for c in resumo.columns[3:]},
+            )
+
+            # -------------------------------------------------
+            # B) CENÁRIO ESCOLHIDO – TABELA E MAPA DAS DIFERENÇAS
+            # -------------------------------------------------
+            st.subheader("B) Diferenças em relação ao realizado")
+            escolha_cen = st.selectbox("Cenário", nomes, key="cenario_icms")
+            detalhe = simulacao[["MUNICÍPIO", "Codigo_IBGE_str", "Realizado"]].assign(Simulado=simulacao[escolha_cen])
+            detalhe["Diferença"] = detalhe["Simulado"] - detalhe["Realizado"]
+            detalhe["Diferença %"] = detalhe["Diferença"] / detalhe["Realizado"].where(detalhe["Realizado"] > 0)
+
+            if linha_sel.any():
+                c1, c2, c3 = st.columns(3)
+                c1.metric(f"Realizado – {municipio_sel}", formatar_reais(detalhe["Realizado"][linha_sel].iloc[0]))
+                c2.metric("Simulado", formatar_reais(detalhe["Simulado"][linha_sel].iloc[0]))
+                c3.metric(
+                    "Diferença", formatar_reais(detalhe["Diferença"][linha_sel].iloc[0]),
+                    formatar_variacao(detalhe["Diferença %"][linha_sel].iloc[0]),
+                )
+
+            tabela_paginada(
+                detalhe.drop(columns="Codigo_IBGE_str"),
+                chave="tabela_icms_sim",
+                chave_cache=f"tabela_icms_sim_{versao}_{ano_sel}_{dict(cenarios)[escolha_cen]}",
+                formatos={
+                    "Realizado": coluna_reais("Realizado"),
+                    "Simulado": coluna_reais("Simulado"),
+                    "Diferença": coluna_reais("Diferença"),
+                    "Diferença %": coluna_percentual("Diferença %"),
+                },
+                coluna_busca="MUNICÍPIO",
+                ordem_padrao="Diferença",
+            )
+            st.download_button(
+                "⬇️ Baixar simulação (todos os cenários)",
+                data=simulacao.drop(columns="Codigo_IBGE_str").to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"),
+                file_name=f"simulacao_icms_educacional_{ano_sel}.csv",
+                mime="text/csv",
+            )
+
+            from fundeb_graficos import figura_mapa_diferencas
+
+            st.plotly_chart(
+                figura_mapa_diferencas(detalhe, carregar_mapa_es(versao), "Diferença", f"Diferença – {escolha_cen}"),
+                use_container_width=True,
+            )
+
+# ================================================================
+# BLOCO 8c – SEÇÃO: VIZINHANÇA E AGRUPAMENTOS REGIONAIS
+# ================================================================
+elif menu == "🧭 Vizinhança e agrupamentos":
+    st.title("🧭 Vizinhança e agrupamentos regionais")
+
+    if df_ano.empty:
+        st.warning("Não há dados para o ano selecionado.")
+    else:
+        grafo = grafo_municipios(versao)
+
+        indicador_viz = st.selectbox(
+            "Indicador", INDICADORES_VIZINHANCA,
+            index=INDICADORES_VIZINHANCA.index("Dep_Fundeb_orcamento"), key="indicador_viz",
+        )
+        viz = vizinhanca_indicador(versao, indicador_viz, ano_sel)
+        coluna_valor = coluna_percentual if indicador_viz.startswith(("Dep_", "Recebe_")) else coluna_reais
+
+        st.markdown(
+            f"Vizinhos são os municípios que compartilham fronteira no mapa ({grafo.n_pares} pares). "
+            "A **média dos vizinhos** é a defasagem espacial do indicador; nos indicadores de recebimento, "
+            "é a proporção de vizinhos que recebem. O **I de Moran local** aponta agrupamentos: "
+            "*Alto-Alto* (valor alto cercado de valores altos), *Baixo-Baixo*, e os discrepantes "
+            f"*Alto-Baixo* e *Baixo-Alto*, com significância de {SIGNIFICANCIA_MORAN:.0%} "
+            "(permutações aleatórias)."
+        )
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("I de Moran global", f"{moran_global(viz):.3f}")
+        c2.metric("Municípios Alto-Alto", int((viz["Agrupamento"] == "Alto-Alto").sum()))
+        c3.metric("Municípios Baixo-Baixo", int((viz["Agrupamento"] == "Baixo-Baixo").sum()))
+
+        # -------------------------------------------------
+        # A) MUNICÍPIO SELECIONADO × VIZINHOS
+        # -------------------------------------------------
+        st.subheader(f"A) {municipio_sel} e seus vizinhos")
+        linha_viz = viz[viz["Codigo_IBGE_str"] == str(codigo_sel)]
+        if linha_viz.empty:
+            st.info("Município sem dados no ano selecionado.")
+        else:
+            linha_viz = linha_viz.iloc[0]
+            formato = "{:.1%}" if coluna_valor is coluna_percentual else "R$ {:,.0f}"
+
+            def _fmt(v):
+                return formato.format(v).replace(",", ".") if pd.notna(v) else "-"
+
+            v1, v2, v3 = st.columns(3)
+            v1.metric(municipio_sel, _fmt(linha_viz["Valor"]))
+            v2.metric(f"Média dos vizinhos ({int(linha_viz['Vizinhos']) if pd.notna(linha_viz['Vizinhos']) else 0})",
+                      _fmt(linha_viz["Média dos vizinhos"]))
+            v3.metric("Agrupamento", str(linha_viz["Agrupamento"]))
+
+            vizinhos_sel = viz[viz["Codigo_IBGE_str"].isin(grafo.vizinhos(linha_viz["Codigo_IBGE_str"]))]
+            st.dataframe(
+                vizinhos_sel[["MUNICÍPIO", "Valor", "Agrupamento"]].sort_values("Valor", ascending=False),
+                use_container_width=True,
+                hide_index=True,
+                column_config={"Valor": coluna_valor(indicador_viz)},
+            )
+
+        # -------------------------------------------------
+        # B) MAPA DOS AGRUPAMENTOS
+        # -------------------------------------------------
+        st.subheader("B) Mapa dos agrupamentos (I de Moran local)")
+        from fundeb_graficos import figura_mapa_agrupamentos
+
+        st.plotly_chart(
+            figura_mapa_agrupamentos(viz, carregar_mapa_es(versao), codigo_sel),
+            use_container_width=True,
+        )
+
+        # -------------------------------------------------
+        # C) TODOS OS MUNICÍPIOS
+        # -------------------------------------------------
+        st.subheader("C) Comparação de cada município com a média dos vizinhos")
+        tabela_paginada(
+            viz[["MUNICÍPIO", "Valor", "Média dos vizinhos", "Diferença para os vizinhos",
+                 "Vizinhos", "I local", "p", "Agrupamento"]],
+            chave="tabela_vizinhanca",
+            chave_cache=f"tabela_vizinhanca_{versao}_{ano_sel}_{indicador_viz}",
+            formatos={
+                "Valor": coluna_valor("Valor"),
+                "Média dos vizinhos": coluna_valor("Média dos vizinhos"),
+                "Diferença para os vizinhos": coluna_valor("Diferença para os vizinhos"),
+                "Vizinhos": coluna_inteiro("Vizinhos"),
+                "I local": st.column_config.NumberColumn("I local", format="%.3f"),
+                "p": st.column_config.NumberColumn("p", format="%.3f"),
+            },
+            coluna_busca="MUNICÍPIO",
+            ordem_padrao="Diferença para os vizinhos",
+        )
+
+# ================================================================
+# BLOCO 8d – SEÇÃO: CONFORMIDADE FISCAL (REGRAS DE APLICAÇÃO)
+# ================================================================
+elif menu == "✅ Conformidade fiscal":
+    st.title("✅ Conformidade fiscal – aplicação mínima dos recursos")
+
+    conf_ano = conformidade(versao, ano_sel)
+
+    if conf_ano is None:
+        st.info(
+            f"Para avaliar as regras, coloque o extrato **{NOME_DESPESAS_SIOPE}** (padrão SIOPE) na mesma "
+            "pasta da planilha, com as colunas *Código IBGE*, *ANO* e os valores declarados: "
+            f"{', '.join(f'*{c}*' for c in COLUNAS_SIOPE)} (separador \";\", decimal \",\")."
+        )
+    elif not conf_ano["Regras avaliadas"].any():
+        st.warning(f"O extrato do SIOPE não tem despesas de {ano_sel}. Escolha outro ano na barra lateral.")
+    else:
+        st.markdown(
+            "Cada regra compara um índice (despesa declarada ao SIOPE sobre a receita de referência) "
+            "com o limite legal. A **margem** é a folga em pontos percentuais: positiva quando a regra "
+            "é cumprida, negativa quando não. Regras sem dados (ou sem a receita de referência, como a "
+            "Complementação-VAAT em quem não a recebe) ficam sem avaliação."
+        )
+
+        # -------------------------------------------------
+        # A) RESUMO ESTADUAL POR REGRA
+        # -------------------------------------------------
+        st.subheader(f"A) Municípios que cumprem cada regra em {ano_sel}")
+        ids_regras = list(REGRAS_CONFORMIDADE)
+        for inicio_linha in range(0, len(ids_regras), 3):
+            colunas_cards = st.columns(3)
+            for col, id_regra in zip(colunas_cards, ids_regras[inicio_linha:inicio_linha + 3]):
+                regra = REGRAS_CONFORMIDADE[id_regra]
+                margem = conf_ano[f"Margem_{id_regra}"]
+                descumprem = int((margem < 0).sum())
+                col.metric(
+                    regra["rotulo"],
+                    f"{int((margem >= 0).sum())} de {int(margem.notna().sum())}",
+                    delta=f"{descumprem} descumprem" if descumprem else None,
+                    delta_color="inverse",
+                )
+                col.caption(f"Limite {regra['tipo']} de {regra['limite']:.0%} · {regra['base_legal']}")
+
+        # -------------------------------------------------
+        # B) MUNICÍPIO SELECIONADO
+        # -------------------------------------------------
+        st.subheader(f"B) {municipio_sel} em {ano_sel}")
+        linha_conf = conf_ano[(conf_ano["Código IBGE"] == codigo_sel).fillna(False)]
+        if linha_conf.empty or not linha_conf["Regras avaliadas"].iloc[0]:
+            st.info("Município sem despesas no extrato do SIOPE para o ano selecionado.")
+        else:
+            linha_conf = linha_conf.iloc[0]
+            for inicio_linha in range(0, len(ids_regras), 3):
+                colunas_cards = st.columns(3)
+                for col, id_regra in zip(colunas_cards, ids_regras[inicio_linha:inicio_linha + 3]):
+                    indice = linha_conf[f"Indice_{id_regra}"]
+                    margem = linha_conf[f"Margem_{id_regra}"]
+                    col.metric(
+                        REGRAS_CONFORMIDADE[id_regra]["rotulo"],
+                        f"{indice:.1%}" if pd.notna(indice) else "-",
+                        delta=f"{margem:+.1f} p.p." if pd.notna(margem) else None,
+                    )
+
+        # -------------------------------------------------
+        # C) MAPA DAS MARGENS
+        # -------------------------------------------------
+        st.subheader("C) Mapa das margens")
+        regra_mapa = st.selectbox(
+            "Regra", ids_regras, format_func=lambda r: REGRAS_CONFORMIDADE[r]["rotulo"],
+            key="regra_conformidade",
+        )
+        from fundeb_graficos import figura_mapa_margens
+
+        st.plotly_chart(
+            figura_mapa_margens(
+                conf_ano, carregar_mapa_es(versao), f"Margem_{regra_mapa}", "Margem",
+            ),
+            use_container_width=True,
+        )
+
+        # -------------------------------------------------
+        # D) TODOS OS MUNICÍPIOS
+        # -------------------------------------------------
+        st.subheader("D) Margens de todos os municípios")
+        colunas_margem = [f"Margem_{r}" for r in ids_regras]
+        tabela_paginada(
+            conf_ano[["MUNICÍPIO", "Situação", "Regras descumpridas", *colunas_margem]],
+            chave="tabela_conformidade",
+            chave_cache=f"tabela_conformidade_{versao}_{ano_sel}",
+            formatos={
+                "Regras descumpridas": coluna_inteiro("Regras descumpridas"),
+                **{
+                    f"Margem_{r}": st.column_config.NumberColumn(
+                        REGRAS_CONFORMIDADE[r]["rotulo"], format="%+.1f p.p."
+                    )
+                    for r in ids_regras
+                },
+            },
+            coluna_busca="MUNICÍPIO",
+            ordem_padrao="Regras descumpridas",
+        )
+
+# ================================================================
+# BLOCO 9 – SEÇÃO: INSIGHTS AUTOMÁTICOS
+# ================================================================
+elif menu == "💡 Insights automáticos":
+    st.title("💡 Insights automáticos – alertas estratégicos")
+
+    if df_ano.empty:
+        st.warning("Não há dados para o ano selecionado.")
+    else:
+        st.markdown(f"### Ano de referência: {ano_sel}")
+
+        # regras pelo Código IBGE (homônimos de outros estados não se somam)
+        nomes_alerta = dict(zip(df_ano["Código IBGE"].astype(str), nomes_exibicao(df_ano)))
+        insights = [
+            f"- {icone} **{titulo}**: {', '.join(sorted(nomes_alerta.get(c, c) for c in codigos))}."
+            for icone, titulo, codigos in regras_alerta(
+                dados_anos_recentes(versao, 3, ["ANO", "Código IBGE", "MUNICÍPIO", "Fundeb_Total"]),
+                df_ano, ano_sel, chave="Código IBGE",
+            )
+        ]
+
+        if insights:
+            st.markdown("#### Principais alertas gerados automaticamente")
+            for item in insights:
+                st.markdown(item)
+        else:
+            st.info("Não foram identificados alertas relevantes com as regras atuais. Mesmo assim, o painel "
+                    "pode ser explorado para identificar oportunidades específicas.")
+
+# ================================================================
+# BLOCO 9b – SEÇÃO: QUALIDADE DOS DADOS
+# ================================================================
+elif menu == "🩺 Qualidade dos dados":
+    st.title("🩺 Qualidade dos dados – relatório de validação da base")
+
+    st.markdown("""
+    Verificações executadas uma única vez, no carregamento da planilha, sobre
+    todos os anos e municípios (inclusive os excluídos das demais análises).
+    """)
+
+    validacao = carregar_validacao(versao)
+
+    resumo = validacao["resumo"]
+    cols = st.columns(len(resumo))
+    for col, (_, linha) in zip(cols, resumo.iterrows()):
+        aplica = pd.notna(linha["Ocorrências"])
+        col.metric(
+            linha["Verificação"], int(linha["Ocorrências"]) if aplica else "—",
+            help=linha["Observação"] or None,
+        )
+
+    detalhes = {
+        "conversao": "Células com conteúdo que não puderam ser convertidas em número",
+        "duplicados": "Chaves (ANO, Código IBGE) duplicadas",
+        "reconciliacao": f"Fundeb_Total × Receita total do Fundeb Realizada "
+                         f"(tolerância de {formatar_reais(TOLERANCIA_RECONCILIACAO)})",
+        "denominadores": "Orçamento ou despesa em educação ausentes, zerados ou negativos "
+                         "(dependências do Fundeb ficam sem valor)",
+        "sem_mapa": "Códigos IBGE sem polígono correspondente no mapa",
+    }
+    por_detalhe = resumo.set_index("Detalhe")
+    for chave_det, titulo in detalhes.items():
+        tabela = validacao[chave_det]
+        aplica = pd.notna(por_detalhe.loc[chave_det, "Ocorrências"])
+        with st.expander(f"{titulo} ({len(tabela) if aplica else 'não se aplica'})", expanded=False):
+            if not aplica:
+                st.info(por_detalhe.loc[chave_det, "Observação"])
+            elif tabela.empty:
+                st.success("Nenhuma ocorrência.")
+            else:
+                st.dataframe(tabela, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇️ Baixar ocorrências",
+                    data=tabela.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"),
+                    file_name=f"validacao_{chave_det}.csv",
+                    mime="text/csv",
+                    key=f"download_validacao_{chave_det}",
+                )
+
+# ================================================================
+# BLOCO 9c – SEÇÃO: REVISÕES ENTRE VERSÕES DA PLANILHA
+# ================================================================
+elif menu == "🔁 Revisões dos dados":
+    st.title("🔁 Revisões dos dados – o que mudou entre versões da planilha")
+
+    st.markdown("""
+    A cada carga de uma planilha com conteúdo diferente, a base é comparada com a
+    versão anterior por (ANO, Código IBGE). Valores revisados, linhas incluídas e
+    linhas removidas aparecem abaixo. Colunas derivadas não entram na comparação.
+    """)
+
+    comparacoes = comparacoes_revisoes()
+    if not comparacoes:
+        st.info("Ainda não há revisões: só uma versão da planilha foi carregada até agora.")
+    else:
+        rotulos = {
+            f"{c['data']:%d/%m/%Y %H:%M} – versão {c['anterior'][:8]} → {c['nova'][:8]}": c
+            for c in comparacoes
+        }
+        escolha = rotulos[st.selectbox("Comparação", list(rotulos))]
+        revisoes = carregar_revisoes(escolha["caminho"])
+
+        alteradas = revisoes[revisoes["Tipo"] == "Alterado"]
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Municípios com revisões", revisoes["Código IBGE"].nunique())
+        c2.metric("Indicadores revisados", alteradas["Indicador"].nunique())
+        c3.metric("Linhas incluídas", int((revisoes["Tipo"] == "Incluído").sum()))
+        c4.metric("Linhas removidas", int((revisoes["Tipo"] == "Removido").sum()))
+
+        if revisoes.empty:
+            st.success("As duas versões têm o mesmo conteúdo nas colunas comparadas.")
+        else:
+            f1, f2 = st.columns(2)
+            muni_rev = f1.multiselect("Municípios", sorted(revisoes["MUNICÍPIO"].unique()))
+            ind_rev = f2.multiselect("Indicadores", sorted(revisoes["Indicador"].unique()))
+            filtradas = revisoes
+            if muni_rev:
+                filtradas = filtradas[filtradas["MUNICÍPIO"].isin(muni_rev)]
+            if ind_rev:
+                filtradas = filtradas[filtradas["Indicador"].isin(ind_rev)]
+
+            st.dataframe(filtradas, use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ Baixar revisões",
+                data=filtradas.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"),
+                file_name=f"revisoes_{escolha['anterior'][:8]}_{escolha['nova'][:8]}.csv",
+                mime="text/csv",
+            )
+
+# ================================================================
+# BLOCO 10 – SEÇÃO: DOWNLOADS
+# ================================================================
+elif menu == "📎 Downloads":
+    st.title("📎 Downloads – bases consolidadas")
+
+    st.markdown("""
+    Aqui você pode exportar as bases utilizadas no painel para aprofundar análises
+    em Excel, R, Python ou qualquer outra ferramenta.
+    """)
+
+    # a base completa só é gerada no clique (pela própria fonte: no DuckDB,
+    # direto dos Parquet, sem passar por um DataFrame)
+    fonte = fonte_dados(versao)
+    st.download_button(
+        "⬇️ Baixar base completa (todos os anos e municípios)",
+        data=lambda: fonte.arquivo_base("csv"),
+        file_name="fundeb_icms_complementacoes_es.csv",
+        mime="text/csv",
+    )
+    if "parquet" in fonte.formatos_download:
+        st.download_button(
+            "⬇️ Baixar base completa em Parquet",
+            data=lambda: fonte.arquivo_base("parquet"),
+            file_name="fundeb_icms_complementacoes_es.parquet",
+            mime="application/octet-stream",
+        )
+
+    if not df_ano.empty:
+        csv_ano = df_ano.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig")
+        st.download_button(
+            f"⬇️ Baixar base filtrada para {ano_sel}",
+            data=csv_ano,
+            file_name=f"fundeb_icms_complementacoes_es_{ano_sel}.csv",
+            mime="text/csv",
+        )
+
+    with st.expander("Perfil de memória da base carregada"):
+        perfil = perfil_memoria(versao)
+        if perfil is None:
+            st.caption("No backend DuckDB a base fica nos arquivos Parquet e não é carregada na memória.")
+        else:
+            bytes_planilha, rel_mem = perfil
+            bytes_base = rel_mem["Bytes"].sum()
+            st.markdown(
+                f"**Planilha lida com os tipos padrão do pandas:** {bytes_planilha / 1024:,.1f} KiB · "
+                f"**base carregada:** {bytes_base / 1024:,.1f} KiB "
+                f"({bytes_planilha / bytes_base:.1f}× menor, medido nesta planilha)"
+            )
+            st.dataframe(
+                rel_mem,
+                use_container_width=True,
+                hide_index=True,
+                column_config={"Bytes": coluna_inteiro("Bytes"), "Participação": coluna_percentual("Participação")},
+            )
+
+# ================================================================
+# RODAPÉ
+# ================================================================
+st.markdown(
+    """
+    <hr style='margin-top:40px;'>
+    <div style='text-align:center; color:#7E7E7E; font-size:13px;'>
+        Desenvolvido por <b>Zetta Inteligência em Dados</b> · Painel Fundeb, Complementações & ICMS · 2025
+    </div>
+    """,
+    unsafe_allow_html=True
+)
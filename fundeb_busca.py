@@ -0,0 +1,130 @@
+# ================================================================
+# fundeb_busca.py – Índice de busca de municípios por nome ou código
+# (sem dependência do Streamlit)
+# ================================================================
+# A barra lateral enviava ao navegador a lista inteira de municípios
+# (5.570 no Brasil). Com o índice, só os melhores resultados da busca
+# vão para a caixa de seleção. Montado uma vez por processo, responde em
+# menos de 1 ms:
+#
+# - uma entrada por código IBGE: nomes se repetem entre estados, então
+#   os resultados são códigos e a caixa de seleção mostra "nome – UF"
+# - nomes e palavras normalizados (sem acento, maiúsculos) em listas
+#   ordenadas: prefixos saem por busca binária (bisect)
+# - códigos IBGE como texto, também ordenados (prefixo do código)
+# - trigramas -> municípios (índice invertido) para a busca aproximada,
+#   usada quando os prefixos não completam o limite de resultados
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+from fundeb_dados import rotulo_municipio
+
+# Nº de resultados enviados à caixa de seleção
+LIMITE_RESULTADOS = 20
+
+# Semelhança mínima (Jaccard de trigramas) para um resultado aproximado
+SIMILARIDADE_MINIMA = 0.2
+
+
+def normalizar(texto):
+    """Maiúsculas, sem acentos e sem pontuação ("São José" -> "SAO JOSE")."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9A-Za-z]+", " ", texto).upper().split())
+
+
+def _trigramas(texto):
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceMunicipios:
+    """Índice sobre `nomes` e `codigos` IBGE na mesma ordem (um por município)."""
+
+    def __init__(self, nomes, codigos):
+        self.nomes = [str(n) for n in nomes]
+        self.codigos = [int(c) for c in codigos]
+        self._posicao = {c: i for i, c in enumerate(self.codigos)}
+        normalizados = [normalizar(n) for n in self.nomes]
+
+        # (texto, posição do município) ordenados, para busca por prefixo
+        self._nomes = sorted((n, i) for i, n in enumerate(normalizados))
+        self._palavras = sorted(
+            (p, i) for i, n in enumerate(normalizados) for p in set(n.split()[1:])
+        )
+        self._codigos = sorted((str(c), i) for i, c in enumerate(self.codigos))
+
+        trigramas = [_trigramas(n) for n in normalizados]
+        self._n_trigramas = np.array([len(t) for t in trigramas])
+        invertido = defaultdict(list)
+        for i, tri in enumerate(trigramas):
+            for t in tri:
+                invertido[t].append(i)
+        self._invertido = {t: np.array(ids, dtype=np.int32) for t, ids in invertido.items()}
+
+    @staticmethod
+    def _prefixo(ordenada, prefixo, limite):
+        achados = []
+        for pos in range(bisect.bisect_left(ordenada, (prefixo,)), len(ordenada)):
+            texto, i = ordenada[pos]
+            if not texto.startswith(prefixo) or len(achados) >= limite:
+                break
+            achados.append(i)
+        return achados
+
+    def _aproximados(self, consulta, limite):
+        tri = _trigramas(consulta)
+        listas = [self._invertido[t] for t in tri if t in self._invertido]
+        if not listas:
+            return []
+        comuns = np.bincount(np.concatenate(listas), minlength=len(self.nomes))
+        similaridade = comuns / (len(tri) + self._n_trigramas - comuns)
+        melhores = np.argpartition(-similaridade, min(limite, len(self.nomes) - 1))[:limite]
+        melhores = melhores[np.argsort(-similaridade[melhores], kind="stable")]
+        return [int(i) for i in melhores if similaridade[i] >= SIMILARIDADE_MINIMA]
+
+    def buscar(self, consulta, limite=LIMITE_RESULTADOS):
+        """
+        Até `limite` códigos IBGE de municípios para a `consulta`, nesta ordem:
+        código IBGE que começa com a consulta (se numérica), nome que
+        começa com ela, alguma palavra do nome que começa com ela e, por
+        fim, nomes parecidos (erros de digitação, palavras fora de ordem).
+        Consulta vazia devolve os primeiros em ordem alfabética.
+        """
+        consulta = normalizar(consulta)
+        if not consulta:
+            return [self.codigos[i] for _, i in self._nomes[:limite]]
+
+        if consulta.isdigit():
+            candidatos = self._prefixo(self._codigos, consulta, limite)
+        else:
+            candidatos = self._prefixo(self._nomes, consulta, limite)
+            candidatos += self._prefixo(self._palavras, consulta, limite)
+            if len(set(candidatos)) < limite:
+                candidatos += self._aproximados(consulta, limite)
+
+        vistos, resultado = set(), []
+        for i in candidatos:
+            if i not in vistos:
+                vistos.add(i)
+                resultado.append(self.codigos[i])
+                if len(resultado) == limite:
+                    break
+        return resultado
+
+    def __contains__(self, codigo):
+        return codigo in self._posicao
+
+    def nome(self, codigo):
+        """Nome do município do código IBGE (ou None)."""
+        i = self._posicao.get(codigo)
+        return None if i is None else self.nomes[i]
+
+    def rotulo(self, codigo):
+        """Rótulo "NOME – UF" do código IBGE, para a caixa de seleção."""
+        i = self._posicao.get(codigo)
+        return str(codigo) if i is None else rotulo_municipio(self.nomes[i], codigo)
@@ -0,0 +1,641 @@
+# ================================================================
+# fundeb_cache.py – Cargas em cache do Painel Fundeb e aquecimento
+# ================================================================
+# As funções com st.cache_data ficam neste módulo (e não no fundeb.py)
+# para que a chave do cache seja a mesma no script do painel e no
+# aquecimento feito pelo servidor.py: o Streamlit inclui o módulo da
+# função na chave, e o fundeb.py roda como "__main__".
+import datetime
+import functools
+import glob
+import importlib
+import logging
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from fundeb_busca import IndiceMunicipios
+from fundeb_cache_disco import CacheDisco, hash_arquivo, versao_arquivos
+from fundeb_censo import agregar_censo, juntar_matriculas, localizar_censo
+from fundeb_consultas import (
+    BACKENDS,
+    ConsultasDuckDB,
+    ConsultasPandas,
+    exportar_parquet,
+    exportar_repasses,
+    parquet_disponivel,
+)
+from fundeb_dados import (
+    CAMINHO_MAPA,
+    COLUNAS_BASE_CONFORMIDADE,
+    INDICADORES_CRUZAMENTO,
+    INDICADORES_HISTOGRAMA,
+    NOME_DESPESAS_SIOPE,
+    NOME_INDICES_ICMS,
+    NOME_PLANILHA,
+    NOME_REPASSES,
+    SUBCONJUNTOS_HISTOGRAMA,
+    avaliar_conformidade,
+    calcular_histogramas,
+    combinar_extremos,
+    extremos_histogramas,
+    ler_base,
+    ler_despesas_siope,
+    ler_indices_icms,
+    ler_mapa,
+    ler_repasses,
+    localizar_planilha,
+    memoria_planilha,
+    momentos_ano,
+    participacoes_icms,
+    relatorio_memoria,
+    simular_icms,
+    validar_base,
+)
+from fundeb_revisoes import listar_revisoes, ler_revisoes, registrar_snapshot
+from fundeb_vizinhanca import GrafoVizinhanca, indicadores_espaciais
+
+# Fonte das consultas das seções (ver fundeb_consultas.py):
+# FUNDEB_BACKEND=duckdb lê a base em Parquet de FUNDEB_PARQUET; se a pasta
+# não existir, ela é criada a partir da planilha na primeira carga.
+BACKEND = os.environ.get("FUNDEB_BACKEND", "pandas")
+PASTA_PARQUET = os.environ.get("FUNDEB_PARQUET", "dados_parquet")
+
+# Versões da base e revisões entre elas (ver fundeb_revisoes.py)
+PASTA_SNAPSHOTS = os.environ.get("FUNDEB_SNAPSHOTS", "snapshots")
+
+# Microdados do Censo Escolar (opcionais; ver fundeb_censo.py) e nº de
+# processos usados para agregá-los (um por arquivo)
+PASTA_CENSO = os.environ.get("FUNDEB_CENSO", "censo_escolar")
+PROCESSOS_CENSO = int(os.environ.get("FUNDEB_CENSO_PROCESSOS", 1))
+
+# Cache de resultados compartilhado pelos workers do mesmo host (ver
+# fundeb_cache_disco.py); FUNDEB_CACHE_DISCO="" desliga
+PASTA_CACHE_DISCO = os.environ.get("FUNDEB_CACHE_DISCO", "cache_resultados")
+LIMITE_CACHE_DISCO_MB = float(os.environ.get("FUNDEB_CACHE_DISCO_MB", 512))
+
+# Nº padrão de anos (os mais recentes) da visão geral aquecidos no boot
+ANOS_AQUECIMENTO = 2
+
+# Módulos adiados pelo fundeb.py (ver benchmarks/orcamento_importacao.py),
+# importados pelo aquecimento para que o 1º usuário das seções com
+# gráficos não pague a importação
+MODULOS_AQUECIMENTO = ["plotly.graph_objects", "plotly.express", "fundeb_graficos"]
+
+# Recarga a quente (BLOCO 2f): segundos entre as verificações dos arquivos
+# de entrada (FUNDEB_INTERVALO_RECARGA=0 desliga) e nº de versões dos dados
+# mantidas em memória – a vigente e a anterior, que ainda atende as
+# execuções em andamento no momento da troca
+INTERVALO_RECARGA = float(os.environ.get("FUNDEB_INTERVALO_RECARGA", 30))
+VERSOES_EM_MEMORIA = 2
+
+# Entradas por versão dos caches de consultas que variam com a navegação
+# (ano, município, indicador, cenário...): com max_entries =
+# VERSOES_EM_MEMORIA * CONSULTAS_POR_VERSAO, as entradas de versões antigas
+# saem da memória (as menos usadas primeiro) em vez de se acumular a cada
+# recarga
+CONSULTAS_POR_VERSAO = 64
+MAX_CONSULTAS = VERSOES_EM_MEMORIA * CONSULTAS_POR_VERSAO
+
+
+def versao_dados():
+    """Impressão digital dos arquivos de entrada (e do backend) do painel."""
+    arquivos = [
+        localizar_planilha(), localizar_planilha(NOME_REPASSES), localizar_planilha(NOME_INDICES_ICMS),
+        localizar_planilha(NOME_DESPESAS_SIOPE), CAMINHO_MAPA,
+    ]
+    arquivos += localizar_censo(PASTA_CENSO)
+    if BACKEND == "duckdb" and arquivos[0] is None:
+        # sem a planilha, a base é a exportação Parquet feita à parte
+        arquivos += sorted(glob.glob(os.path.join(PASTA_PARQUET, "**", "*.parquet"), recursive=True))
+    return BACKEND + versao_arquivos([a for a in arquivos if a])
+
+
+class VersaoAlterada(RuntimeError):
+    """Os arquivos de entrada mudaram no meio de uma leitura (ver conferir_versao)."""
+
+
+def conferir_versao(versao):
+    """
+    Falha com VersaoAlterada se os arquivos de entrada já não são os da
+    `versao`: o que foi lido pode ser da planilha nova e não pode ficar
+    guardado sob a versão antiga (na memória ou em disco).
+    """
+    if versao_dados() != versao:
+        raise VersaoAlterada(f"arquivos de entrada mudaram durante a leitura da versão {versao[-16:]}")
+
+
+def pasta_parquet(versao):
+    """
+    Pasta lida pelo backend DuckDB. Com a planilha presente, cada versão
+    dos dados é exportada em sua própria subpasta de PASTA_PARQUET: a
+    recarga não troca os arquivos sob as sessões que ainda leem a versão
+    anterior. Sem a planilha, vale a exportação feita à parte.
+    """
+    if localizar_planilha() is None:
+        return PASTA_PARQUET
+    return os.path.join(PASTA_PARQUET, f"v_{versao[-16:]}")
+
+
+cache_disco = CacheDisco(PASTA_CACHE_DISCO, versao_dados, LIMITE_CACHE_DISCO_MB)
+
+log = logging.getLogger("fundeb.cache")
+
+# Threads do próprio painel, sem sessão (ScriptRunContext), que chamam as
+# funções de cache: o Streamlit avisa a cada chamada que falta o contexto
+THREADS_SEM_SESSAO = {"recarga-dados", "aquecimento"}
+
+
+class _SemAvisoDeContexto(logging.Filter):
+    """Descarta o aviso de contexto ausente só nas THREADS_SEM_SESSAO."""
+
+    def filter(self, registro):
+        return registro.threadName not in THREADS_SEM_SESSAO
+
+
+def silenciar_contexto_ausente():
+    """
+    Instala o filtro no logger do Streamlit, uma vez por processo. O nível
+    do logger não muda: avisos de outras threads continuam aparecendo.
+    """
+    logger = logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context")
+    if not any(isinstance(f, _SemAvisoDeContexto) for f in logger.filters):
+        logger.addFilter(_SemAvisoDeContexto())
+
+
+# ================================================================
+# BLOCO 2 – CARREGAMENTO UNIVERSAL DE DADOS
+# ================================================================
+@st.cache_data(show_spinner=True, max_entries=VERSOES_EM_MEMORIA)
+def carregar_dados(versao):
+    caminho_encontrado = localizar_planilha()
+
+    if caminho_encontrado is None:
+        st.error(f"""
+        ❌ Arquivo não encontrado.
+
+        Coloque o arquivo:
+        **{NOME_PLANILHA}**
+
+        ➤ na mesma pasta do *fundeb.py*  
+        **OU**  
+        ➤ dentro da pasta **data/** ou **dados/**.
+        """)
+        st.stop()
+
+    # a planilha pode ser trocada entre o cálculo da `versao` e o fim da
+    # leitura: confere antes e depois de ler, e antes de gravar no disco
+    conferir = functools.partial(conferir_versao, versao)
+    conferir()
+    df, perdas = cache_disco.memorizar(ler_base, conferir)(caminho_encontrado)
+
+    # compara com a versão anterior da planilha já na carga (seção Revisões)
+    registrar_snapshot(df, os.path.basename(caminho_encontrado), PASTA_SNAPSHOTS)
+
+    # matrículas do Censo Escolar (se houver microdados): indicadores por aluno
+    arquivos_censo = localizar_censo(PASTA_CENSO)
+    if arquivos_censo:
+        codigos = tuple(sorted(int(c) for c in df["Código IBGE"].dropna().unique()))
+        censo = cache_disco.memorizar(agregar_censo, conferir)(tuple(arquivos_censo), codigos, PROCESSOS_CENSO)
+        df = juntar_matriculas(df, censo)
+
+    return df, perdas
+
+
+# ================================================================
+# BLOCO 2b – CARREGAMENTO DO MAPA (GEOJSON)
+# ================================================================
+@st.cache_data(show_spinner=True, max_entries=VERSOES_EM_MEMORIA)
+def carregar_mapa_es(versao):
+    if not os.path.exists(CAMINHO_MAPA):
+        st.error(
+            f"Arquivo '{CAMINHO_MAPA}' não encontrado.\n\n"
+            "Coloque o arquivo na mesma pasta do 'fundeb.py'."
+        )
+        st.stop()
+
+    return cache_disco.memorizar(ler_mapa, functools.partial(conferir_versao, versao))(CAMINHO_MAPA)
+
+
+@st.cache_resource(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+def grafo_municipios(versao):
+    """
+    Grafo de vizinhança do mapa (fundeb_vizinhanca.py). No cache em disco
+    a chave é só o conteúdo do GeoJSON: uma planilha nova não refaz o grafo.
+    """
+    mapa = carregar_mapa_es(versao)
+    return cache_disco.obter_ou_calcular(
+        cache_disco.chave_conteudo("grafo_vizinhanca", hash_arquivo(CAMINHO_MAPA)),
+        lambda: GrafoVizinhanca.do_geojson(mapa),
+    )
+
+
+# ================================================================
+# BLOCO 2c – RELATÓRIO DE VALIDAÇÃO (EM CACHE, JUNTO DA BASE)
+# ================================================================
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def carregar_validacao(versao):
+    fonte = fonte_dados(versao)
+    codigos_mapa = {
+        str(f["properties"]["CD_MUN"]) for f in carregar_mapa_es(versao)["features"]
+    }
+    return validar_base(fonte.por_ano(bruta=True), fonte.perdas(), codigos_mapa)
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def perfil_memoria(versao):
+    """
+    (bytes da planilha lida com os tipos padrão do pandas, relatorio_memoria
+    da base carregada): o antes e o depois do esquema, medidos na carga.
+    None no backend DuckDB, em que a base não fica na memória.
+    """
+    if BACKEND == "duckdb":
+        return None
+    df, _ = carregar_dados(versao)
+    return memoria_planilha(localizar_planilha()), relatorio_memoria(df)
+
+
+# ================================================================
+# BLOCO 2c2 – REVISÕES ENTRE VERSÕES DA PLANILHA
+# ================================================================
+def comparacoes_revisoes():
+    """Comparações gravadas na carga (lista leve; não vai para o cache)."""
+    return listar_revisoes(PASTA_SNAPSHOTS)
+
+
+@st.cache_data(show_spinner=False)
+def carregar_revisoes(caminho):
+    return ler_revisoes(caminho)
+
+
+# ================================================================
+# BLOCO 2d – FONTE DE DADOS E CONSULTAS DAS SEÇÕES
+# ================================================================
+@st.cache_resource(show_spinner=True, max_entries=VERSOES_EM_MEMORIA)
+def fonte_dados(versao):
+    """Fonte da `versao` dos dados (pandas em memória ou DuckDB sobre Parquet)."""
+    if BACKEND not in BACKENDS:
+        st.error(f"FUNDEB_BACKEND='{BACKEND}' inválido. Use um de: {', '.join(BACKENDS)}.")
+        st.stop()
+
+    caminho_repasses = localizar_planilha(NOME_REPASSES)
+
+    if BACKEND == "duckdb":
+        pasta = pasta_parquet(versao)
+        if not parquet_disponivel(pasta):
+            repasses = ler_repasses(caminho_repasses) if caminho_repasses else None
+            exportar_parquet(*carregar_dados(versao), pasta, repasses=repasses)
+        elif caminho_repasses and not parquet_disponivel(pasta, "repasses"):
+            exportar_repasses(ler_repasses(caminho_repasses), pasta)
+        return ConsultasDuckDB(pasta)
+
+    return ConsultasPandas(*carregar_dados(versao), caminho_repasses=caminho_repasses)
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def opcoes_navegacao(versao):
+    """
+    Anos e municípios (Código IBGE, MUNICÍPIO) das caixas de seleção da
+    barra lateral.
+    """
+    fonte = fonte_dados(versao)
+    return fonte.anos(), fonte.municipios()
+
+
+@st.cache_resource(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+def indice_municipios(versao):
+    """Índice de busca por nome/código (fundeb_busca.py), um por versão dos dados."""
+    _, municipios = opcoes_navegacao(versao)
+    return IndiceMunicipios(municipios["MUNICÍPIO"], municipios["Código IBGE"])
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def dados_ano(versao, ano, colunas=None):
+    return fonte_dados(versao).ano(ano, colunas)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def dados_municipio(versao, codigo):
+    return fonte_dados(versao).municipio(codigo)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def dados_anos_recentes(versao, n, colunas=None):
+    return fonte_dados(versao).anos_recentes(n, colunas)
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def periodo_repasses(versao):
+    return fonte_dados(versao).periodo_repasses()
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def dados_repasses(versao, codigos, transferencia, inicio, fim, mensal):
+    return fonte_dados(versao).repasses(list(codigos), transferencia, inicio, fim, mensal)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def visao_geral_ano(versao, ano):
+    """Agregados estaduais do ano (cards do BLOCO 4)."""
+    return fonte_dados(versao).agregados_ano(ano)
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def figura_evolucao(versao):
+    """Gráfico de evolução anual do BLOCO 4 (não depende do ano escolhido)."""
+    from fundeb_graficos import figura_evolucao_anual
+
+    return figura_evolucao_anual(fonte_dados(versao).evolucao_anual())
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def histogramas(versao):
+    """Distribuições de todos os indicadores e anos, calculadas uma vez por versão dos dados."""
+    fonte = fonte_dados(versao)
+    colunas = ["ANO", *filter(None, SUBCONJUNTOS_HISTOGRAMA.values()), *INDICADORES_HISTOGRAMA]
+    # duas passadas, um ano por vez: extremos (faixas comuns) e contagens
+    extremos = {}
+    for df_ano in fonte.por_ano(colunas):
+        extremos = combinar_extremos(extremos, extremos_histogramas(df_ano))
+    return calcular_histogramas(fonte.por_ano(colunas), extremos)
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+def momentos_cruzamento(versao):
+    """
+    {ano: momentos_ano} dos INDICADORES_CRUZAMENTO. Cada ano é guardado
+    no cache em disco pelo hash das suas linhas: quando a planilha ganha
+    um ano (ou um ano é revisado), só ele é recalculado; os cruzamentos de
+    vários anos saem de fundeb_dados.combinar_momentos.
+    """
+    momentos = {}
+    for df_ano in fonte_dados(versao).por_ano(["ANO", *INDICADORES_CRUZAMENTO]):
+        df_ano = df_ano.dropna(subset=["ANO"])
+        if df_ano.empty:
+            continue
+        assinatura = int(pd.util.hash_pandas_object(df_ano, index=False).sum())
+        momentos[int(df_ano["ANO"].iloc[0])] = cache_disco.obter_ou_calcular(
+            cache_disco.chave_conteudo("momentos_ano", INDICADORES_CRUZAMENTO, assinatura),
+            lambda df_ano=df_ano: momentos_ano(df_ano),
+        )
+    return momentos
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def vizinhanca_indicador(versao, indicador, ano):
+    """
+    Média dos vizinhos, I de Moran local e agrupamentos de um indicador no
+    ano, sobre o grafo do mapa (MUNICÍPIO e Codigo_IBGE_str + colunas de
+    fundeb_vizinhanca.indicadores_espaciais).
+    """
+    df = dados_ano(versao, ano, ["MUNICÍPIO", "Codigo_IBGE_str", indicador])
+    tabela = indicadores_espaciais(grafo_municipios(versao), df["Codigo_IBGE_str"], df[indicador])
+    tabela.insert(0, "MUNICÍPIO", df["MUNICÍPIO"].astype(str).to_numpy())
+    tabela.insert(1, "Codigo_IBGE_str", df["Codigo_IBGE_str"].astype(str).to_numpy())
+    return tabela
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def indices_icms(versao):
+    """Notas dos componentes do ICMS Educacional (ou None sem o arquivo)."""
+    caminho = localizar_planilha(NOME_INDICES_ICMS)
+    return ler_indices_icms(caminho) if caminho else None
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+def simulacao_icms(versao, ano, cenarios):
+    """
+    ICMS Educacional simulado do `ano` em cada cenário ((nome, pesos),
+    ...), distribuindo o total realizado no ano: DataFrame com Código
+    IBGE, MUNICÍPIO, Codigo_IBGE_str, Realizado e uma coluna por cenário.
+
+    Cada cenário fica no cache em disco pela versão, ano e pesos: ao
+    incluir um cenário, só ele é calculado; os que faltam saem juntos de
+    fundeb_dados.simular_icms.
+    """
+    df = dados_ano(versao, ano, ["Código IBGE", "MUNICÍPIO", "Codigo_IBGE_str", "ICMS_Educacional"])
+    df = df.dropna(subset=["Código IBGE"]).rename(columns={"ICMS_Educacional": "Realizado"})
+
+    chaves = [cache_disco.chave_conteudo("simulacao_icms", versao, ano, pesos) for _, pesos in cenarios]
+    valores = {}
+    if cache_disco.ativo:
+        for chave in chaves:
+            achou, valor = cache_disco.obter(chave)
+            if achou:
+                valores[chave] = valor
+
+    faltam = [i for i, chave in enumerate(chaves) if chave not in valores]
+    if faltam:
+        participacoes = participacoes_icms(indices_icms(versao), df["Código IBGE"], ano)
+        simulados = simular_icms(participacoes, [cenarios[i][1] for i in faltam], df["Realizado"].sum())
+        for i, linha in zip(faltam, simulados):
+            valores[chaves[i]] = linha
+            if cache_disco.ativo:
+                cache_disco.gravar(chaves[i], linha)
+
+    for (nome, _), chave in zip(cenarios, chaves):
+        df[nome] = valores[chave]
+    return df.reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSOES_EM_MEMORIA)
+@cache_disco.memorizar
+def despesas_siope(versao):
+    """Extrato de despesas do SIOPE (ou None sem o arquivo)."""
+    caminho = localizar_planilha(NOME_DESPESAS_SIOPE)
+    return ler_despesas_siope(caminho) if caminho else None
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CONSULTAS)
+@cache_disco.memorizar
+def conformidade(versao, ano):
+    """
+    Regras de conformidade fiscal (fundeb_dados.REGRAS_CONFORMIDADE) de
+    todos os municípios no `ano`, avaliadas sobre o extrato do SIOPE (ou
+    None sem o arquivo). Cards e mapa da seção só filtram o resultado.
+    """
+    despesas = despesas_siope(versao)
+    if despesas is None:
+        return None
+    base = dados_ano(versao, ano, ["Código IBGE", "ANO", "MUNICÍPIO", "Codigo_IBGE_str", *COLUNAS_BASE_CONFORMIDADE])
+    base = base.dropna(subset=["Código IBGE", "ANO"])
+    base["MUNICÍPIO"] = base["MUNICÍPIO"].astype(str)
+    base["Codigo_IBGE_str"] = base["Codigo_IBGE_str"].astype(str)
+    return avaliar_conformidade(base, despesas)
+
+
+# ================================================================
+# BLOCO 2e – AQUECIMENTO DOS CACHES NO BOOT
+# ================================================================
+def aquecer(n_anos=ANOS_AQUECIMENTO, versao=None):
+    """
+    Preenche os caches da abertura do painel para a `versao` dos dados
+    (padrão: a vigente): fonte de dados, mapa e grafo de vizinhança (se
+    houver mapa), dados e agregados da visão geral dos `n_anos` mais
+    recentes, gráfico de evolução, histogramas, momentos dos cruzamentos,
+    índice de busca, conformidade fiscal (se houver o extrato do SIOPE) e
+    módulos de gráficos. Pode rodar fora de uma sessão (threads do
+    servidor.py e da recarga a quente). Retorna [(etapa, segundos)].
+    """
+    versao = versao or versao_vigente()
+    sem_parquet = BACKEND != "duckdb" or not parquet_disponivel(pasta_parquet(versao))
+    if sem_parquet and localizar_planilha() is None:
+        raise FileNotFoundError(f"planilha '{NOME_PLANILHA}' não encontrada")
+
+    etapas = []
+
+    def medir(nome, func, *args):
+        t0 = time.perf_counter()
+        func(*args)
+        etapas.append((nome, time.perf_counter() - t0))
+
+    medir("fonte_dados", fonte_dados, versao)
+    if os.path.exists(CAMINHO_MAPA):
+        medir("carregar_mapa_es", carregar_mapa_es, versao)
+        medir("grafo_municipios", grafo_municipios, versao)
+
+    medir("opcoes_navegacao", opcoes_navegacao, versao)
+    anos, _ = opcoes_navegacao(versao)
+    recentes = anos[-n_anos:] if n_anos > 0 else []
+    for ano in recentes:
+        medir(f"dados_ano({ano})", dados_ano, versao, ano)
+        medir(f"visao_geral_ano({ano})", visao_geral_ano, versao, ano)
+    medir("figura_evolucao", figura_evolucao, versao)
+    medir("histogramas", histogramas, versao)
+    medir("momentos_cruzamento", momentos_cruzamento, versao)
+    medir("indice_municipios", indice_municipios, versao)
+    if localizar_planilha(NOME_DESPESAS_SIOPE):
+        for ano in recentes:
+            medir(f"conformidade({ano})", conformidade, versao, ano)
+
+    for modulo in MODULOS_AQUECIMENTO:
+        medir(f"import {modulo}", importlib.import_module, modulo)
+
+    return etapas
+
+
+# ================================================================
+# BLOCO 2f – VERSÃO VIGENTE DOS DADOS E RECARGA A QUENTE
+# ================================================================
+# Cada execução do painel lê versao_vigente() uma única vez e passa a
+# versão a todas as cargas acima: as chaves de cache mudam com ela, e a
+# execução enxerga uma só versão do começo ao fim. A thread do
+# observador_dados verifica os arquivos de entrada a cada
+# INTERVALO_RECARGA segundos; quando uma planilha nova chega (e para de
+# mudar entre duas verificações, ou seja, a cópia terminou), ela monta a
+# nova versão fora das requisições – base, snapshot, fonte e agregados,
+# via aquecer – e só então troca o ponteiro. Se a montagem falhar (ex.:
+# planilha corrompida), o painel segue na versão anterior.
+_versao = {"vigente": None, "trocada_em": None, "preparando": None, "falhou": None, "erro": None}
+_trava_versao = threading.Lock()
+_observador = None
+
+
+def versao_vigente():
+    """Versão dos dados servida às novas execuções do painel."""
+    with _trava_versao:
+        if _versao["vigente"] is None:
+            _versao["vigente"] = versao_dados()
+            _versao["trocada_em"] = datetime.datetime.now()
+        return _versao["vigente"]
+
+
+def estado_versao():
+    """Cópia do estado da recarga (vigente, trocada_em, preparando, falhou, erro)."""
+    with _trava_versao:
+        return dict(_versao)
+
+
+def _podar_parquet(manter):
+    """Apaga as exportações Parquet de versões que saíram da memória."""
+    subpastas = [
+        p for p in glob.glob(os.path.join(PASTA_PARQUET, "v_*"))
+        if os.path.isdir(p) and os.path.basename(p) not in manter and "." not in os.path.basename(p)
+    ]
+    for pasta in subpastas:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def recarregar(versao, n_anos=ANOS_AQUECIMENTO):
+    """Monta a `versao` dos dados (fora das requisições) e a torna vigente."""
+    anterior = versao_vigente()
+    with _trava_versao:
+        _versao["preparando"] = versao
+    try:
+        aquecer(n_anos, versao)
+    except VersaoAlterada:
+        # arquivos trocados de novo durante a recarga: nada fica guardado
+        # sob esta versão, e o observador tenta a mais nova
+        with _trava_versao:
+            _versao["preparando"] = None
+        raise
+    except Exception as erro:
+        with _trava_versao:
+            _versao.update(preparando=None, falhou=versao, erro=f"{type(erro).__name__}: {erro}")
+        raise
+    with _trava_versao:
+        _versao.update(
+            vigente=versao, trocada_em=datetime.datetime.now(), preparando=None, falhou=None, erro=None,
+        )
+    if BACKEND == "duckdb":
+        _podar_parquet({os.path.basename(pasta_parquet(v)) for v in (anterior, versao)})
+
+
+def _observar(intervalo, n_anos):
+    candidata = None
+    while True:
+        time.sleep(intervalo)
+        try:
+            nova = versao_dados()
+        except OSError:
+            continue  # arquivo sendo substituído
+        estado = estado_versao()
+        if nova in (estado["vigente"], estado["falhou"]):
+            candidata = None
+            continue
+        if nova != candidata:
+            candidata = nova  # espera a cópia terminar (mesma versão na próxima verificação)
+            continue
+        candidata = None
+        try:
+            recarregar(nova, n_anos)
+        except VersaoAlterada as erro:
+            log.info("recarga adiada: %s", erro)
+        except Exception as erro:
+            log.warning("recarga da versão %s falhou: %s", nova[-16:], erro)
+        else:
+            log.info("dados recarregados: versão %s", nova[-16:])
+
+
+def observador_dados(intervalo=INTERVALO_RECARGA, n_anos=ANOS_AQUECIMENTO):
+    """
+    Inicia a thread da recarga a quente, uma vez por processo (chamadas
+    seguintes – de cada execução do painel – devolvem a mesma thread).
+    """
+    global _observador
+    if intervalo <= 0:
+        return None
+    with _trava_versao:
+        if _observador is None or not _observador.is_alive():
+            silenciar_contexto_ausente()
+            _observador = threading.Thread(
+                target=_observar, args=(intervalo, n_anos), name="recarga-dados", daemon=True
+            )
+            _observador.start()
+        return _observador
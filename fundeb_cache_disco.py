@@ -0,0 +1,204 @@
+# ================================================================
+# fundeb_cache_disco.py – Cache de resultados compartilhado entre workers
+# (sem dependência do Streamlit)
+# ================================================================
+# O st.cache_data vale só dentro de um processo: com vários workers atrás
+# do balanceador, cada um lia a planilha e recalculava as mesmas tabelas.
+# Este cache guarda os resultados em disco (uma pasta local do host; use
+# /dev/shm/... para mantê-los em memória compartilhada), com:
+#
+# - chave por conteúdo: sha256 da versão dos dados (hash dos arquivos de
+#   entrada), da versão do código (fundeb_*.py, pandas, Python), da função
+#   e dos argumentos – dados ou código novos geram chaves novas, sem
+#   invalidação manual
+# - gravação atômica (arquivo temporário + os.replace): um worker nunca lê
+#   um resultado pela metade e gravações simultâneas da mesma chave não se
+#   corrompem
+# - despejo LRU: cada leitura renova a data do arquivo e, acima do limite
+#   de tamanho, os menos usados recentemente são apagados
+import functools
+import glob
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+import pandas as pd
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+
+LIMITE_MB = 512
+
+_SUFIXO = ".pkl"
+
+# Acima deste tamanho (ex.: microdados do Censo), a versão de um arquivo é
+# tamanho + data de modificação, em vez do hash do conteúdo
+LIMITE_HASH_CONTEUDO_MB = 64
+
+# (caminho, tamanho, mtime) -> sha256 do conteúdo, para não reler arquivos
+_hashes_arquivos = {}
+
+
+def hash_arquivo(caminho):
+    """sha256 do conteúdo do arquivo (memorizado enquanto ele não mudar)."""
+    estado = os.stat(caminho)
+    chave = (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns)
+    if estado.st_size > LIMITE_HASH_CONTEUDO_MB * 1024 * 1024:
+        return f"{estado.st_size}-{estado.st_mtime_ns}"
+    if chave not in _hashes_arquivos:
+        h = hashlib.sha256()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        _hashes_arquivos[chave] = h.hexdigest()
+    return _hashes_arquivos[chave]
+
+
+def versao_arquivos(caminhos):
+    """Impressão digital de um conjunto de arquivos de entrada (ausentes contam como vazios)."""
+    h = hashlib.sha256()
+    for caminho in caminhos:
+        h.update(os.path.basename(caminho).encode("utf-8"))
+        h.update(hash_arquivo(caminho).encode() if os.path.isfile(caminho) else b"-")
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def versao_codigo():
+    """Hash dos módulos fundeb_*.py e das versões de pandas e Python."""
+    h = hashlib.sha256(f"{sys.version}|{pd.__version__}".encode())
+    for caminho in sorted(glob.glob(os.path.join(PASTA_APP, "fundeb_*.py"))):
+        h.update(hash_arquivo(caminho).encode())
+    return h.hexdigest()
+
+
+class CacheDisco:
+    """
+    Cache de resultados em `pasta`, limitado a `limite_mb`. `versao_dados`
+    é uma função sem argumentos que devolve a impressão digital dos dados
+    de entrada. Com `pasta` vazia, o cache fica desligado.
+    """
+
+    def __init__(self, pasta, versao_dados, limite_mb=LIMITE_MB):
+        self.pasta = pasta
+        self.versao_dados = versao_dados
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        if self.ativo:
+            os.makedirs(pasta, exist_ok=True)
+
+    @property
+    def ativo(self):
+        return bool(self.pasta)
+
+    def chave(self, func, args, kwargs):
+        h = hashlib.sha256()
+        h.update(self.versao_dados().encode())
+        h.update(versao_codigo().encode())
+        h.update(f"{func.__module__}.{func.__qualname__}".encode("utf-8"))
+        h.update(pickle.dumps((args, sorted(kwargs.items())), protocol=4))
+        return h.hexdigest()
+
+    def chave_conteudo(self, nome, *partes):
+        """
+        Chave que não depende da versão dos dados, só de `partes` (ex.: o
+        hash das linhas de um ano): resultados de partes que não mudaram
+        continuam válidos quando a planilha ganha um ano novo.
+        """
+        h = hashlib.sha256(versao_codigo().encode())
+        h.update(nome.encode("utf-8"))
+        h.update(pickle.dumps(partes, protocol=4))
+        return h.hexdigest()
+
+    def obter_ou_calcular(self, chave, calcular, conferir=None):
+        """
+        Valor da `chave` no cache; se ausente, calcula com `calcular()` e
+        grava. `conferir()`, se informado, roda entre o cálculo e a
+        gravação: uma exceção nele descarta o resultado (ex.: os arquivos
+        de entrada mudaram durante a leitura e a chave já não os descreve).
+        """
+        achou, valor = self.obter(chave) if self.ativo else (False, None)
+        if not achou:
+            valor = calcular()
+            if conferir is not None:
+                conferir()
+            if self.ativo:
+                self.gravar(chave, valor)
+        return valor
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave + _SUFIXO)
+
+    def obter(self, chave):
+        """Retorna (achou, valor)."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                valor = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # arquivo de uma versão incompatível: descarta e recalcula
+            self._remover(caminho)
+            return False, None
+        try:
+            os.utime(caminho)  # marca o uso recente (LRU)
+        except FileNotFoundError:
+            pass  # despejado por outro worker logo após a leitura
+        return True, valor
+
+    def gravar(self, chave, valor):
+        descritor, temporario = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, self._caminho(chave))
+        except BaseException:
+            self._remover(temporario)
+            raise
+        self._despejar()
+
+    def _despejar(self):
+        """Apaga os resultados menos usados recentemente até caber no limite."""
+        entradas = []
+        with os.scandir(self.pasta) as it:
+            for e in it:
+                if e.name.endswith(_SUFIXO):
+                    try:
+                        estado = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    entradas.append((estado.st_mtime_ns, estado.st_size, e.path))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            self._remover(caminho)
+            total -= tamanho
+
+    @staticmethod
+    def _remover(caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+    def limpar(self):
+        for caminho in glob.glob(os.path.join(self.pasta, "*" + _SUFIXO)):
+            self._remover(caminho)
+
+    def memorizar(self, func, conferir=None):
+        """
+        Decorador: consulta o cache em disco antes de chamar `func`
+        (`conferir` como em obter_ou_calcular).
+        """
+        if not self.ativo and conferir is None:
+            return func
+
+        @functools.wraps(func)
+        def envolvida(*args, **kwargs):
+            return self.obter_ou_calcular(
+                self.chave(func, args, kwargs), lambda: func(*args, **kwargs), conferir
+            )
+
+        return envolvida
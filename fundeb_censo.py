@@ -0,0 +1,166 @@
+# ================================================================
+# fundeb_censo.py – Matrículas do Censo Escolar (INEP) por município
+# (sem dependência do Streamlit)
+# ================================================================
+# O Fundeb é distribuído por matrícula ponderada, mas a planilha não traz
+# matrículas. Este módulo lê os microdados do Censo Escolar de uma pasta
+# local (PASTA_CENSO; arquivos .csv, .csv.gz ou .zip, como publicados
+# pelo INEP) e agrega as matrículas da rede municipal por ano, município
+# e etapa, em blocos de LINHAS_POR_BLOCO linhas e só com as colunas
+# necessárias – a memória não cresce com o tamanho do arquivo.
+#
+# Dois leiautes são reconhecidos pelo cabeçalho:
+# - matrícula (uma linha por matrícula, dezenas de milhões de linhas):
+#   NU_ANO_CENSO, CO_MUNICIPIO, TP_DEPENDENCIA, TP_ETAPA_ENSINO
+# - escola (uma linha por escola, leiaute atual):
+#   NU_ANO_CENSO, CO_MUNICIPIO, TP_DEPENDENCIA, QT_MAT_*
+#
+# O Fundeb de um ano usa as matrículas do Censo do ano anterior
+# (DEFASAGEM_CENSO): o Censo de 2023 é ligado ao ANO 2024 da planilha.
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+PASTA_CENSO = "censo_escolar"
+
+LINHAS_POR_BLOCO = 1_000_000
+
+DEFASAGEM_CENSO = 1
+
+# TP_DEPENDENCIA: 1 federal, 2 estadual, 3 municipal, 4 privada
+DEPENDENCIAS_CENSO = [3]
+
+# Etapa -> fator de ponderação do Fundeb (valores de referência para
+# tempo parcial e área urbana; ajuste aqui se a análise exigir outros)
+ETAPAS_CENSO = {
+    "Creche": 1.20,
+    "Pré-escola": 1.10,
+    "Fundamental – anos iniciais": 1.00,
+    "Fundamental – anos finais": 1.10,
+    "Ensino médio": 1.25,
+    "EJA": 0.80,
+    "Outras": 1.00,
+}
+
+# Leiaute matrícula: TP_ETAPA_ENSINO -> etapa (dicionário dos microdados);
+# códigos ausentes contam em "Outras"
+CODIGOS_ETAPA = {
+    1: "Creche",
+    2: "Pré-escola",
+    **{c: "Fundamental – anos iniciais" for c in (14, 15, 16, 17, 18)},
+    **{c: "Fundamental – anos finais" for c in (19, 20, 21, 41)},
+    **{c: "Ensino médio" for c in range(25, 39)},
+    **{c: "EJA" for c in (65, 67, 69, 70, 71, 72, 73, 74)},
+}
+
+# Leiaute escola: coluna de quantidade -> etapa
+COLUNAS_QT_ETAPA = {
+    "QT_MAT_INF_CRE": "Creche",
+    "QT_MAT_INF_PRE": "Pré-escola",
+    "QT_MAT_FUND_AI": "Fundamental – anos iniciais",
+    "QT_MAT_FUND_AF": "Fundamental – anos finais",
+    "QT_MAT_MED": "Ensino médio",
+    "QT_MAT_EJA": "EJA",
+}
+
+COLUNAS_CHAVE_CENSO = ["NU_ANO_CENSO", "CO_MUNICIPIO", "TP_DEPENDENCIA"]
+
+COLUNAS_MATRICULAS = ["Matriculas", "Matriculas_Ponderadas", "Fundeb_por_aluno"]
+
+
+def localizar_censo(pasta=PASTA_CENSO):
+    """Arquivos de microdados na pasta (ordenados), ou lista vazia."""
+    padroes = ["*.csv", "*.CSV", "*.csv.gz", "*.zip"]
+    return sorted({c for p in padroes for c in glob.glob(os.path.join(pasta, p))})
+
+
+def _cabecalho(caminho):
+    """(separador, colunas) do arquivo: ";" (atual), "|" (anos antigos) ou ","."""
+    for sep in (";", "|", ","):
+        colunas = list(pd.read_csv(caminho, sep=sep, nrows=0, encoding="latin-1").columns)
+        if all(c in colunas for c in COLUNAS_CHAVE_CENSO):
+            return sep, colunas
+    raise ValueError(f"{os.path.basename(caminho)}: colunas {COLUNAS_CHAVE_CENSO} não encontradas")
+
+
+def agregar_arquivo(caminho, codigos=None, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Matrículas de um arquivo de microdados por (ANO, Código IBGE, Etapa).
+    Lê em blocos, só as colunas do leiaute; `codigos` restringe os
+    municípios (ex.: os da planilha) já em cada bloco.
+    """
+    sep, colunas = _cabecalho(caminho)
+    por_matricula = "TP_ETAPA_ENSINO" in colunas
+    extras = ["TP_ETAPA_ENSINO"] if por_matricula else [c for c in COLUNAS_QT_ETAPA if c in colunas]
+    filtro = np.array(sorted(codigos), dtype="int64") if codigos is not None else None
+
+    total = None
+    for bloco in pd.read_csv(
+        caminho, sep=sep, encoding="latin-1", usecols=COLUNAS_CHAVE_CENSO + extras,
+        dtype="float64", chunksize=linhas_por_bloco,
+    ):
+        bloco = bloco[bloco["TP_DEPENDENCIA"].isin(DEPENDENCIAS_CENSO)]
+        if filtro is not None:
+            bloco = bloco[np.isin(bloco["CO_MUNICIPIO"].to_numpy(), filtro)]
+        bloco = bloco.dropna(subset=["NU_ANO_CENSO", "CO_MUNICIPIO"])
+        if bloco.empty:
+            continue
+
+        if por_matricula:
+            etapa = bloco["TP_ETAPA_ENSINO"].map(CODIGOS_ETAPA).fillna("Outras")
+            parcial = bloco.groupby([bloco["NU_ANO_CENSO"], bloco["CO_MUNICIPIO"], etapa]).size()
+        else:
+            parcial = (
+                bloco.groupby(["NU_ANO_CENSO", "CO_MUNICIPIO"])[extras].sum()
+                .rename(columns=COLUNAS_QT_ETAPA)
+                .stack()
+            )
+        parcial.index.names = ["ANO", "Código IBGE", "Etapa"]
+        total = parcial if total is None else total.add(parcial, fill_value=0)
+
+    if total is None:
+        return pd.Series(dtype="float64", index=pd.MultiIndex.from_arrays(
+            [[], [], []], names=["ANO", "Código IBGE", "Etapa"]))
+    return total
+
+
+def agregar_censo(arquivos, codigos=None, processos=1):
+    """
+    Matrículas de todos os `arquivos` (um processo por arquivo se
+    `processos` > 1), em formato longo: ANO (do Censo), Código IBGE,
+    Etapa, Matrículas e Matrículas ponderadas (ETAPAS_CENSO).
+    """
+    if processos > 1 and len(arquivos) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(agregar_arquivo, arquivos, [codigos] * len(arquivos)))
+    else:
+        partes = [agregar_arquivo(a, codigos) for a in arquivos]
+
+    soma = pd.concat(partes).groupby(level=[0, 1, 2]).sum()
+    censo = soma.rename("Matrículas").reset_index()
+    censo["ANO"] = censo["ANO"].astype("int64")
+    censo["Código IBGE"] = censo["Código IBGE"].astype("int64")
+    censo["Matrículas ponderadas"] = censo["Matrículas"] * censo["Etapa"].map(ETAPAS_CENSO).fillna(1.0)
+    return censo.sort_values(["ANO", "Código IBGE", "Etapa"], ignore_index=True)
+
+
+def juntar_matriculas(df, censo):
+    """
+    Acrescenta à base as COLUNAS_MATRICULAS, ligando o Censo de ANO - 1
+    (DEFASAGEM_CENSO) a cada ANO da planilha. Municípios sem matrículas
+    no Censo ficam sem valor.
+    """
+    por_municipio = (
+        censo.groupby(["ANO", "Código IBGE"], as_index=False)[["Matrículas", "Matrículas ponderadas"]].sum()
+        .rename(columns={"Matrículas": "Matriculas", "Matrículas ponderadas": "Matriculas_Ponderadas"})
+    )
+    por_municipio["ANO"] = (por_municipio["ANO"] + DEFASAGEM_CENSO).astype("Int64")
+    por_municipio["Código IBGE"] = por_municipio["Código IBGE"].astype("Int64")
+
+    df = df.drop(columns=[c for c in COLUNAS_MATRICULAS if c in df.columns])
+    df = df.merge(por_municipio, on=["ANO", "Código IBGE"], how="left")
+    df["Fundeb_por_aluno"] = df["Fundeb_Total"] / df["Matriculas_Ponderadas"].where(df["Matriculas_Ponderadas"] > 0)
+    return df
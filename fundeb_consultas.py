@@ -0,0 +1,434 @@
+# ================================================================
+# fundeb_consultas.py – Consultas das seções do painel (pandas ou DuckDB)
+# ================================================================
+# As seções do painel não filtram mais a base inteira em memória: pedem
+# a uma "fonte" só as linhas e colunas que exibem (o ano, o município,
+# os últimos anos, os totais por ano). Há duas fontes com a mesma API:
+#
+# - ConsultasPandas: a base normalizada inteira em memória (padrão)
+# - ConsultasDuckDB: a base normalizada em Parquet, consultada com DuckDB;
+#   filtros e projeções vão para a leitura dos arquivos (predicate
+#   pushdown), e só o resultado é trazido para a memória – o que permite
+#   bases de vários estados e anos maiores que a RAM
+#
+# O DuckDB é opcional (pip install duckdb). Layout da pasta Parquet:
+#   <pasta>/base/*.parquet   – linhas da base normalizada (ler_base), um
+#                              ou mais arquivos com as mesmas colunas
+#   <pasta>/perdas.parquet   – perdas de conversão (opcional)
+#   <pasta>/repasses/*.parquet – repasses mensais/decendiais (opcional,
+#                              colunas de fundeb_dados.COLUNAS_REPASSES)
+import os
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+
+from fundeb_dados import (
+    ANO_INICIAL,
+    agregados_ano,
+    aplicar_esquema,
+    evolucao_anual,
+    filtrar_anos_analise,
+    ler_repasses,
+    rotulo_municipio,
+)
+
+try:
+    import duckdb
+except ImportError:  # backend opcional
+    duckdb = None
+
+BACKENDS = ["pandas", "duckdb"]
+
+# Linhas por row group: o DuckDB pula row groups pelo mínimo/máximo de
+# ANO e Código IBGE, por isso a exportação grava a base ordenada por eles
+LINHAS_ROW_GROUP = 16_384
+
+COLUNAS_PERDAS = ["Coluna", "Células perdidas", "Exemplos"]
+
+# Base completa para download: CSV como o Excel brasileiro abre (";",
+# decimal "," e BOM do UTF-8)
+BOM_UTF8 = b"\xef\xbb\xbf"
+
+
+def _aspas(coluna):
+    """Identificador SQL entre aspas (as colunas têm acentos e espaços)."""
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+def _literal(caminho):
+    """Caminho como literal SQL."""
+    return "'" + caminho.replace("'", "''") + "'"
+
+
+def _selecao(colunas):
+    return "*" if colunas is None else ", ".join(_aspas(c) for c in colunas)
+
+
+def _nomear_repasses(serie, codigos):
+    """
+    (MUNICÍPIO, Data, Valor) a partir da série por código IBGE; `codigos`
+    é um DataFrame (Código IBGE, MUNICÍPIO) dos municípios escolhidos.
+    Homônimos escolhidos juntos ganham a UF no nome, para não virarem uma
+    série só no gráfico.
+    """
+    df = serie.merge(codigos, on="Código IBGE", how="inner")
+    df["MUNICÍPIO"] = df["MUNICÍPIO"].astype(str)
+    nomes = codigos["MUNICÍPIO"].astype(str)
+    if nomes.duplicated().any():
+        df["MUNICÍPIO"] = [rotulo_municipio(n, c) for n, c in zip(df["MUNICÍPIO"], df["Código IBGE"])]
+    return df[["MUNICÍPIO", "Data", "Valor"]].sort_values(["MUNICÍPIO", "Data"], ignore_index=True)
+
+
+# ================================================================
+# FONTE EM MEMÓRIA (PANDAS)
+# ================================================================
+class ConsultasPandas:
+    """Consultas das seções sobre a base inteira em memória."""
+
+    def __init__(self, df, perdas=None, caminho_repasses=None):
+        self._bruta = df
+        self._base = filtrar_anos_analise(df)
+        self._perdas = perdas if perdas is not None else pd.DataFrame(columns=COLUNAS_PERDAS)
+        self._caminho_repasses = caminho_repasses
+        self._repasses = None
+        self._trava_repasses = threading.Lock()
+
+    def _colunas(self, df, colunas):
+        return df if colunas is None else df[list(colunas)]
+
+    def anos(self):
+        return sorted(int(a) for a in self._base["ANO"].dropna().unique())
+
+    def municipios(self):
+        """(Código IBGE, MUNICÍPIO), um por código, em ordem de nome."""
+        pares = self._base[["Código IBGE", "MUNICÍPIO"]].dropna().drop_duplicates("Código IBGE")
+        pares = pd.DataFrame({
+            "Código IBGE": pares["Código IBGE"].astype(int).to_numpy(),
+            "MUNICÍPIO": pares["MUNICÍPIO"].astype(str).to_numpy(),
+        })
+        return pares.sort_values(["MUNICÍPIO", "Código IBGE"], ignore_index=True)
+
+    def ano(self, ano, colunas=None):
+        return self._colunas(self._base[self._base["ANO"] == ano], colunas).copy()
+
+    def municipio(self, codigo, colunas=None):
+        df_mun = self._base[(self._base["Código IBGE"] == int(codigo)).fillna(False)].sort_values("ANO")
+        return self._colunas(df_mun, colunas).copy()
+
+    def anos_recentes(self, n, colunas=None):
+        recentes = self.anos()[-n:]
+        return self._colunas(self._base[self._base["ANO"].isin(recentes)], colunas).copy()
+
+    def agregados_ano(self, ano):
+        return agregados_ano(self._base[self._base["ANO"] == ano])
+
+    def evolucao_anual(self):
+        return evolucao_anual(self._base)
+
+    def por_ano(self, colunas=None, bruta=False):
+        """
+        A base das análises (ou, com `bruta`, a de todos os anos, como lida
+        da planilha) um ano por vez: as passadas sobre todos os anos
+        (validação, histogramas, momentos) não montam a base inteira.
+        """
+        df = self._bruta if bruta else self._base
+        for _, parte in df.groupby("ANO", observed=True, dropna=False, sort=True):
+            yield self._colunas(parte, colunas)
+
+    formatos_download = ["csv"]
+
+    def arquivo_base(self, formato="csv"):
+        """Base das análises, para download, no `formato` (só "csv")."""
+        return BOM_UTF8 + self._base.to_csv(index=False, sep=";", decimal=",").encode("utf-8")
+
+    def perdas(self):
+        return self._perdas
+
+    def _tabela_repasses(self):
+        """Série de repasses, lida só na 1ª consulta (arquivo opcional e grande)."""
+        with self._trava_repasses:
+            if self._repasses is None and self._caminho_repasses:
+                self._repasses = ler_repasses(self._caminho_repasses)
+        return self._repasses
+
+    def periodo_repasses(self):
+        """(primeira data, última data) da série de repasses, ou None."""
+        rep = self._tabela_repasses()
+        if rep is None or rep.empty:
+            return None
+        return rep["Data"].min(), rep["Data"].max()
+
+    def repasses(self, codigos, transferencia, inicio, fim, mensal=False):
+        """
+        Série de `transferencia` dos municípios (`codigos` IBGE) entre
+        `inicio` e `fim` (inclusive), somada por mês quando `mensal`.
+        """
+        rep = self._tabela_repasses()
+        selecionados = self._base["Código IBGE"].isin([int(c) for c in codigos]).fillna(False)
+        codigos = self._base.loc[selecionados, ["Código IBGE", "MUNICÍPIO"]].drop_duplicates("Código IBGE")
+        if rep is None or codigos.empty:
+            return pd.DataFrame(columns=["MUNICÍPIO", "Data", "Valor"])
+
+        sel = rep[
+            rep["Código IBGE"].isin(codigos["Código IBGE"])
+            & (rep["Transferência"] == transferencia)
+            & rep["Data"].between(pd.Timestamp(inicio), pd.Timestamp(fim))
+        ]
+        datas = sel["Data"].dt.to_period("M").dt.to_timestamp() if mensal else sel["Data"]
+        serie = (
+            sel.groupby([sel["Código IBGE"], datas.rename("Data")], observed=True)["Valor"]
+            .sum()
+            .reset_index()
+        )
+        return _nomear_repasses(serie, codigos)
+
+
+# ================================================================
+# FONTE EM PARQUET (DUCKDB)
+# ================================================================
+def parquet_disponivel(pasta, subpasta="base"):
+    caminho = os.path.join(pasta, subpasta)
+    return os.path.isdir(caminho) and any(a.endswith(".parquet") for a in os.listdir(caminho))
+
+
+def _para_parquet(df):
+    """
+    Colunas category com categorias de tipos misturados (ex.: números e
+    "-" em uma coluna não convertida) viram texto: o Parquet exige um
+    tipo por coluna.
+    """
+    df = df.copy()
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            categorias = df[c].cat.categories
+            if categorias.dtype == object and not all(isinstance(v, str) for v in categorias):
+                df[c] = df[c].astype("string")
+    return df
+
+
+def exportar_repasses(repasses, pasta):
+    """
+    Grava a série de repasses (saída de ler_repasses) em <pasta>/repasses,
+    ordenada por município, transferência e data (row groups pequenos por
+    município). O arquivo é gravado à parte e trocado de forma atômica.
+    """
+    if duckdb is None:
+        raise ImportError("o backend DuckDB requer o pacote 'duckdb' (pip install duckdb)")
+
+    os.makedirs(os.path.join(pasta, "repasses"), exist_ok=True)
+    destino = os.path.join(pasta, "repasses", "repasses.parquet")
+    temporario = f"{destino}.{os.getpid()}.tmp"
+
+    con = duckdb.connect()
+    try:
+        con.register("df_repasses", repasses.sort_values(["Código IBGE", "Transferência", "Data"]))
+        con.execute(
+            f"COPY df_repasses TO {_literal(temporario)} "
+            f"(FORMAT PARQUET, ROW_GROUP_SIZE {LINHAS_ROW_GROUP})"
+        )
+    finally:
+        con.close()
+    os.replace(temporario, destino)
+
+
+def exportar_parquet(df, perdas, pasta, repasses=None):
+    """
+    Grava a base normalizada (saída de ler_base), as perdas de conversão
+    e, se houver, os repasses no layout lido pela ConsultasDuckDB. A
+    pasta é trocada de forma atômica: leitores nunca veem uma exportação
+    pela metade.
+    """
+    if duckdb is None:
+        raise ImportError("o backend DuckDB requer o pacote 'duckdb' (pip install duckdb)")
+
+    temporaria = f"{pasta.rstrip(os.sep)}.{os.getpid()}.tmp"
+    os.makedirs(os.path.join(temporaria, "base"), exist_ok=True)
+
+    con = duckdb.connect()
+    try:
+        con.register("df_base", _para_parquet(df).sort_values(["ANO", "Código IBGE"]))
+        con.execute(
+            f"COPY df_base TO {_literal(os.path.join(temporaria, 'base', 'base.parquet'))} "
+            f"(FORMAT PARQUET, ROW_GROUP_SIZE {LINHAS_ROW_GROUP})"
+        )
+        con.register("df_perdas", perdas)
+        con.execute(f"COPY df_perdas TO {_literal(os.path.join(temporaria, 'perdas.parquet'))} (FORMAT PARQUET)")
+    finally:
+        con.close()
+    if repasses is not None:
+        exportar_repasses(repasses, temporaria)
+
+    if os.path.exists(pasta):
+        antiga = f"{pasta.rstrip(os.sep)}.{os.getpid()}.old"
+        os.replace(pasta, antiga)
+        os.replace(temporaria, pasta)
+        shutil.rmtree(antiga)
+    else:
+        os.replace(temporaria, pasta)
+
+
+class ConsultasDuckDB:
+    """
+    Consultas das seções sobre a base em Parquet. Cada método executa uma
+    consulta com filtro e projeção próprios e devolve um DataFrame já no
+    ESQUEMA_TIPOS (mesmos tipos da ConsultasPandas).
+    """
+
+    def __init__(self, pasta):
+        if duckdb is None:
+            raise ImportError("o backend DuckDB requer o pacote 'duckdb' (pip install duckdb)")
+        if not parquet_disponivel(pasta):
+            raise FileNotFoundError(f"nenhum arquivo Parquet em '{os.path.join(pasta, 'base')}'")
+
+        self._pasta = pasta
+        self._con = duckdb.connect()
+        arquivos = _literal(os.path.join(pasta, "base", "*.parquet"))
+        self._con.execute(
+            f"CREATE VIEW base_bruta AS SELECT * FROM read_parquet({arquivos}, union_by_name = true)"
+        )
+        self._con.execute(f"CREATE VIEW base AS SELECT * FROM base_bruta WHERE ANO >= {ANO_INICIAL}")
+
+        self._com_repasses = parquet_disponivel(pasta, "repasses")
+        if self._com_repasses:
+            arquivos = _literal(os.path.join(pasta, "repasses", "*.parquet"))
+            self._con.execute(f"CREATE VIEW repasses AS SELECT * FROM read_parquet({arquivos})")
+
+    def _consulta(self, sql, parametros=()):
+        # um cursor por consulta: as sessões do Streamlit rodam em threads
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, list(parametros)).df()
+        finally:
+            cursor.close()
+
+    def _tabela(self, sql, parametros=()):
+        # textos chegam como object e NULL em inteiros chega como float
+        return aplicar_esquema(self._consulta(sql, parametros))
+
+    def anos(self):
+        return [int(a) for a in self._consulta("SELECT DISTINCT ANO FROM base ORDER BY ANO")["ANO"]]
+
+    def municipios(self):
+        """(Código IBGE, MUNICÍPIO), um por código, em ordem de nome."""
+        pares = self._consulta(
+            'SELECT "Código IBGE", MIN(CAST("MUNICÍPIO" AS VARCHAR)) AS "MUNICÍPIO" FROM base '
+            'WHERE "MUNICÍPIO" IS NOT NULL AND "Código IBGE" IS NOT NULL '
+            'GROUP BY "Código IBGE" ORDER BY "MUNICÍPIO", "Código IBGE"'
+        )
+        pares["Código IBGE"] = pares["Código IBGE"].astype(int)
+        return pares
+
+    def ano(self, ano, colunas=None):
+        return self._tabela(f"SELECT {_selecao(colunas)} FROM base WHERE ANO = ?", [int(ano)])
+
+    def municipio(self, codigo, colunas=None):
+        return self._tabela(
+            f'SELECT {_selecao(colunas)} FROM base WHERE "Código IBGE" = ? ORDER BY ANO', [int(codigo)]
+        )
+
+    def anos_recentes(self, n, colunas=None):
+        return self._tabela(
+            f"SELECT {_selecao(colunas)} FROM base "
+            "WHERE ANO IN (SELECT DISTINCT ANO FROM base ORDER BY ANO DESC LIMIT ?)", [int(n)]
+        )
+
+    def agregados_ano(self, ano):
+        # totais somados no DuckDB; a razão sai da mesma função da fonte pandas
+        totais = self._consulta(
+            "SELECT SUM(Fundeb_Base) AS Fundeb_Base, SUM(Compl_VAAF) AS Compl_VAAF, "
+            "SUM(Compl_VAAT) AS Compl_VAAT, SUM(Compl_VAAR) AS Compl_VAAR, "
+            "SUM(ICMS_Educacional) AS ICMS_Educacional, SUM(Orcamento_Total) AS Orcamento_Total, "
+            "SUM(Despesa_Educacao) AS Despesa_Educacao FROM base WHERE ANO = ?", [int(ano)]
+        )
+        return agregados_ano(totais.astype("float64"))
+
+    def evolucao_anual(self):
+        por_ano = self._consulta(
+            "SELECT ANO, SUM(Fundeb_Base) AS Fundeb_Base, SUM(Compl_VAAF) AS Compl_VAAF, "
+            "SUM(Compl_VAAT) AS Compl_VAAT, SUM(Compl_VAAR) AS Compl_VAAR, "
+            "SUM(ICMS_Educacional) AS ICMS_Educacional FROM base GROUP BY ANO"
+        )
+        return evolucao_anual(aplicar_esquema(por_ano))
+
+    def por_ano(self, colunas=None, bruta=False):
+        """Como ConsultasPandas.por_ano: uma consulta por ano (filtro nos row groups)."""
+        tabela = "base_bruta" if bruta else "base"
+        anos = self._consulta(f"SELECT DISTINCT ANO FROM {tabela} ORDER BY ANO NULLS LAST")["ANO"]
+        for ano in anos:
+            if pd.isna(ano):
+                yield self._tabela(f"SELECT {_selecao(colunas)} FROM {tabela} WHERE ANO IS NULL")
+            else:
+                yield self._tabela(f"SELECT {_selecao(colunas)} FROM {tabela} WHERE ANO = ?", [int(ano)])
+
+    formatos_download = ["csv", "parquet"]
+
+    def arquivo_base(self, formato="csv"):
+        """
+        Base das análises, para download, escrita pelo próprio DuckDB (COPY)
+        direto dos Parquet, sem passar por um DataFrame. No CSV, o decimal
+        "," sai no SELECT (o COPY não escreve outro separador decimal).
+        """
+        if formato == "parquet":
+            consulta, opcoes = "SELECT * FROM base", "FORMAT PARQUET"
+        else:
+            tipos = self._consulta("DESCRIBE base")
+            colunas = [
+                f"replace(CAST({_aspas(c)} AS VARCHAR), '.', ',') AS {_aspas(c)}"
+                if t in ("DOUBLE", "FLOAT") or t.startswith("DECIMAL") else _aspas(c)
+                for c, t in zip(tipos["column_name"], tipos["column_type"])
+            ]
+            consulta, opcoes = f"SELECT {', '.join(colunas)} FROM base", "FORMAT CSV, HEADER, DELIMITER ';'"
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, f"base.{formato}")
+            cursor = self._con.cursor()
+            try:
+                cursor.execute(f"COPY ({consulta} ORDER BY ANO, \"Código IBGE\") TO {_literal(caminho)} ({opcoes})")
+            finally:
+                cursor.close()
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+        return conteudo if formato == "parquet" else BOM_UTF8 + conteudo
+
+    def perdas(self):
+        caminho = os.path.join(self._pasta, "perdas.parquet")
+        if not os.path.exists(caminho):
+            return pd.DataFrame(columns=COLUNAS_PERDAS)
+        return self._consulta(f"SELECT * FROM read_parquet({_literal(caminho)})")
+
+    def periodo_repasses(self):
+        """(primeira data, última data) da série de repasses, ou None."""
+        if not self._com_repasses:
+            return None
+        periodo = self._consulta("SELECT MIN(Data) AS inicio, MAX(Data) AS fim FROM repasses")
+        if periodo["inicio"].isna().iloc[0]:
+            return None
+        return pd.Timestamp(periodo["inicio"].iloc[0]), pd.Timestamp(periodo["fim"].iloc[0])
+
+    def repasses(self, codigos, transferencia, inicio, fim, mensal=False):
+        """
+        Série de `transferencia` dos municípios (`codigos` IBGE) entre
+        `inicio` e `fim` (inclusive), somada por mês quando `mensal`. Os
+        códigos entram na consulta como literais para que o filtro chegue
+        aos row groups.
+        """
+        codigos = self._consulta(
+            'SELECT DISTINCT "Código IBGE", CAST("MUNICÍPIO" AS VARCHAR) AS "MUNICÍPIO" FROM base '
+            'WHERE list_contains(?, "Código IBGE")', [[int(c) for c in codigos]]
+        ).drop_duplicates("Código IBGE")
+        if not self._com_repasses or codigos.empty:
+            return pd.DataFrame(columns=["MUNICÍPIO", "Data", "Valor"])
+
+        lista = ", ".join(str(int(c)) for c in codigos["Código IBGE"])
+        data = "date_trunc('month', Data)" if mensal else "Data"
+        serie = self._consulta(
+            f'SELECT "Código IBGE", {data} AS Data, SUM(Valor) AS Valor FROM repasses '
+            f'WHERE "Código IBGE" IN ({lista}) AND "Transferência" = ? AND Data BETWEEN ? AND ? '
+            "GROUP BY ALL",
+            [str(transferencia), pd.Timestamp(inicio), pd.Timestamp(fim)],
+        )
+        serie["Data"] = pd.to_datetime(serie["Data"])
+        codigos["Código IBGE"] = codigos["Código IBGE"].astype(serie["Código IBGE"].dtype)
+        return _nomear_repasses(serie, codigos)
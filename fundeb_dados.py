@@ -0,0 +1,1195 @@
+# ================================================================
+# fundeb_dados.py – Leitura, tipagem e validação da base do Painel Fundeb
+# (sem dependência do Streamlit: usado pelo painel e pelos scripts em lote)
+# ================================================================
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+NOME_PLANILHA = "loa.xlsx"
+NOME_REPASSES = "repasses_mensais.csv"  # opcional (ver ler_repasses)
+NOME_INDICES_ICMS = "indices_icms.csv"  # opcional (ver ler_indices_icms)
+NOME_DESPESAS_SIOPE = "despesas_siope.csv"  # opcional (ver ler_despesas_siope)
+CAMINHO_MAPA = "es_municipios.geojson"  # mesmo nível do fundeb.py
+
+# Pastas onde a planilha é procurada, em ordem
+PASTAS_DADOS = ["", "data", "dados", "Data", "Dados"]
+
+# Anos anteriores a este ficam fora de todas as análises
+ANO_INICIAL = 2021
+
+
+# ================================================================
+# IDENTIFICAÇÃO DO MUNICÍPIO (CÓDIGO IBGE E UF)
+# ================================================================
+# Sigla da UF pelos 2 primeiros dígitos do código IBGE do município
+SIGLAS_UF = {
+    11: "RO", 12: "AC", 13: "AM", 14: "RR", 15: "PA", 16: "AP", 17: "TO",
+    21: "MA", 22: "PI", 23: "CE", 24: "RN", 25: "PB", 26: "PE", 27: "AL", 28: "SE", 29: "BA",
+    31: "MG", 32: "ES", 33: "RJ", 35: "SP", 41: "PR", 42: "SC", 43: "RS",
+    50: "MS", 51: "MT", 52: "GO", 53: "DF",
+}
+
+
+def sigla_uf(codigo):
+    """UF do município pelo código IBGE (7 dígitos), ou "" se desconhecida."""
+    try:
+        return SIGLAS_UF.get(int(codigo) // 100_000, "")
+    except (TypeError, ValueError):
+        return ""
+
+
+def rotulo_municipio(nome, codigo):
+    """
+    "NOME – UF": os nomes se repetem entre estados (há ~240 homônimos no
+    país), então o que aparece para escolha leva a UF.
+    """
+    uf = sigla_uf(codigo)
+    return f"{nome} – {uf}" if uf else str(nome)
+
+
+def nomes_exibicao(df):
+    """
+    MUNICÍPIO como texto, com a UF só nos nomes que se repetem em `df`
+    (homônimos de estados diferentes viram barras e pontos distintos).
+    """
+    nomes = df["MUNICÍPIO"].astype(str)
+    repetidos = nomes.groupby(nomes).transform("size").to_numpy() > 1
+    if not repetidos.any():
+        return nomes
+    nomes = nomes.copy()
+    nomes.loc[repetidos] = [
+        rotulo_municipio(n, c) for n, c in zip(nomes[repetidos], df["Código IBGE"].to_numpy()[repetidos])
+    ]
+    return nomes
+
+
+# ================================================================
+# FUNÇÃO DE FORMATAÇÃO MONETÁRIA (PADRÃO BRASILEIRO, SEM DECIMAIS)
+# ================================================================
+def formatar_reais(valor):
+    """
+    Converte valores numéricos para o padrão brasileiro:
+    R$ 1.234.567
+
+    - Sempre sem casas decimais
+    - Aceita valores None e NaN
+    """
+    if valor is None or pd.isna(valor):
+        return "-"
+
+    try:
+        valor_fmt = f"{float(valor):,.0f}"
+        valor_br = (
+            valor_fmt
+            .replace(",", "X")
+            .replace(".", ",")
+            .replace("X", ".")
+        )
+        return f"R$ {valor_br}"
+    except Exception:
+        return "-"
+
+
+def formatar_variacao(valor):
+    """Variação percentual com sinal (+12.3%) ou "-" quando ausente."""
+    return f"{valor*100:+.1f}%" if pd.notna(valor) else "-"
+
+
+# ================================================================
+# ESQUEMA COMPACTO DE TIPOS
+# ================================================================
+# Valores monetários agregados (somas estaduais, totais por ano) ficam em
+# float64 para que os totais continuem exatos ao real. Valores por aluno
+# e razões cabem em float32; textos repetidos viram category. As colunas
+# da planilha que só dariam origem a uma cópia (Orçamento -> Orcamento_Total
+# etc.) são renomeadas por ler_base: aparecem aqui só pelo nome derivado.
+COLS_MONETARIAS = [
+    "Receita Cota-parte ICMS Estimada",
+    "Receita Fundeb Estimada",
+    "Receita total do Fundeb Realizada",
+    "Fundeb_Base",
+    "Compl_VAAF",
+    "Compl_VAAT",
+    "Compl_VAAR",
+    "Fundeb_Total",
+    "ICMS_Educacional",
+    "ICMS_CotaParte",
+    "Orcamento_Total",
+    "Despesa_Educacao",
+    "Recursos_Educacao_Ampliados",
+]
+
+COLS_INDICADORES = [
+    "VAAF",
+    "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)",
+    "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)",
+    "VAAT Mínimo Brasil",
+    "Dep_Fundeb_orcamento",
+    "Dep_Fundeb_despesa_educ",
+]
+
+ESQUEMA_TIPOS = {
+    "Código IBGE": "Int32",
+    "ANO": "Int16",
+    "MUNICÍPIO": "category",
+    "Codigo_IBGE_str": "category",
+    "Habilitado ao VAAT?": "category",
+    "Status_VAAT_2026": "category",
+    "Recebe_VAAT": "bool",
+    "Recebe_VAAR": "bool",
+    **{c: "float64" for c in COLS_MONETARIAS},
+    **{c: "float32" for c in COLS_INDICADORES},
+}
+
+
+def aplicar_esquema(df):
+    """
+    Converte as colunas presentes para os tipos de ESQUEMA_TIPOS.
+
+    - Colunas ausentes no DataFrame são ignoradas
+    - Demais colunas de texto (object) viram category
+    """
+    tipos = {c: t for c, t in ESQUEMA_TIPOS.items() if c in df.columns}
+    df = df.astype(tipos)
+
+    for c in df.columns:
+        if c not in tipos and df[c].dtype == object:
+            df[c] = df[c].astype("category")
+
+    return df
+
+
+def relatorio_memoria(df):
+    """
+    Uso de memória por coluna (em bytes, contando o conteúdo das strings),
+    ordenado da coluna mais pesada para a mais leve.
+    """
+    uso = df.memory_usage(deep=True, index=False)
+    rel = pd.DataFrame({
+        "Coluna": uso.index,
+        "Tipo": [str(df[c].dtype) for c in uso.index],
+        "Bytes": uso.values,
+    })
+    rel["Participação"] = rel["Bytes"] / rel["Bytes"].sum()
+    return rel.sort_values("Bytes", ascending=False).reset_index(drop=True)
+
+
+def memoria_planilha(caminho):
+    """
+    Bytes da aba principal como o pandas a lê (tipos padrão, sem o
+    esquema): a referência do perfil de memória, medida e não estimada.
+    """
+    df = pd.read_excel(caminho, sheet_name="Planilha1")
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+# ================================================================
+# REGRAS DE VALIDAÇÃO DA BASE (EXECUTADAS UMA VEZ POR CARGA)
+# ================================================================
+# Textos tratados como "sem valor" na conversão numérica (não contam como perda)
+VALORES_VAZIOS = ["-", "--", "nan", "None", ""]
+
+# Diferença (em R$) tolerada entre Fundeb_Total e a receita total realizada
+TOLERANCIA_RECONCILIACAO = 1.0
+
+# Receita da contribuição ao Fundeb (sem complementações), quando a
+# planilha a traz à parte; sem ela, o Fundeb base é a receita total
+COLUNA_CONTRIBUICAO = "Receita da contribuição de estados e municípios ao Fundeb"
+
+
+def perdas_conversao(nome, bruto, convertido):
+    """
+    Conta as células que tinham conteúdo na planilha mas viraram NaN
+    na conversão numérica, com até 3 exemplos do texto original.
+    """
+    texto = bruto.astype(str).str.replace("R$", "", regex=False).str.strip()
+    perdeu = convertido.isna() & bruto.notna() & ~texto.isin(VALORES_VAZIOS)
+    return {
+        "Coluna": nome,
+        "Células perdidas": int(perdeu.sum()),
+        "Exemplos": ", ".join(texto[perdeu].unique()[:3]),
+    }
+
+
+def validar_base(partes, perdas, codigos_mapa):
+    """
+    Executa todas as verificações sobre a base completa, de forma vetorizada.
+    `partes` é a base (DataFrame) ou uma sequência de partes dela (ex.: um
+    ano por vez, de Consultas.por_ano). As verificações olham linha a
+    linha, exceto a de chave duplicada, que só compara linhas da mesma
+    parte: as partes não devem dividir um ano.
+
+    Retorna um dicionário de DataFrames:
+    - "resumo": uma linha por verificação, com o nº de ocorrências (sem
+      valor quando a verificação não se aplica), uma observação e a chave
+      da tabela de detalhe
+    - "conversao": células perdidas na conversão numérica, por coluna
+    - "duplicados": linhas com chave (ANO, Código IBGE) repetida
+    - "reconciliacao": linhas em que Fundeb_Total difere da receita total
+      realizada (só quando a planilha traz a receita da contribuição à
+      parte; sem ela, o Fundeb base já é a própria receita total e a
+      comparação não tem o que verificar)
+    - "denominadores": linhas sem orçamento ou despesa em educação positivos
+    - "sem_mapa": códigos IBGE da base ausentes no GeoJSON
+    """
+    if isinstance(partes, pd.DataFrame):
+        partes = [partes]
+    chave = ["ANO", "Código IBGE", "MUNICÍPIO"]
+    colunas_reconciliacao = chave + ["Fundeb_Total", "Receita total realizada", "Diferença"]
+
+    conversao = perdas[perdas["Células perdidas"] > 0].reset_index(drop=True)
+
+    duplicados, reconciliacao, denominadores, sem_mapa = [], [], [], []
+    reconcilia = False
+    for df in partes:
+        duplicados.append(df.loc[df.duplicated(["ANO", "Código IBGE"], keep=False), chave])
+
+        # Fundeb_Total = contribuição + complementações deve bater com a
+        # receita total realizada. Se a contribuição não veio na planilha,
+        # ler_base renomeia a própria receita total para Fundeb base e a
+        # diferença seria só a soma das complementações: não se aplica.
+        if "Receita total do Fundeb Realizada" in df.columns:
+            reconcilia = True
+            dif = df["Fundeb_Total"] - df["Receita total do Fundeb Realizada"]
+            divergente = dif.abs() > TOLERANCIA_RECONCILIACAO
+            parte = df.loc[divergente, chave + ["Fundeb_Total", "Receita total do Fundeb Realizada"]].rename(
+                columns={"Receita total do Fundeb Realizada": "Receita total realizada"}
+            )
+            parte["Diferença"] = dif[divergente]
+            reconciliacao.append(parte)
+
+        denom_invalido = ~(df["Orcamento_Total"] > 0) | ~(df["Despesa_Educacao"] > 0)
+        denominadores.append(df.loc[denom_invalido, chave + ["Orcamento_Total", "Despesa_Educacao"]])
+
+        sem_mapa.append(df.loc[
+            ~df["Codigo_IBGE_str"].astype(str).isin(codigos_mapa), ["Código IBGE", "MUNICÍPIO"]
+        ].drop_duplicates())
+
+    def juntar(tabelas, colunas):
+        tabelas = [t for t in tabelas if len(t)]
+        return pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame(columns=colunas)
+
+    # em ordem de (ANO, Código IBGE), qualquer que seja a ordem das partes
+    ordem = ["ANO", "Código IBGE"]
+    duplicados = juntar(duplicados, chave).sort_values(ordem, kind="stable")
+    reconciliacao = juntar(reconciliacao, colunas_reconciliacao).sort_values(ordem, kind="stable")
+    denominadores = juntar(denominadores, chave + ["Orcamento_Total", "Despesa_Educacao"]).sort_values(
+        ordem, kind="stable"
+    )
+    sem_mapa = juntar(sem_mapa, ["Código IBGE", "MUNICÍPIO"]).drop_duplicates()
+
+    if reconcilia:
+        n_reconciliacao = len(reconciliacao)
+        obs_reconciliacao = "Contribuição + complementações × receita total realizada."
+    else:
+        reconciliacao = pd.DataFrame(columns=chave)
+        n_reconciliacao = pd.NA
+        obs_reconciliacao = (
+            f"Não se aplica: sem a coluna '{COLUNA_CONTRIBUICAO}', o Fundeb base é a própria "
+            "receita total realizada."
+        )
+
+    resumo = pd.DataFrame({
+        "Verificação": [
+            "Células perdidas na conversão numérica",
+            "Linhas com chave (ANO, Código IBGE) duplicada",
+            "Linhas com Fundeb_Total diferente da receita total realizada",
+            "Linhas sem orçamento ou despesa em educação positivos",
+            "Municípios sem correspondência no mapa",
+        ],
+        "Ocorrências": [
+            int(conversao["Células perdidas"].sum()),
+            len(duplicados),
+            n_reconciliacao,
+            len(denominadores),
+            len(sem_mapa),
+        ],
+        "Observação": ["", "", obs_reconciliacao, "", ""],
+        "Detalhe": ["conversao", "duplicados", "reconciliacao", "denominadores", "sem_mapa"],
+    })
+    resumo["Ocorrências"] = resumo["Ocorrências"].astype("Int64")
+
+    return {
+        "resumo": resumo,
+        "conversao": conversao,
+        "duplicados": duplicados.reset_index(drop=True),
+        "reconciliacao": reconciliacao.reset_index(drop=True),
+        "denominadores": denominadores.reset_index(drop=True),
+        "sem_mapa": sem_mapa.reset_index(drop=True),
+    }
+
+
+# ================================================================
+# LEITURA DA PLANILHA E DO MAPA
+# ================================================================
+def localizar_planilha(nome_arquivo=NOME_PLANILHA):
+    """Primeiro caminho existente entre as PASTAS_DADOS, ou None."""
+    for pasta in PASTAS_DADOS:
+        caminho = os.path.join(pasta, nome_arquivo)
+        if os.path.exists(caminho):
+            return caminho
+    return None
+
+
+# Colunas da planilha renomeadas por ler_base para o nome usado nas seções:
+# a coluna derivada é a própria coluna lida, e não uma 2ª cópia em float64
+COLUNAS_RENOMEADAS = {
+    "Orçamento": "Orcamento_Total",
+    "Despesa Educação": "Despesa_Educacao",
+    "Cota-parte ICMS Realizada": "ICMS_CotaParte",
+    "ICMS Educacional": "ICMS_Educacional",
+    "Complementação da União-VAAT (art. 16, VI) (R$)": "Compl_VAAT",
+    "Complementação da União-VAAR (R$)": "Compl_VAAR",
+}
+
+# Colunas calculadas por ler_base (as renomeadas acima continuam sendo
+# dados da planilha e entram na comparação de revisões)
+COLUNAS_DERIVADAS = [
+    "Compl_VAAF", "Fundeb_Total",
+    "Recursos_Educacao_Ampliados", "Dep_Fundeb_orcamento", "Dep_Fundeb_despesa_educ",
+    "Recebe_VAAT", "Recebe_VAAR", "Codigo_IBGE_str",
+]
+
+
+def ler_base(caminho):
+    """
+    Lê a planilha, converte as colunas numéricas, cria as colunas
+    derivadas e aplica o ESQUEMA_TIPOS.
+
+    Retorna (df, perdas), em que `perdas` conta, por coluna numérica,
+    as células perdidas na conversão (ver perdas_conversao).
+    """
+    # Carrega planilha principal
+    df = pd.read_excel(caminho, sheet_name="Planilha1")
+
+    # Remove espaços extras no início/fim dos nomes de coluna
+    df.columns = [c.strip() for c in df.columns]
+
+    # ---------------- Função de conversão numérica inteligente ----------------
+    def _coerce_numeric(col):
+        """
+        Converte para número aceitando:
+        - Formato BR: 1.234,56   (usa vírgula)
+        - Formato "padrão": 4067327.36 (sem vírgula, ponto como decimal)
+        - Remove 'R$', espaços, traços, etc.
+        """
+        if pd.api.types.is_numeric_dtype(col):
+            return col
+
+        col = col.astype(str)
+        col = col.str.replace("R$", "", regex=False)
+        col = col.str.strip()
+
+        # onde tiver vírgula, tratamos como formato brasileiro
+        mask_comma = col.str.contains(",", regex=False)
+
+        col2 = col.copy()
+        # Formato BR: 1.234,56 -> 1234.56
+        col2[mask_comma] = (
+            col2[mask_comma]
+            .str.replace(".", "", regex=False)
+            .str.replace(",", ".", regex=False)
+        )
+        # onde NÃO tiver vírgula, mantemos como está (ponto já é decimal)
+        col2[~mask_comma] = col2[~mask_comma]
+
+        col2 = col2.replace({v: np.nan for v in VALORES_VAZIOS})
+        return pd.to_numeric(col2, errors="coerce")
+
+    # Lista de colunas numéricas (pelo nome exato que está na planilha)
+    num_cols = [
+        "Orçamento",
+        "Despesa Educação",
+        "Receita Cota-parte ICMS Estimada",
+        "Receita Fundeb Estimada",
+        "Cota-parte ICMS Realizada",
+        "ICMS Educacional",
+        "Receita total do Fundeb Realizada",
+        "VAAF",
+        "VAAT anterior à Complementação-VAAT (art. 16, IV) (R$)",
+        "VAAT com a Complementação da União-VAAT (art. 16, V) (R$)",
+        "Complementação da União-VAAT (art. 16, VI) (R$)",
+        "Complementação da União-VAAR (R$)",
+        "VAAT Mínimo Brasil",
+    ]
+
+    perdas = []
+    for c in num_cols:
+        if c in df.columns:
+            bruto = df[c]
+            df[c] = _coerce_numeric(bruto)
+            perdas.append(perdas_conversao(c, bruto, df[c]))
+    perdas = pd.DataFrame(perdas, columns=["Coluna", "Células perdidas", "Exemplos"])
+
+    # Ajuste de tipos de ano e código IBGE
+    if "ANO" in df.columns:
+        df["ANO"] = pd.to_numeric(df["ANO"], errors="coerce").astype("Int64")
+    if "Código IBGE" in df.columns:
+        df["Código IBGE"] = pd.to_numeric(df["Código IBGE"], errors="coerce").astype("Int64")
+
+    # ---------------- Colunas derivadas ----------------
+    # Cópias diretas de colunas da planilha viram renomeações
+    # (COLUNAS_RENOMEADAS); ausentes na planilha, ficam sem valor
+    df = df.rename(columns=COLUNAS_RENOMEADAS)
+    for c in ["ICMS_CotaParte", "Orcamento_Total", "Despesa_Educacao"]:
+        if c not in df.columns:
+            df[c] = np.nan
+
+    # Fundeb base: receita da contribuição (quando existir), senão total do
+    # Fundeb; a coluna de origem é renomeada. Sem a contribuição, a receita
+    # total deixa de existir com esse nome (validar_base não a reconcilia)
+    if COLUNA_CONTRIBUICAO in df.columns:
+        df = df.rename(columns={COLUNA_CONTRIBUICAO: "Fundeb_Base"})
+    elif "Receita total do Fundeb Realizada" in df.columns:
+        df = df.rename(columns={"Receita total do Fundeb Realizada": "Fundeb_Base"})
+    else:
+        df["Fundeb_Base"] = 0
+
+    # Complementações – aqui usamos as colunas "da União"
+    df["Compl_VAAF"] = 0  # ES não recebe VAAF, deixamos explícito
+    df["Compl_VAAT"] = df["Compl_VAAT"].fillna(0) if "Compl_VAAT" in df.columns else 0
+    df["Compl_VAAR"] = df["Compl_VAAR"].fillna(0) if "Compl_VAAR" in df.columns else 0
+
+    df["Fundeb_Total"] = (
+        df["Fundeb_Base"] +
+        df["Compl_VAAF"] +
+        df["Compl_VAAT"] +
+        df["Compl_VAAR"]
+    )
+
+    df["ICMS_Educacional"] = df["ICMS_Educacional"].fillna(0) if "ICMS_Educacional" in df.columns else 0
+
+    df["Recursos_Educacao_Ampliados"] = df["Fundeb_Total"] + df["ICMS_Educacional"]
+
+    # Denominadores nulos, zerados ou negativos geram NaN (e não inf)
+    df["Dep_Fundeb_orcamento"] = df["Fundeb_Total"] / df["Orcamento_Total"].where(df["Orcamento_Total"] > 0)
+    df["Dep_Fundeb_despesa_educ"] = df["Fundeb_Total"] / df["Despesa_Educacao"].where(df["Despesa_Educacao"] > 0)
+
+    # Situação de recebimento das complementações (usada em várias seções)
+    df["Recebe_VAAT"] = df["Compl_VAAT"] > 0
+    df["Recebe_VAAR"] = df["Compl_VAAR"] > 0
+
+    # Código IBGE como string (7 dígitos) para ligar com o mapa
+    if "Código IBGE" in df.columns:
+        df["Codigo_IBGE_str"] = (
+            df["Código IBGE"]
+            .astype("Int64")
+            .astype(str)
+            .str.zfill(7)
+        )
+
+    # Não estamos usando a aba "Habilitação VAAT 2026" neste painel,
+    # então apenas garantimos que, se algum dia entrar, não quebre nada.
+    abas = pd.ExcelFile(caminho).sheet_names
+    if "Habilitação VAAT 2026" in abas:
+        df_vaat_hab = pd.read_excel(caminho, sheet_name="Habilitação VAAT 2026")
+        if "Código IBGE" in df_vaat_hab.columns:
+            df_vaat_hab["Código IBGE"] = pd.to_numeric(
+                df_vaat_hab["Código IBGE"], errors="coerce"
+            ).astype("Int64")
+            df = df.merge(
+                df_vaat_hab[["Código IBGE", "Veficação  § 4º do art. 13 da  Lei nº 14.113/20"]],
+                on="Código IBGE",
+                how="left"
+            )
+            df.rename(
+                columns={"Veficação  § 4º do art. 13 da  Lei nº 14.113/20": "Status_VAAT_2026"},
+                inplace=True
+            )
+
+    return aplicar_esquema(df), perdas
+
+
+
+def ler_mapa(caminho=CAMINHO_MAPA):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def filtrar_anos_analise(df):
+    """Remove anos ausentes e anteriores a ANO_INICIAL (ex.: 2020)."""
+    if "ANO" in df.columns:
+        df = df[df["ANO"].notna()]
+        df = df[df["ANO"] >= ANO_INICIAL]
+    return df
+
+
+# ================================================================
+# REPASSES MENSAIS / DECENDIAIS
+# ================================================================
+# Arquivo CSV em formato longo (uma linha por repasse), separador ";" e
+# decimal ",":
+#   Código IBGE;Data;Transferência;Valor
+#   3200102;2024-01-10;Fundeb;1.234.567,89
+# Data em AAAA-MM-DD ou DD/MM/AAAA; Transferência entre TRANSFERENCIAS.
+TRANSFERENCIAS = ["Fundeb", "Complementação VAAT", "Complementação VAAR", "ICMS cota-parte"]
+
+COLUNAS_REPASSES = ["Código IBGE", "Data", "Transferência", "Valor"]
+
+
+def ler_repasses(caminho):
+    """
+    Lê a série de repasses e devolve (Código IBGE Int32, Data, Transferência
+    category, Valor float64), ordenada por município, transferência e data
+    – a ordem em que as séries são consultadas e gravadas em Parquet.
+
+    Linhas sem código, data, valor ou com transferência desconhecida são
+    descartadas.
+    """
+    df = pd.read_csv(
+        caminho, sep=";", decimal=",", thousands=".",
+        usecols=COLUNAS_REPASSES, na_values=VALORES_VAZIOS, keep_default_na=True,
+        dtype={"Transferência": "category"},
+    )
+
+    data = pd.to_datetime(df["Data"], format="ISO8601", errors="coerce")
+    sem_iso = data.isna() & df["Data"].notna()
+    data[sem_iso] = pd.to_datetime(df.loc[sem_iso, "Data"], format="%d/%m/%Y", errors="coerce")
+
+    df = pd.DataFrame({
+        "Código IBGE": pd.to_numeric(df["Código IBGE"], errors="coerce").astype("Int32"),
+        "Data": data,
+        "Transferência": df["Transferência"].cat.set_categories(TRANSFERENCIAS),
+        "Valor": pd.to_numeric(df["Valor"], errors="coerce").astype("float64"),
+    })
+    df = df.dropna(subset=COLUNAS_REPASSES)
+    return df.sort_values(["Código IBGE", "Transferência", "Data"], ignore_index=True)
+
+
+# ================================================================
+# AGREGADOS ESTADUAIS (VISÃO GERAL)
+# ================================================================
+def agregados_ano(df_ano):
+    """Totais estaduais do ano e o peso do Fundeb base no orçamento e na despesa em educação."""
+    total_fundeb_base = df_ano["Fundeb_Base"].sum(skipna=True)
+    total_compl = (df_ano["Compl_VAAF"] + df_ano["Compl_VAAT"] + df_ano["Compl_VAAR"]).sum(skipna=True)
+    total_icms_educ = df_ano["ICMS_Educacional"].sum(skipna=True)
+
+    total_orcamento = df_ano["Orcamento_Total"].sum(skipna=True)
+    total_desp_educ = df_ano["Despesa_Educacao"].sum(skipna=True)
+
+    return {
+        "fundeb_base": total_fundeb_base,
+        "complementacoes": total_compl,
+        "icms_educacional": total_icms_educ,
+        "orcamento": total_orcamento,
+        "despesa_educacao": total_desp_educ,
+        "dep_fundeb_educ": total_fundeb_base / total_desp_educ if total_desp_educ > 0 else np.nan,
+        "dep_fundeb_orc": total_fundeb_base / total_orcamento if total_orcamento > 0 else np.nan,
+    }
+
+
+def evolucao_anual(df):
+    """Soma estadual, por ano, do Fundeb base, das complementações e do ICMS Educacional."""
+    evol = (
+        df.groupby("ANO", as_index=False)
+        .agg(
+            Fundeb_Base=("Fundeb_Base", "sum"),
+            Compl_VAAF=("Compl_VAAF", "sum"),
+            Compl_VAAT=("Compl_VAAT", "sum"),
+            Compl_VAAR=("Compl_VAAR", "sum"),
+            ICMS_Educacional=("ICMS_Educacional", "sum")
+        )
+        .dropna(subset=["ANO"])
+        .sort_values("ANO")
+    )
+    evol["Complementacoes"] = evol["Compl_VAAF"] + evol["Compl_VAAT"] + evol["Compl_VAAR"]
+    return evol
+
+
+# ================================================================
+# INDICADORES POR MUNICÍPIO (DIAGNÓSTICO, POSICIONAMENTO E ALERTAS)
+# ================================================================
+def _linhas_municipio(df, municipio, codigo):
+    """
+    Máscara das linhas do município: pelo Código IBGE quando informado
+    (nomes se repetem entre estados), senão pelo nome.
+    """
+    if codigo is not None:
+        return (df["Código IBGE"] == int(codigo)).fillna(False).to_numpy(dtype=bool)
+    return (df["MUNICÍPIO"] == municipio).to_numpy(dtype=bool)
+
+
+def serie_municipio(df, municipio, codigo=None):
+    """
+    Linhas do município (pelo `codigo` IBGE, se informado) em ordem de
+    ano, com a coluna Complementacoes.
+    """
+    df_mun = df[_linhas_municipio(df, municipio, codigo)].sort_values("ANO").copy()
+    df_mun["Complementacoes"] = (
+        df_mun["Compl_VAAF"] +
+        df_mun["Compl_VAAT"] +
+        df_mun["Compl_VAAR"]
+    )
+    return df_mun
+
+
+def tabela_variacoes(df_mun):
+    """
+    Fundeb base, complementações e total do município, com as variações
+    absolutas e percentuais ano a ano (valores numéricos).
+    """
+    base_tab = df_mun[["ANO", "Fundeb_Base", "Complementacoes", "Fundeb_Total"]].copy()
+    base_tab = base_tab.sort_values("ANO")
+
+    base_tab["Dif_abs_Base"] = base_tab["Fundeb_Base"].diff()
+    base_tab["Dif_perc_Base"] = base_tab["Fundeb_Base"].pct_change()
+
+    base_tab["Dif_abs_Compl"] = base_tab["Complementacoes"].diff()
+    base_tab["Dif_perc_Compl"] = base_tab["Complementacoes"].pct_change()
+
+    base_tab["Dif_abs_Total"] = base_tab["Fundeb_Total"].diff()
+    base_tab["Dif_perc_Total"] = base_tab["Fundeb_Total"].pct_change()
+
+    return base_tab
+
+
+# Nomes legíveis das colunas de tabela_variacoes (valores em R$, exceto
+# as Dif_perc_*, que são razões)
+ROTULOS_VARIACOES = {
+    "Fundeb_Base": "Fundeb base",
+    "Complementacoes": "Complementações",
+    "Fundeb_Total": "Fundeb total",
+    "Dif_abs_Base": "Dif. abs. Fundeb base",
+    "Dif_perc_Base": "Dif. % Fundeb base",
+    "Dif_abs_Compl": "Dif. abs. Complementações",
+    "Dif_perc_Compl": "Dif. % Complementações",
+    "Dif_abs_Total": "Dif. abs. Fundeb total",
+    "Dif_perc_Total": "Dif. % Fundeb total",
+}
+
+
+def tabela_variacoes_exibicao(base_tab):
+    """
+    Versão formatada como texto (R$ e %) de tabela_variacoes, para os
+    relatórios em HTML; o painel envia os números e formata no navegador.
+    """
+    base_exib = base_tab.copy()
+
+    for c in ROTULOS_VARIACOES:
+        base_exib[c] = base_exib[c].map(formatar_variacao if c.startswith("Dif_perc") else formatar_reais)
+
+    return base_exib.rename(columns=ROTULOS_VARIACOES).set_index("ANO")
+
+
+def estatisticas_complementacao(df_ano, coluna, municipio, codigo=None):
+    """
+    Mínimo, mediana, média e máximo de `coluna` entre os municípios que
+    recebem (> 0), mais o valor e a posição do município (identificado
+    pelo `codigo` IBGE, se informado) no ranking.
+
+    Retorna None quando nenhum município recebe no ano.
+    """
+    valores_validos = df_ano[coluna][df_ano[coluna] > 0]
+    if valores_validos.empty:
+        return None
+
+    valor_mun = df_ano.loc[_linhas_municipio(df_ano, municipio, codigo), coluna]
+    valor_mun = float(valor_mun.iloc[0]) if not valor_mun.empty else np.nan
+    posicao = int((valores_validos > valor_mun).sum()) + 1 if valor_mun > 0 else None
+
+    return {
+        "minimo": valores_validos.min(),
+        "mediana": valores_validos.median(),
+        "media": valores_validos.mean(),
+        "maximo": valores_validos.max(),
+        "valor_municipio": valor_mun,
+        "posicao": posicao,
+        "n_recebem": len(valores_validos),
+    }
+
+
+def regras_alerta(df, df_ano, ano, chave="MUNICÍPIO"):
+    """
+    Aplica as regras de alerta automático do painel.
+
+    Retorna uma lista de (ícone, título, municípios) apenas das regras que
+    encontraram algum município, identificados pela coluna `chave` (o nome,
+    ou o "Código IBGE" quando há municípios de vários estados).
+    """
+    anos_ordenados = sorted(df["ANO"].dropna().unique())
+    alertas = []
+
+    # 1) Fundeb caindo há 3 anos
+    if len(anos_ordenados) >= 3:
+        ultimos3 = anos_ordenados[-3:]
+        df_3 = df[df["ANO"].isin(ultimos3)].copy()
+
+        queda_mun = []
+        for mun, grupo in df_3.groupby(chave, observed=True):
+            g = grupo.sort_values("ANO")
+            if len(g) == 3:
+                vals = g["Fundeb_Total"].values
+                if np.all(np.diff(vals) < 0):
+                    queda_mun.append(mun)
+        if queda_mun:
+            alertas.append(("⚠️", "Fundeb em queda contínua nos últimos 3 anos", queda_mun))
+
+    # 2) Municípios não habilitados ao VAAR (sem recebimento)
+    nao_hab = df_ano.loc[df_ano["Compl_VAAR"] <= 0, chave].tolist()
+    if nao_hab:
+        alertas.append((
+            "🚫",
+            f"Municípios que não receberam VAAR em {ano} (podem estar deixando recursos na mesa)",
+            nao_hab,
+        ))
+
+    # 3) Dependência elevada do Fundeb (>= 50% da despesa em educação)
+    dep_alta = df_ano[df_ano["Dep_Fundeb_despesa_educ"] >= 0.50]
+    if not dep_alta.empty:
+        alertas.append((
+            "📌",
+            "Municípios em que o Fundeb representa 50% ou mais da despesa em educação",
+            dep_alta[chave].tolist(),
+        ))
+
+    # 4) Municípios com ICMS Educacional relativamente baixo (1º quartil)
+    q1_icms = df_ano["ICMS_Educacional"].quantile(0.25)
+    icms_baixo = df_ano[df_ano["ICMS_Educacional"] <= q1_icms][chave].tolist()
+    if icms_baixo:
+        alertas.append((
+            "💡",
+            "Municípios com ICMS Educacional relativamente baixo (até o 1º quartil)",
+            icms_baixo,
+        ))
+
+    return [(icone, titulo, [str(m) for m in muns]) for icone, titulo, muns in alertas]
+
+
+# ================================================================
+# HISTOGRAMAS PRÉ-CALCULADOS (DISTRIBUIÇÕES POR INDICADOR E ANO)
+# ================================================================
+# indicador -> escala das faixas; valores monetários usam faixas
+# logarítmicas (zeros e negativos ficam fora e são contados à parte)
+INDICADORES_HISTOGRAMA = {
+    "Fundeb_Total": "log",
+    "Compl_VAAT": "log",
+    "Compl_VAAR": "log",
+    "ICMS_Educacional": "log",
+    "Dep_Fundeb_orcamento": "linear",
+    "Dep_Fundeb_despesa_educ": "linear",
+}
+
+# subconjunto -> coluna booleana que o define (None = todos os municípios)
+SUBCONJUNTOS_HISTOGRAMA = {
+    "Todos os municípios": None,
+    "Recebem VAAT": "Recebe_VAAT",
+    "Recebem VAAR": "Recebe_VAAR",
+}
+
+N_FAIXAS_HISTOGRAMA = 30
+
+
+def extremos_histogramas(df):
+    """
+    {indicador: (mínimo, máximo)} dos valores válidos de cada
+    INDICADORES_HISTOGRAMA no `df` (finitos, com ano e, na escala log,
+    positivos). Indicadores sem valor válido ficam de fora.
+    """
+    ano = df["ANO"].to_numpy(dtype="float64", na_value=np.nan)
+    extremos = {}
+    for indicador, escala in INDICADORES_HISTOGRAMA.items():
+        if indicador not in df.columns:
+            continue
+        valores = df[indicador].to_numpy(dtype="float64", na_value=np.nan)
+        validos = np.isfinite(valores) & np.isfinite(ano)
+        if escala == "log":
+            validos &= valores > 0
+        if validos.any():
+            extremos[indicador] = (valores[validos].min(), valores[validos].max())
+    return extremos
+
+
+def combinar_extremos(a, b):
+    """Extremos de duas partes da base (saídas de extremos_histogramas) juntos."""
+    return {
+        ind: (min(a[ind][0], b[ind][0]), max(a[ind][1], b[ind][1])) if ind in a and ind in b
+        else a.get(ind, b.get(ind))
+        for ind in {**a, **b}
+    }
+
+
+def calcular_histogramas(partes, extremos=None, n_faixas=N_FAIXAS_HISTOGRAMA):
+    """
+    Histogramas de todos os INDICADORES_HISTOGRAMA, para cada ano e cada
+    subconjunto de SUBCONJUNTOS_HISTOGRAMA: as faixas são as mesmas em
+    todos os anos (comparáveis entre si) e as contagens de cada parte saem
+    de um único np.bincount sobre (ano, faixa).
+
+    `partes` é a base (DataFrame) ou uma sequência de partes dela que não
+    dividem um ano (ex.: Consultas.por_ano). Com `extremos` (de
+    extremos_histogramas/combinar_extremos, calculados numa passada
+    anterior) as partes são percorridas uma única vez, sem ficar juntas na
+    memória.
+
+    Retorna {indicador: {"escala", "bordas", "anos", "contagens", "fora"}},
+    em que contagens[subconjunto] tem forma (n_anos, n_faixas) e
+    fora[subconjunto] conta, por ano, os valores fora das faixas (zeros e
+    negativos na escala log).
+    """
+    if isinstance(partes, pd.DataFrame):
+        partes = [partes]
+    if extremos is None:
+        partes = list(partes)
+        extremos = {}
+        for parte in partes:
+            extremos = combinar_extremos(extremos, extremos_histogramas(parte))
+
+    bordas = {}
+    for indicador, (vmin, vmax) in extremos.items():
+        escala = INDICADORES_HISTOGRAMA[indicador]
+        if vmin == vmax:
+            vmin, vmax = (vmin / 2, vmin * 2) if escala == "log" else (vmin - 0.5, vmax + 0.5)
+        bordas[indicador] = (np.geomspace(vmin, vmax, n_faixas + 1) if escala == "log"
+                             else np.linspace(vmin, vmax, n_faixas + 1))
+
+    # por parte: anos da parte e, por indicador e subconjunto, as linhas
+    # (um ano cada) de contagens e de valores fora das faixas
+    anos_partes, contagens_partes, fora_partes = [], [], []
+    for df in partes:
+        anos = np.sort(df["ANO"].dropna().unique().astype("int64"))
+        if not len(anos):
+            continue
+        ano = df["ANO"].to_numpy(dtype="float64", na_value=np.nan)
+        i_ano = np.searchsorted(anos, ano)
+        mascaras = {
+            nome: (np.ones(len(df), dtype=bool) if col is None
+                   else df[col].to_numpy(dtype=bool, na_value=False))
+            for nome, col in SUBCONJUNTOS_HISTOGRAMA.items()
+            if col is None or col in df.columns
+        }
+
+        contagens_parte, fora_parte = {}, {}
+        for indicador, bordas_ind in bordas.items():
+            if indicador not in df.columns:
+                continue
+            valores = df[indicador].to_numpy(dtype="float64", na_value=np.nan)
+            validos = np.isfinite(valores) & np.isfinite(ano)
+            if INDICADORES_HISTOGRAMA[indicador] == "log":
+                validos &= valores > 0
+
+            faixa = np.clip(np.searchsorted(bordas_ind, valores, side="right") - 1, 0, n_faixas - 1)
+            celula = i_ano * n_faixas + faixa
+            fora = ~validos & np.isfinite(valores) & np.isfinite(ano)
+
+            contagens_parte[indicador] = {
+                nome: np.bincount(
+                    celula[validos & mascara], minlength=len(anos) * n_faixas
+                ).reshape(len(anos), n_faixas)
+                for nome, mascara in mascaras.items()
+            }
+            fora_parte[indicador] = {
+                nome: np.bincount(i_ano[fora & mascara], minlength=len(anos))
+                for nome, mascara in mascaras.items()
+            }
+        anos_partes.append(anos)
+        contagens_partes.append(contagens_parte)
+        fora_partes.append(fora_parte)
+
+    if not anos_partes:
+        return {}
+    anos = np.concatenate(anos_partes)
+    ordem = np.argsort(anos, kind="stable")
+    subconjuntos = {nome for parte in contagens_partes for ind in parte.values() for nome in ind}
+
+    def empilhar(pedacos, indicador, nome, forma):
+        # partes sem a coluna (ou o subconjunto) entram com zeros
+        return np.concatenate([
+            p[indicador][nome] if nome in p.get(indicador, {}) else np.zeros(forma(len(a)), dtype="int64")
+            for p, a in zip(pedacos, anos_partes)
+        ])[ordem].astype("int32")
+
+    histogramas = {}
+    for indicador in bordas:
+        histogramas[indicador] = {
+            "escala": INDICADORES_HISTOGRAMA[indicador],
+            "bordas": bordas[indicador],
+            "anos": anos[ordem],
+            "contagens": {
+                nome: empilhar(contagens_partes, indicador, nome, lambda n: (n, n_faixas))
+                for nome in SUBCONJUNTOS_HISTOGRAMA if nome in subconjuntos
+            },
+            "fora": {
+                nome: empilhar(fora_partes, indicador, nome, lambda n: (n,))
+                for nome in SUBCONJUNTOS_HISTOGRAMA if nome in subconjuntos
+            },
+        }
+    return histogramas
+
+
+# ================================================================
+# CRUZAMENTOS – CORRELAÇÃO ENTRE INDICADORES (MOMENTOS POR ANO)
+# ================================================================
+INDICADORES_CRUZAMENTO = [
+    "Orcamento_Total",
+    "Despesa_Educacao",
+    "Fundeb_Total",
+    "Compl_VAAT",
+    "Compl_VAAR",
+    "ICMS_Educacional",
+    "Dep_Fundeb_orcamento",
+    "Dep_Fundeb_despesa_educ",
+]
+
+
+def momentos_ano(df, indicadores=INDICADORES_CRUZAMENTO):
+    """
+    Momentos centrados de cada par de indicadores (i, j), considerando as
+    linhas em que ambos têm valor. Matrizes k x k:
+
+    - n[i, j]: nº de linhas do par
+    - media[i, j]: média de i nessas linhas (a de j é media[j, i])
+    - comom[i, j]: soma de (x_i - média)(x_j - média)
+    - m2[i, j]: soma de (x_i - média)² nessas linhas
+
+    Combinados entre anos por combinar_momentos, sem reler os dados.
+    """
+    x = df[indicadores].to_numpy(dtype="float64", na_value=np.nan)
+    validos = np.isfinite(x)
+    x0 = np.where(validos, x, 0.0)
+    v = validos.astype("float64")
+
+    n = v.T @ v
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(n > 0, (x0.T @ v) / n, 0.0)
+
+    k = len(indicadores)
+    comom = np.zeros((k, k))
+    m2 = np.zeros((k, k))
+    for i in range(k):
+        for j in range(i, k):
+            par = validos[:, i] & validos[:, j]
+            di = x[par, i] - media[i, j]
+            dj = x[par, j] - media[j, i]
+            comom[i, j] = comom[j, i] = di @ dj
+            m2[i, j] = di @ di
+            m2[j, i] = dj @ dj
+    return {"indicadores": list(indicadores), "n": n, "media": media, "comom": comom, "m2": m2}
+
+
+def combinar_momentos(a, b):
+    """Junta os momentos de dois conjuntos de linhas (fórmula de Chan/Welford)."""
+    n = a["n"] + b["n"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        peso = np.where(n > 0, a["n"] * b["n"] / n, 0.0)
+        media = np.where(n > 0, (a["n"] * a["media"] + b["n"] * b["media"]) / n, 0.0)
+    delta = b["media"] - a["media"]  # delta[i, j]: média de i; delta.T[i, j]: média de j
+    return {
+        "indicadores": a["indicadores"],
+        "n": n,
+        "media": media,
+        "comom": a["comom"] + b["comom"] + delta * delta.T * peso,
+        "m2": a["m2"] + b["m2"] + delta ** 2 * peso,
+    }
+
+
+def matriz_correlacao(momentos, n_minimo=3):
+    """Correlação de Pearson par a par; NaN com poucos pares ou variância nula."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = momentos["comom"] / np.sqrt(momentos["m2"] * momentos["m2"].T)
+    corr = np.where((momentos["n"] >= n_minimo) & np.isfinite(corr), np.clip(corr, -1, 1), np.nan)
+    return pd.DataFrame(corr, index=momentos["indicadores"], columns=momentos["indicadores"])
+
+
+# ================================================================
+# ICMS EDUCACIONAL – SIMULAÇÃO DE PESOS DO ÍNDICE
+# ================================================================
+# Notas dos municípios nos componentes do índice de qualidade educacional,
+# em CSV (separador ";", decimal ","), uma coluna por componente:
+#   Código IBGE;ANO;Aprendizagem;Fluxo;Atendimento
+#   3200102;2025;0,734;0,912;0,880
+# ANO é opcional (sem ele, as notas valem para todos os anos). Cada
+# componente distribui a sua parcela (o seu peso) do ICMS Educacional do
+# ano na proporção da nota do município no total estadual do componente.
+COLUNAS_CHAVE_INDICES = ["Código IBGE", "ANO"]
+
+
+def ler_indices_icms(caminho):
+    """
+    Lê as notas dos componentes: Código IBGE (Int32), ANO (Int16, se
+    houver) e os componentes em float64. Notas negativas ou ilegíveis
+    ficam sem valor.
+    """
+    df = pd.read_csv(caminho, sep=";", decimal=",", na_values=VALORES_VAZIOS, keep_default_na=True)
+    if "Código IBGE" not in df.columns:
+        raise ValueError(f"{os.path.basename(caminho)}: coluna 'Código IBGE' não encontrada")
+
+    indices = pd.DataFrame({"Código IBGE": pd.to_numeric(df["Código IBGE"], errors="coerce").astype("Int32")})
+    if "ANO" in df.columns:
+        indices["ANO"] = pd.to_numeric(df["ANO"], errors="coerce").astype("Int16")
+    for c in df.columns:
+        if c not in COLUNAS_CHAVE_INDICES:
+            nota = pd.to_numeric(df[c], errors="coerce").astype("float64")
+            indices[c] = nota.where(nota >= 0)
+    return indices.dropna(subset=[c for c in COLUNAS_CHAVE_INDICES if c in indices.columns])
+
+
+def componentes_icms(indices):
+    return [c for c in indices.columns if c not in COLUNAS_CHAVE_INDICES]
+
+
+def participacoes_icms(indices, codigos, ano):
+    """
+    Matriz n_municípios x n_componentes com a participação de cada
+    município (na ordem de `codigos`) no total estadual de cada
+    componente. Com ANO no arquivo, usa as notas do ano (ou do último ano
+    anterior com notas). Municípios sem nota participam com zero.
+    """
+    if "ANO" in indices.columns:
+        anos = indices["ANO"][indices["ANO"] <= ano]
+        indices = indices[indices["ANO"] == (anos.max() if len(anos) else indices["ANO"].min())]
+    notas = (
+        indices.drop_duplicates("Código IBGE", keep="last")
+        .set_index("Código IBGE")[componentes_icms(indices)]
+        .reindex(pd.Index(codigos).astype("Int32"))
+        .to_numpy(dtype="float64", na_value=np.nan)
+    )
+    notas = np.nan_to_num(notas, nan=0.0)
+    totais = notas.sum(axis=0)
+    return np.divide(notas, totais, out=np.zeros_like(notas), where=totais > 0)
+
+
+def simular_icms(participacoes, pesos, montante):
+    """
+    ICMS Educacional de cada município em cada cenário de pesos, numa só
+    multiplicação de matrizes: `pesos` é n_cenários x n_componentes (cada
+    linha é normalizada para somar 1, ignorando componentes sem nota) e o
+    resultado, n_cenários x n_municípios, distribui todo o `montante`.
+    """
+    pesos = np.clip(np.atleast_2d(np.asarray(pesos, dtype="float64")), 0, None)
+    pesos = np.where(participacoes.sum(axis=0) > 0, pesos, 0.0)
+    soma = pesos.sum(axis=1, keepdims=True)
+    pesos = np.divide(pesos, soma, out=np.zeros_like(pesos), where=soma > 0)
+    return montante * (pesos @ participacoes.T)
+
+
+# ================================================================
+# CONFORMIDADE FISCAL – REGRAS DE APLICAÇÃO (EXTRATO NO PADRÃO SIOPE)
+# ================================================================
+# Extrato das despesas declaradas ao SIOPE, em CSV (separador ";",
+# decimal ","), uma linha por município e ano:
+#   Código IBGE;ANO;Receita de impostos;Despesa MDE;Fundeb remuneração;...
+#   3200102;2024;45.123.456,78;12.345.678,90;9.876.543,21;...
+# Colunas de valores ausentes deixam sem avaliação as regras que as usam.
+COLUNAS_SIOPE = [
+    "Receita de impostos",       # impostos e transferências (base do art. 212)
+    "Despesa MDE",               # manutenção e desenvolvimento do ensino
+    "Fundeb remuneração",        # Fundeb pago aos profissionais da educação básica
+    "Fundeb não aplicado",       # saldo do Fundeb não utilizado no exercício
+    "VAAT educação infantil",    # Complementação-VAAT aplicada na educação infantil
+    "VAAT capital",              # Complementação-VAAT em despesas de capital
+]
+
+# id -> regra: índice = numerador / denominador, comparado ao limite
+# ("mínimo" ou "máximo"). Denominadores com nome de coluna da base
+# (Fundeb_Total etc.) vêm da planilha; Fundeb_sem_VAAR é o Fundeb total
+# menos a complementação VAAR, excluída da base do art. 26.
+REGRAS_CONFORMIDADE = {
+    "MDE": {
+        "rotulo": "MDE: mínimo de 25% dos impostos",
+        "numerador": "Despesa MDE", "denominador": "Receita de impostos",
+        "limite": 0.25, "tipo": "mínimo", "base_legal": "CF, art. 212",
+    },
+    "Remuneracao": {
+        "rotulo": "Fundeb: mínimo de 70% na remuneração dos profissionais",
+        "numerador": "Fundeb remuneração", "denominador": "Fundeb_sem_VAAR",
+        "limite": 0.70, "tipo": "mínimo", "base_legal": "Lei nº 14.113/2020, art. 26",
+    },
+    "Nao_aplicado": {
+        "rotulo": "Fundeb: até 10% não aplicado no exercício",
+        "numerador": "Fundeb não aplicado", "denominador": "Fundeb_Total",
+        "limite": 0.10, "tipo": "máximo", "base_legal": "Lei nº 14.113/2020, art. 25, § 3º",
+    },
+    "VAAT_infantil": {
+        "rotulo": "VAAT: mínimo de 50% na educação infantil",
+        "numerador": "VAAT educação infantil", "denominador": "Compl_VAAT",
+        "limite": 0.50, "tipo": "mínimo", "base_legal": "Lei nº 14.113/2020, art. 28",
+    },
+    "VAAT_capital": {
+        "rotulo": "VAAT: mínimo de 15% em despesas de capital",
+        "numerador": "VAAT capital", "denominador": "Compl_VAAT",
+        "limite": 0.15, "tipo": "mínimo", "base_legal": "Lei nº 14.113/2020, art. 27",
+    },
+}
+
+# Colunas da base usadas pelas regras (além das chaves)
+COLUNAS_BASE_CONFORMIDADE = ["Fundeb_Total", "Compl_VAAT", "Compl_VAAR"]
+
+SITUACOES_CONFORMIDADE = ["Cumpre todas", "Descumpre alguma", "Sem dados"]
+
+
+def ler_despesas_siope(caminho):
+    """
+    Lê o extrato: Código IBGE (Int32), ANO (Int16) e as COLUNAS_SIOPE
+    presentes em float64. Linhas sem código ou ano são descartadas; se um
+    município/ano se repete, vale a última linha.
+    """
+    df = pd.read_csv(
+        caminho, sep=";", decimal=",", thousands=".",
+        na_values=VALORES_VAZIOS, keep_default_na=True,
+    )
+    df.columns = [str(c).strip() for c in df.columns]
+    faltando = [c for c in COLUNAS_CHAVE_INDICES if c not in df.columns]
+    if faltando:
+        raise ValueError(f"{os.path.basename(caminho)}: colunas {faltando} não encontradas")
+
+    despesas = pd.DataFrame({
+        "Código IBGE": pd.to_numeric(df["Código IBGE"], errors="coerce").astype("Int32"),
+        "ANO": pd.to_numeric(df["ANO"], errors="coerce").astype("Int16"),
+    })
+    for c in COLUNAS_SIOPE:
+        if c in df.columns:
+            despesas[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    despesas = despesas.dropna(subset=COLUNAS_CHAVE_INDICES)
+    return despesas.drop_duplicates(COLUNAS_CHAVE_INDICES, keep="last").reset_index(drop=True)
+
+
+def avaliar_conformidade(base, despesas, regras=REGRAS_CONFORMIDADE):
+    """
+    Avalia todas as `regras` em todos os municípios/anos da `base` numa só
+    passada: numeradores e denominadores viram matrizes n_linhas x
+    n_regras e os índices e margens saem de operações sobre elas.
+
+    Retorna a `base` (chaves e colunas que vierem nela) com, por regra,
+    Indice_<id> e Margem_<id> – a folga sobre o limite, em pontos
+    percentuais, positiva quando a regra é cumprida (NaN sem dados ou sem
+    denominador, ex.: município sem Complementação-VAAT) – e Regras
+    avaliadas, Regras descumpridas e Situação.
+    """
+    painel = base.astype({"Código IBGE": "Int32", "ANO": "Int16"}).merge(
+        despesas, on=COLUNAS_CHAVE_INDICES, how="left"
+    )
+    painel["Fundeb_sem_VAAR"] = painel["Fundeb_Total"] - painel["Compl_VAAR"].fillna(0)
+
+    def matriz(campo):
+        return np.column_stack([
+            painel[r[campo]].to_numpy(dtype="float64", na_value=np.nan) if r[campo] in painel.columns
+            else np.full(len(painel), np.nan)
+            for r in regras.values()
+        ])
+
+    numerador, denominador = matriz("numerador"), matriz("denominador")
+    limite = np.array([r["limite"] for r in regras.values()], dtype="float64")
+    sentido = np.array([1.0 if r["tipo"] == "mínimo" else -1.0 for r in regras.values()])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        indice = numerador / np.where(denominador > 0, denominador, np.nan)
+    margem = 100 * sentido * (indice - limite)
+
+    resultado = base.reset_index(drop=True).copy()
+    for j, id_regra in enumerate(regras):
+        resultado[f"Indice_{id_regra}"] = indice[:, j]
+        resultado[f"Margem_{id_regra}"] = margem[:, j]
+
+    avaliadas = np.isfinite(margem).sum(axis=1)
+    descumpridas = (margem < 0).sum(axis=1)
+    resultado["Regras avaliadas"] = avaliadas
+    resultado["Regras descumpridas"] = descumpridas
+    resultado["Situação"] = pd.Categorical(
+        np.select([avaliadas == 0, descumpridas > 0], ["Sem dados", "Descumpre alguma"], default="Cumpre todas"),
+        categories=SITUACOES_CONFORMIDADE,
+    )
+    return resultado
@@ -0,0 +1,720 @@
+# ================================================================
+# fundeb_graficos.py – Figuras do Painel Fundeb (sem dependência do Streamlit)
+# ================================================================
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from fundeb_dados import formatar_reais
+
+# Acima deste nº de municípios, as barras dão lugar a pontos em WebGL
+LIMITE_BARRAS = 40
+
+# Nº máximo de municípios individualizados em um gráfico;
+# o restante é somado na linha "Demais municípios"
+MAX_MUNICIPIOS_GRAFICO = 1500
+
+# Tamanho máximo (bytes do JSON) de uma figura enviada ao navegador
+LIMITE_PAYLOAD_BYTES = 3_000_000
+
+# Teto de bytes de JSON por valor dos arrays das traces (números, datas e
+# nomes de município). Medido nas figuras do painel: 17 a 20 bytes nas
+# grandes e até ~50 nas pequenas, em que o layout pesa. Abaixo de
+# LIMITE_PAYLOAD_BYTES / BYTES_POR_PONTO valores, a figura cabe no limite
+# sem ser serializada para medir (ver excede_payload)
+BYTES_POR_PONTO = 64
+
+# Altura máxima (px) dos gráficos de barras horizontais
+ALTURA_MAXIMA = 1200
+
+# Séries de repasses: nº máximo de linhas (municípios) e de pontos
+# desenhados somando todas as linhas
+MAX_SERIES_REPASSES = 100
+LIMITE_PONTOS_REPASSES = 20_000
+
+# Acima deste total de pontos, as linhas de repasses usam WebGL
+LIMITE_PONTOS_SVG = 5_000
+
+# Dispersão dos cruzamentos: nº máximo de pontos desenhados (acima disso,
+# decimar_dispersao) e, acima de LIMITE_BARRAS pontos, WebGL
+LIMITE_PONTOS_DISPERSAO = 3_000
+
+ROTULO_DEMAIS = "Demais municípios"
+
+# coluna -> (rótulo, cor normal, cor de destaque do município selecionado)
+FONTES_RECURSOS = {
+    "Fundeb_Base": ("Fundeb base", "#C2A4CF", "#3A0057"),
+    "Compl_VAAT": ("Compl. VAAT", "#B3E6FF", "#0077B6"),
+    "Compl_VAAR": ("Compl. VAAR", "#FFE0B2", "#FF8C00"),
+    "ICMS_Educacional": ("ICMS Educacional", "#D0F0C0", "#228B22"),
+}
+
+
+def top_n_com_demais(df, coluna_ordem, n, colunas_soma, coluna_nome="MUNICÍPIO"):
+    """
+    Seleciona os `n` maiores valores de `coluna_ordem` (seleção parcial,
+    sem ordenar a base inteira) e soma o restante em uma linha final
+    "Demais municípios (k)".
+
+    Retorna as colunas `coluna_nome` + `colunas_soma`, em ordem decrescente.
+    """
+    top = df.nlargest(n, coluna_ordem)
+    resto = df.drop(top.index)
+
+    top = top[[coluna_nome] + list(colunas_soma)].copy()
+    top[coluna_nome] = top[coluna_nome].astype(str)
+
+    if resto.empty:
+        return top.reset_index(drop=True)
+
+    demais = {c: resto[c].sum(skipna=True) for c in colunas_soma}
+    demais[coluna_nome] = f"{ROTULO_DEMAIS} ({len(resto)})"
+
+    return pd.concat([top, pd.DataFrame([demais])], ignore_index=True)
+
+
+def eh_demais(serie_nomes):
+    """Máscara das linhas agregadas em "Demais municípios"."""
+    return serie_nomes.astype(str).str.startswith(ROTULO_DEMAIS)
+
+
+def cores_por_municipio(series_mun, cor_normal, cor_dest, municipio_sel):
+    return [
+        cor_dest if m == municipio_sel else cor_normal
+        for m in series_mun
+    ]
+
+
+def usa_webgl(n_linhas):
+    return n_linhas > LIMITE_BARRAS
+
+
+def figura_composicao(df_top, municipio_sel, titulo):
+    """
+    Composição dos recursos por município.
+
+    - Até LIMITE_BARRAS linhas: barras horizontais empilhadas (como antes)
+    - Acima disso: pontos em WebGL (Scattergl) por posição no ranking,
+      com altura fixa
+
+    A linha "Demais municípios" (soma do restante, muito maior que
+    qualquer município) fica fora da escala das barras e dos pontos: seus
+    valores vão numa nota abaixo do gráfico; a tabela e a estrutura
+    percentual continuam com ela.
+    """
+    fig = go.Figure()
+    demais = df_top[eh_demais(df_top["MUNICÍPIO"])]
+    df_mun = df_top[~eh_demais(df_top["MUNICÍPIO"])]
+
+    if not usa_webgl(len(df_top)):
+        # menor total embaixo
+        df_tot = df_mun.iloc[::-1]
+        for col, (nome, cor_normal, cor_dest) in FONTES_RECURSOS.items():
+            fig.add_trace(go.Bar(
+                y=df_tot["MUNICÍPIO"],
+                x=df_tot[col],
+                name=nome,
+                orientation="h",
+                marker=dict(color=cores_por_municipio(df_tot["MUNICÍPIO"], cor_normal, cor_dest, municipio_sel)),
+            ))
+        fig.update_layout(
+            barmode="stack",
+            height=min(ALTURA_MAXIMA, max(400, 20 * len(df_tot))),  # altura cresce com nº de municípios
+            xaxis_title="Valor (R$)",
+            yaxis_title="Município",
+        )
+    else:
+        posicao = np.arange(1, len(df_mun) + 1)
+        nomes = df_mun["MUNICÍPIO"].to_numpy(dtype=str)
+        for col, (nome, _, cor_dest) in FONTES_RECURSOS.items():
+            fig.add_trace(go.Scattergl(
+                x=posicao,
+                y=df_mun[col],
+                name=nome,
+                mode="markers",
+                marker=dict(color=cor_dest, size=5),
+                # nome do município só no 1º trace; o hover unificado mostra os demais
+                hovertext=nomes if col == "Fundeb_Base" else None,
+            ))
+        fig.update_layout(
+            height=520,
+            hovermode="x unified",
+            xaxis_title="Posição no ranking de recursos",
+            yaxis_title="Valor (R$)",
+        )
+
+    if not demais.empty:
+        linha = demais.iloc[0]
+        valores = {col: linha[col] for col in FONTES_RECURSOS}
+        fig.add_annotation(
+            text=(
+                f"<b>{linha['MUNICÍPIO']}</b>, fora da escala do gráfico: "
+                f"{formatar_reais(sum(v for v in valores.values() if pd.notna(v)))}<br>"
+                + " · ".join(f"{FONTES_RECURSOS[col][0]}: {formatar_reais(v)}" for col, v in valores.items())
+            ),
+            xref="paper", yref="paper", x=0, y=0,
+            xanchor="left", yanchor="top", yshift=-50,
+            align="left", showarrow=False, font=dict(size=12),
+        )
+        fig.update_layout(margin=dict(b=120))
+
+    fig.update_layout(
+        template="simple_white",
+        title=titulo,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0.0)
+    )
+    return fig
+
+
+def figura_estrutura_percentual(df_top):
+    """
+    Participação de cada fonte no total de recursos por município.
+
+    Monta um trace por fonte diretamente das colunas (sem `melt`),
+    com barras até LIMITE_BARRAS linhas e WebGL acima disso.
+    """
+    df_dep = df_top.copy()
+    df_dep["Total_Recursos"] = df_dep[list(FONTES_RECURSOS)].sum(axis=1)
+    df_dep = df_dep[df_dep["Total_Recursos"] > 0]
+
+    fig = go.Figure()
+
+    if not usa_webgl(len(df_dep)):
+        for col, (nome, _, _) in FONTES_RECURSOS.items():
+            fig.add_trace(go.Bar(
+                y=df_dep["MUNICÍPIO"],
+                x=df_dep[col] / df_dep["Total_Recursos"],
+                name=nome,
+                orientation="h",
+            ))
+        fig.update_layout(
+            barmode="stack",
+            height=min(ALTURA_MAXIMA, max(500, 25 * len(df_dep))),
+            yaxis_title="Município",
+            xaxis_title="Participação no total de recursos",
+            xaxis_tickformat=".0%",
+        )
+        fig.update_yaxes(automargin=True, autorange="reversed")
+    else:
+        df_dep = df_dep[~eh_demais(df_dep["MUNICÍPIO"])]
+        posicao = np.arange(1, len(df_dep) + 1)
+        nomes = df_dep["MUNICÍPIO"].to_numpy(dtype=str)
+        for col, (nome, _, cor_dest) in FONTES_RECURSOS.items():
+            fig.add_trace(go.Scattergl(
+                x=posicao,
+                y=df_dep[col] / df_dep["Total_Recursos"],
+                name=nome,
+                mode="markers",
+                marker=dict(color=cor_dest, size=5),
+                hovertext=nomes if col == "Fundeb_Base" else None,
+            ))
+        fig.update_layout(
+            height=520,
+            hovermode="x unified",
+            xaxis_title="Posição no ranking de recursos",
+            yaxis_title="Participação no total de recursos",
+            yaxis_tickformat=".0%",
+        )
+
+    fig.update_layout(
+        template="simple_white",
+        title="Estrutura percentual dos recursos educacionais por município",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0.0)
+    )
+    return fig
+
+
+# rótulo -> cores (faixa de fundo, mínimo, mediana, média) das "reguinhas"
+CORES_REGUINHA = {
+    "VAAT": ("rgba(106,27,154,0.15)", "#6A1B9A", "#311B92", "#4527A0"),
+    "VAAR": ("rgba(142,36,170,0.15)", "#8E24AA", "#5E35B1", "#3949AB"),
+}
+
+
+def figura_evolucao_anual(evol):
+    """Barras empilhadas da evolução estadual por ano (BLOCO 4)."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=evol["ANO"], y=evol["Fundeb_Base"],
+        name="Fundeb base"
+    ))
+    fig.add_trace(go.Bar(
+        x=evol["ANO"], y=evol["Complementacoes"],
+        name="Complementações (VAAF+VAAT+VAAR)"
+    ))
+    fig.add_trace(go.Bar(
+        x=evol["ANO"], y=evol["ICMS_Educacional"],
+        name="ICMS Educacional"
+    ))
+    fig.update_layout(
+        template="simple_white",
+        height=420,
+        xaxis_title="Ano",
+        yaxis_title="Valor (R$)",
+        barmode="stack",
+        title="Evolução dos principais recursos educacionais (Estado + municípios do ES)"
+    )
+    return fig
+
+
+def figura_fundeb_municipio(df_mun, municipio_sel):
+    """Fundeb base e complementações do município ao longo dos anos (BLOCO 5)."""
+    fig_fund_mun = go.Figure()
+    fig_fund_mun.add_trace(go.Bar(
+        x=df_mun["ANO"],
+        y=df_mun["Fundeb_Base"],
+        name="Fundeb base"
+    ))
+    fig_fund_mun.add_trace(go.Bar(
+        x=df_mun["ANO"],
+        y=df_mun["Complementacoes"],
+        name="Complementações (VAAF+VAAT+VAAR)"
+    ))
+    fig_fund_mun.update_layout(
+        barmode="stack",
+        template="simple_white",
+        height=420,
+        xaxis_title="Ano",
+        yaxis_title="Valor (R$)",
+        title=f"Fundeb base e complementações – {municipio_sel}"
+    )
+    return fig_fund_mun
+
+
+def lttb(x, y, n_pontos):
+    """
+    Índices dos pontos escolhidos pelo Largest-Triangle-Three-Buckets:
+    mantém o primeiro e o último ponto e, em cada um dos `n_pontos - 2`
+    baldes intermediários, o ponto que forma o maior triângulo com o
+    ponto já escolhido no balde anterior e a média do balde seguinte.
+    Preserva picos e vales melhor que amostrar a cada k pontos.
+    """
+    n = len(x)
+    if n_pontos >= n or n_pontos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    limites = np.linspace(1, n - 1, n_pontos - 1).astype(int)
+
+    # média de cada balde (o "terceiro vértice" do balde anterior)
+    soma_x = np.add.reduceat(x[1:n - 1], limites[:-1] - 1)
+    soma_y = np.add.reduceat(y[1:n - 1], limites[:-1] - 1)
+    tamanhos = np.diff(limites)
+    media_x = np.append(soma_x / tamanhos, x[-1])
+    media_y = np.append(soma_y / tamanhos, y[-1])
+
+    escolhidos = np.empty(n_pontos, dtype=int)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    a = 0
+    for b in range(n_pontos - 2):
+        ini, fim = limites[b], limites[b + 1]
+        cx, cy = media_x[b + 1], media_y[b + 1]
+        areas = np.abs(
+            (x[a] - cx) * (y[ini:fim] - y[a]) - (x[a] - x[ini:fim]) * (cy - y[a])
+        )
+        a = ini + int(np.argmax(areas))
+        escolhidos[b + 1] = a
+    return escolhidos
+
+
+def figura_repasses(df_rep, transferencia, limite_pontos=LIMITE_PONTOS_REPASSES):
+    """
+    Uma linha por município (colunas MUNICÍPIO, Data, Valor), cada uma
+    reduzida com LTTB para que o total de pontos não passe de
+    `limite_pontos` (até MAX_SERIES_REPASSES linhas).
+
+    Retorna (figura, pontos na série original, pontos desenhados).
+    """
+    grupos = list(df_rep.groupby("MUNICÍPIO", sort=True, observed=True))[:MAX_SERIES_REPASSES]
+    por_serie = limite_pontos // max(1, len(grupos))
+    total = sum(len(g) for _, g in grupos)
+    desenhados = sum(min(len(g), por_serie) for _, g in grupos)
+    Linha = go.Scattergl if desenhados > LIMITE_PONTOS_SVG else go.Scatter
+
+    fig = go.Figure()
+    for municipio, g in grupos:
+        datas = g["Data"].to_numpy()
+        valores = g["Valor"].to_numpy(dtype="float64")
+        idx = lttb(datas.astype("datetime64[s]").astype("int64"), valores, por_serie)
+        fig.add_trace(Linha(
+            x=datas[idx], y=valores[idx],
+            name=str(municipio), mode="lines",
+        ))
+
+    fig.update_layout(
+        template="simple_white",
+        height=480,
+        xaxis_title="Data do repasse",
+        yaxis_title="Valor (R$)",
+        hovermode="x unified" if len(grupos) <= 10 else "closest",
+        showlegend=len(grupos) <= 30,
+        title=f"{transferencia} – repasses por município",
+    )
+    return fig, total, desenhados
+
+
+def decimar_dispersao(x, y, n_max, log_x=False, log_y=False):
+    """
+    Índices de no máximo `n_max` pontos que preservam a forma da nuvem:
+    divide o plano em uma grade e mantém um ponto por célula ocupada
+    (outliers isolados sobrevivem; regiões densas são raleadas). A grade é
+    refinada enquanto o nº de células ocupadas couber em `n_max`; se nem a
+    mais grossa couber, amostra com semente fixa.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    if len(x) <= n_max:
+        return np.arange(len(x))
+
+    def normalizar(v, log):
+        v = np.log10(np.where(v > 0, v, np.nan)) if log else v
+        vmin, vmax = np.nanmin(v), np.nanmax(v)
+        v = (v - vmin) / (vmax - vmin) if vmax > vmin else np.zeros_like(v)
+        return np.nan_to_num(v, nan=0.0)
+
+    nx, ny = normalizar(x, log_x), normalizar(y, log_y)
+    lado = max(2, int(np.sqrt(n_max)))
+    idx = None
+    while lado <= 64 * n_max:
+        cx = np.minimum((nx * lado).astype(np.int64), lado - 1)
+        cy = np.minimum((ny * lado).astype(np.int64), lado - 1)
+        _, candidatos = np.unique(cx * lado + cy, return_index=True)
+        if len(candidatos) > n_max:
+            break
+        idx = candidatos
+        lado *= 2
+    if idx is None:
+        idx = np.random.default_rng(0).choice(candidatos, n_max, replace=False)
+    return np.sort(idx)
+
+
+def figura_correlacao(corr):
+    """Mapa de calor da matriz de correlação (fundeb_dados.matriz_correlacao)."""
+    fig = go.Figure(go.Heatmap(
+        z=corr.to_numpy(),
+        x=list(corr.columns),
+        y=list(corr.index),
+        zmin=-1, zmax=1,
+        colorscale="RdBu",
+        text=np.vectorize(lambda v: "" if np.isnan(v) else f"{v:.2f}")(corr.to_numpy()),
+        texttemplate="%{text}",
+        hovertemplate="%{y} × %{x}: %{z:.3f}<extra></extra>",
+        colorbar=dict(title="r"),
+    ))
+    fig.update_layout(
+        template="simple_white",
+        height=520,
+        yaxis_autorange="reversed",
+        margin=dict(l=10, r=10, t=30, b=10),
+    )
+    return fig
+
+
+def figura_dispersao(df, col_x, col_y, municipio_sel, log=False, limite_pontos=LIMITE_PONTOS_DISPERSAO):
+    """
+    Dispersão entre dois indicadores (um ponto por linha de `df`), com o
+    município selecionado destacado. Acima de `limite_pontos`, os pontos
+    são decimados (decimar_dispersao); acima de LIMITE_BARRAS, usa WebGL.
+
+    Retorna (figura, pontos válidos, pontos desenhados).
+    """
+    dados = df[["MUNICÍPIO", col_x, col_y]].dropna()
+    if log:
+        dados = dados[(dados[col_x] > 0) & (dados[col_y] > 0)]
+    idx = decimar_dispersao(dados[col_x], dados[col_y], limite_pontos, log, log)
+    pontos = dados.iloc[idx]
+    Pontos = go.Scattergl if usa_webgl(len(pontos)) else go.Scatter
+
+    fig = go.Figure()
+    fig.add_trace(Pontos(
+        x=pontos[col_x], y=pontos[col_y],
+        mode="markers",
+        marker=dict(color="#6A1B9A", size=6, opacity=0.6),
+        hovertext=pontos["MUNICÍPIO"].astype(str),
+        name="Municípios",
+    ))
+    destaque = dados[dados["MUNICÍPIO"] == municipio_sel]
+    if not destaque.empty:
+        fig.add_trace(go.Scatter(
+            x=destaque[col_x], y=destaque[col_y],
+            mode="markers+text",
+            marker=dict(color="#D500F9", size=12, symbol="diamond"),
+            text=[municipio_sel] * len(destaque),
+            textposition="top center",
+            name=f"{municipio_sel}",
+        ))
+
+    fig.update_layout(
+        template="simple_white",
+        height=480,
+        xaxis_title=col_x,
+        yaxis_title=col_y,
+        showlegend=False,
+    )
+    if log:
+        fig.update_xaxes(type="log")
+        fig.update_yaxes(type="log")
+    return fig, len(dados), len(pontos)
+
+
+def figura_reguinha(estat, rotulo, municipio_sel):
+    """
+    “Reguinha” visual tipo bullet chart: mínimo, mediana e média entre os
+    que recebem, sobre uma faixa de 0 ao máximo, com o município marcado.
+
+    `estat` é o dicionário de fundeb_dados.estatisticas_complementacao.
+    """
+    cor_fundo, cor_min, cor_med, cor_media = CORES_REGUINHA[rotulo]
+    fig = go.Figure()
+
+    # Faixa de fundo (0 a máximo)
+    fig.add_trace(go.Bar(
+        x=[estat["maximo"]],
+        y=[rotulo],
+        orientation="h",
+        marker=dict(color=cor_fundo),
+        showlegend=False,
+        hoverinfo="skip"
+    ))
+
+    # Marcadores
+    fig.add_trace(go.Scatter(
+        x=[estat["minimo"]], y=[rotulo],
+        mode="markers",
+        marker=dict(color=cor_min, size=10, symbol="circle"),
+        name="Mínimo"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[estat["mediana"]], y=[rotulo],
+        mode="markers",
+        marker=dict(color=cor_med, size=11, symbol="diamond"),
+        name="Mediana"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[estat["media"]], y=[rotulo],
+        mode="markers",
+        marker=dict(color=cor_media, size=11, symbol="square"),
+        name="Média"
+    ))
+    if pd.notna(estat["valor_municipio"]):
+        fig.add_trace(go.Scatter(
+            x=[estat["valor_municipio"]], y=[rotulo],
+            mode="markers+text",
+            marker=dict(color="#D500F9", size=12, symbol="triangle-up"),
+            text=[municipio_sel],
+            textposition="top center",
+            name=f"{municipio_sel}"
+        ))
+
+    fig.update_layout(
+        template="simple_white",
+        height=220,
+        xaxis_title=f"Valor da complementação {rotulo} (R$)",
+        yaxis_showticklabels=False,
+        margin=dict(l=40, r=10, t=20, b=40),
+    )
+    return fig
+
+
+def figura_histograma(hist, ano, subconjunto, rotulo, valor_municipio=np.nan, municipio_sel=None):
+    """
+    Histograma (em degraus) de um indicador em um ano, a partir das
+    contagens pré-calculadas de fundeb_dados.calcular_histogramas, com o
+    valor do município selecionado marcado por uma linha vertical.
+    """
+    bordas = hist["bordas"]
+    i_ano = int(np.searchsorted(hist["anos"], ano))
+    contagens = hist["contagens"][subconjunto][i_ano]
+    log = hist["escala"] == "log"
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=bordas,
+        y=np.append(contagens, contagens[-1]),
+        mode="lines",
+        line=dict(shape="hv", color="#6A1B9A", width=1.5),
+        fill="tozeroy",
+        fillcolor="rgba(106,27,154,0.25)",
+        customdata=np.column_stack([np.append(bordas[1:], bordas[-1]), np.append(contagens, contagens[-1])]),
+        hovertemplate="%{x:,.4~s} a %{customdata[0]:,.4~s}: %{customdata[1]} municípios<extra></extra>",
+        name=subconjunto,
+        showlegend=False,
+    ))
+
+    if pd.notna(valor_municipio) and (valor_municipio > 0 or not log):
+        altura = max(int(contagens.max()), 1)
+        fig.add_trace(go.Scatter(
+            x=[valor_municipio, valor_municipio],
+            y=[0, altura * 1.05],
+            mode="lines+text",
+            line=dict(color="#D500F9", width=2, dash="dash"),
+            text=["", municipio_sel],
+            textposition="top center",
+            name=f"{municipio_sel}",
+            hoverinfo="x+name",
+            showlegend=False,
+        ))
+
+    fig.update_layout(
+        template="simple_white",
+        height=300,
+        xaxis_title=rotulo + (" (escala log)" if log else ""),
+        yaxis_title="Municípios",
+        margin=dict(l=40, r=10, t=30, b=40),
+    )
+    if log:
+        fig.update_xaxes(type="log")
+    return fig
+
+
+def figura_mapa_diferencas(df, geojson, coluna, rotulo):
+    """
+    Mapa dos municípios colorido pela `coluna` de diferenças (R$), em
+    escala divergente centrada em zero: ganhos em verde, perdas em vermelho.
+    """
+    limite = float(np.nanmax(np.abs(df[coluna].to_numpy(dtype="float64", na_value=np.nan)), initial=0.0)) or 1.0
+    fig = go.Figure(go.Choropleth(
+        geojson=geojson,
+        locations=df["Codigo_IBGE_str"].astype(str),
+        featureidkey="properties.CD_MUN",
+        z=df[coluna],
+        zmin=-limite,
+        zmax=limite,
+        colorscale="RdYlGn",
+        text=df["MUNICÍPIO"].astype(str),
+        hovertemplate="%{text}<br>" + rotulo + ": R$ %{z:,.0f}<extra></extra>",
+        colorbar_title="R$",
+        marker_line_width=0.5,
+    ))
+    fig.update_geos(
+        fitbounds="locations",
+        visible=False,
+        lonaxis_range=[-41.5, -39.0],
+        lataxis_range=[-21.5, -18.0],
+    )
+    fig.update_layout(margin=dict(t=0, b=0, l=0, r=0), height=520)
+    return fig
+
+
+def figura_mapa_margens(df, geojson, coluna, rotulo):
+    """
+    Mapa da margem de uma regra de conformidade (fundeb_dados.
+    avaliar_conformidade), em pontos percentuais e escala divergente
+    centrada em zero: folga em verde, descumprimento em vermelho.
+    Municípios sem dados ficam sem cor.
+    """
+    margem = df[coluna].to_numpy(dtype="float64", na_value=np.nan)
+    limite = float(np.nanmax(np.abs(margem), initial=0.0)) or 1.0
+    fig = go.Figure(go.Choropleth(
+        geojson=geojson,
+        locations=df["Codigo_IBGE_str"].astype(str),
+        featureidkey="properties.CD_MUN",
+        z=margem,
+        zmin=-limite,
+        zmax=limite,
+        colorscale="RdYlGn",
+        text=df["MUNICÍPIO"].astype(str),
+        hovertemplate="%{text}<br>" + rotulo + ": %{z:+.1f} p.p.<extra></extra>",
+        colorbar_title="p.p.",
+        marker_line_width=0.5,
+    ))
+    fig.update_geos(
+        fitbounds="locations",
+        visible=False,
+        lonaxis_range=[-41.5, -39.0],
+        lataxis_range=[-21.5, -18.0],
+    )
+    fig.update_layout(margin=dict(t=0, b=0, l=0, r=0), height=520)
+    return fig
+
+
+CORES_AGRUPAMENTOS = {
+    "Alto-Alto": "#D7191C",
+    "Baixo-Baixo": "#2C7BB6",
+    "Alto-Baixo": "#FDAE61",
+    "Baixo-Alto": "#ABD9E9",
+    "Não significativo": "#E0E0E0",
+    "Sem vizinhos": "#9E9E9E",
+    "Sem valor": "#FFFFFF",
+}
+
+
+def figura_mapa_agrupamentos(tabela, geojson, codigo_sel=None):
+    """
+    Mapa dos agrupamentos do I de Moran local (fundeb_vizinhanca): uma
+    camada por agrupamento, com legenda, e o município selecionado (pelo
+    código IBGE) em destaque pela borda.
+    """
+    fig = go.Figure()
+    for grupo, cor in CORES_AGRUPAMENTOS.items():
+        parte = tabela[tabela["Agrupamento"] == grupo]
+        if parte.empty:
+            continue
+        fig.add_trace(go.Choropleth(
+            geojson=geojson,
+            locations=parte["Codigo_IBGE_str"],
+            featureidkey="properties.CD_MUN",
+            z=np.zeros(len(parte)),
+            colorscale=[[0, cor], [1, cor]],
+            showscale=False,
+            marker_line_width=0.5,
+            marker_line_color="#616161",
+            text=parte["MUNICÍPIO"],
+            hovertemplate="%{text}<br>" + grupo + "<extra></extra>",
+            name=f"{grupo} ({len(parte)})",
+            showlegend=True,
+        ))
+    destaque = tabela[tabela["Codigo_IBGE_str"] == str(codigo_sel)]
+    if not destaque.empty:
+        fig.add_trace(go.Choropleth(
+            geojson=geojson,
+            locations=destaque["Codigo_IBGE_str"],
+            featureidkey="properties.CD_MUN",
+            z=[0],
+            colorscale=[[0, "rgba(0,0,0,0)"], [1, "rgba(0,0,0,0)"]],
+            showscale=False,
+            marker_line_width=3,
+            marker_line_color="#D500F9",
+            hoverinfo="skip",
+            name=str(destaque["MUNICÍPIO"].iloc[0]),
+            showlegend=True,
+        ))
+    fig.update_geos(
+        fitbounds="locations",
+        visible=False,
+        lonaxis_range=[-41.5, -39.0],
+        lataxis_range=[-21.5, -18.0],
+    )
+    fig.update_layout(margin=dict(t=0, b=0, l=0, r=0), height=520, legend_title_text="Agrupamento")
+    return fig
+
+
+def tamanho_payload(fig):
+    """Tamanho, em bytes, do JSON da figura enviado ao navegador."""
+    return len(fig.to_json())
+
+
+def pontos_figura(fig):
+    """Nº de valores nos arrays das traces (x, y, text, customdata...), sem serializar."""
+    pontos = 0
+    for trace in fig.data:
+        for valor in trace.to_plotly_json().values():
+            if isinstance(valor, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+                pontos += int(np.size(valor))
+    return pontos
+
+
+def excede_payload(fig, limite=LIMITE_PAYLOAD_BYTES):
+    """
+    (excede, tamanho estimado em bytes). Pela contagem de pontos, a
+    maioria das figuras fica claramente abaixo do limite e não é
+    serializada; só as próximas dele (ou com GeoJSON, que não entra na
+    contagem) são medidas com tamanho_payload.
+    """
+    estimado = pontos_figura(fig) * BYTES_POR_PONTO
+    com_geojson = any(getattr(trace, "geojson", None) is not None for trace in fig.data)
+    if estimado <= limite and not com_geojson:
+        return False, estimado
+    tamanho = tamanho_payload(fig)
+    return tamanho > limite, tamanho
@@ -0,0 +1,226 @@
+# ================================================================
+# fundeb_revisoes.py – Revisões entre versões (snapshots) da planilha
+# (sem dependência do Streamlit)
+# ================================================================
+# FNDE e Tesouro estadual revisam valores de anos anteriores. A cada
+# carga de uma planilha nova, registrar_snapshot guarda a base
+# normalizada e compara com a versão anterior, gravando as diferenças:
+#
+#   <pasta>/atual.json                      – versão vigente
+#   <pasta>/base_<versao>.pkl               – base normalizada de cada versão
+#   <pasta>/revisoes_<anterior>_<nova>.csv  – diferenças entre duas versões
+#
+# A comparação é feita uma vez, na carga; o painel só lê os CSVs.
+import datetime
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from fundeb_dados import COLUNAS_DERIVADAS, COLUNAS_RENOMEADAS
+
+PASTA_SNAPSHOTS = "snapshots"
+
+# Versões mantidas em disco (as revisões já calculadas não são apagadas)
+MAX_SNAPSHOTS = 5
+
+COLUNAS_CHAVE = ["ANO", "Código IBGE"]
+
+# Diferença numérica mínima considerada revisão (centavos de arredondamento)
+TOLERANCIA_REVISAO = 0.005
+
+COLUNAS_REVISOES = [
+    "ANO", "Código IBGE", "MUNICÍPIO", "Tipo", "Indicador", "Valor anterior", "Valor novo",
+]
+
+# Indicador com o nome da planilha (ler_base renomeia algumas colunas)
+NOMES_PLANILHA = {derivada: original for original, derivada in COLUNAS_RENOMEADAS.items()}
+
+
+def _hash_linhas(df, colunas):
+    return pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+
+
+def _chaves(df):
+    """Linhas com chave (ANO, Código IBGE) válida e única, e o hash da chave."""
+    df = df.dropna(subset=COLUNAS_CHAVE).drop_duplicates(COLUNAS_CHAVE)
+    chaves = df[COLUNAS_CHAVE].astype("int64")
+    return df.reset_index(drop=True), pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+
+
+def versao_base(df):
+    """
+    Impressão digital do conteúdo da base (independente da ordem das
+    linhas): soma dos hashes das linhas + nomes das colunas, combinados
+    num sha256 antes de reduzir a 16 caracteres (uma coluna renomeada
+    muda a versão).
+    """
+    soma = int(pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype="uint64"))
+    colunas = int(pd.util.hash_array(np.array(list(df.columns), dtype=object)).sum(dtype="uint64"))
+    return hashlib.sha256(f"{soma:016x}{colunas:016x}".encode()).hexdigest()[:16]
+
+
+def comparar_snapshots(anterior, nova):
+    """
+    Diferenças entre duas versões da base, sem juntar as tabelas inteiras:
+
+    1. as chaves (ANO, Código IBGE) viram hashes e são alinhadas com
+       np.intersect1d – sobram as linhas incluídas e removidas
+    2. nas linhas comuns, um hash das colunas comparadas separa as que
+       mudaram
+    3. só nessas linhas, cada coluna é comparada para achar o indicador
+       alterado (com TOLERANCIA_REVISAO para números)
+
+    Retorna um DataFrame com COLUNAS_REVISOES.
+    """
+    colunas = [
+        c for c in nova.columns
+        if c in anterior.columns and c not in COLUNAS_CHAVE + ["MUNICÍPIO"] + COLUNAS_DERIVADAS
+    ]
+    ant, k_ant = _chaves(anterior)
+    nov, k_nov = _chaves(nova)
+
+    _, i_ant, i_nov = np.intersect1d(k_ant, k_nov, assume_unique=True, return_indices=True)
+    removidas = np.setdiff1d(np.arange(len(ant)), i_ant)
+    incluidas = np.setdiff1d(np.arange(len(nov)), i_nov)
+
+    # mesmo tipo nas duas versões para que o hash compare só os valores
+    comuns_ant = ant.iloc[i_ant][colunas].reset_index(drop=True)
+    comuns_nov = nov.iloc[i_nov][colunas].reset_index(drop=True)
+    for c in colunas:
+        if comuns_ant[c].dtype != comuns_nov[c].dtype:
+            comuns_ant[c] = comuns_ant[c].astype(object)
+            comuns_nov[c] = comuns_nov[c].astype(object)
+    mudou = np.flatnonzero(_hash_linhas(comuns_ant, colunas) != _hash_linhas(comuns_nov, colunas))
+
+    partes = []
+    linhas_nov = nov.iloc[i_nov[mudou]].reset_index(drop=True)
+    for c in colunas:
+        va = comuns_ant[c].iloc[mudou].reset_index(drop=True)
+        vn = comuns_nov[c].iloc[mudou].reset_index(drop=True)
+        ambos_vazios = va.isna() & vn.isna()
+        if pd.api.types.is_numeric_dtype(va) and pd.api.types.is_numeric_dtype(vn):
+            dif = (va.astype("float64") - vn.astype("float64")).abs()
+            alterado = ~ambos_vazios & ~(dif <= TOLERANCIA_REVISAO)
+        else:
+            alterado = ~ambos_vazios & (va.astype(object) != vn.astype(object))
+        if alterado.any():
+            partes.append(pd.DataFrame({
+                "ANO": linhas_nov.loc[alterado, "ANO"].astype("int64"),
+                "Código IBGE": linhas_nov.loc[alterado, "Código IBGE"].astype("int64"),
+                "MUNICÍPIO": linhas_nov.loc[alterado, "MUNICÍPIO"].astype(str),
+                "Tipo": "Alterado",
+                "Indicador": NOMES_PLANILHA.get(c, c),
+                "Valor anterior": va[alterado].astype(object),
+                "Valor novo": vn[alterado].astype(object),
+            }))
+
+    for tipo, df, idx in [("Removido", ant, removidas), ("Incluído", nov, incluidas)]:
+        if len(idx):
+            linhas = df.iloc[idx]
+            partes.append(pd.DataFrame({
+                "ANO": linhas["ANO"].astype("int64"),
+                "Código IBGE": linhas["Código IBGE"].astype("int64"),
+                "MUNICÍPIO": linhas["MUNICÍPIO"].astype(str),
+                "Tipo": tipo,
+                "Indicador": "(linha inteira)",
+                "Valor anterior": None,
+                "Valor novo": None,
+            }))
+
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_REVISOES)
+    return (
+        pd.concat(partes, ignore_index=True)
+        .sort_values(["ANO", "MUNICÍPIO", "Tipo", "Indicador"], ignore_index=True)
+    )
+
+
+def _gravar_atomico(caminho, escrever):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    escrever(temporario)
+    os.replace(temporario, caminho)
+
+
+def _escrever_json(caminho, dados):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=1)
+
+
+def _ler_atual(pasta):
+    caminho = os.path.join(pasta, "atual.json")
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def registrar_snapshot(df, origem, pasta=PASTA_SNAPSHOTS):
+    """
+    Registra a base recém-carregada como versão vigente. Se o conteúdo
+    mudou desde a última carga, compara com a versão anterior e grava as
+    revisões. Idempotente: recarregar a mesma planilha não faz nada.
+
+    Retorna a versão (impressão digital) da base.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    versao = versao_base(df)
+    atual = _ler_atual(pasta)
+    if atual is not None and atual["versao"] == versao:
+        return versao
+
+    caminho_base = os.path.join(pasta, f"base_{versao}.pkl")
+    if not os.path.exists(caminho_base):
+        _gravar_atomico(caminho_base, df.to_pickle)
+
+    if atual is not None:
+        caminho_ant = os.path.join(pasta, f"base_{atual['versao']}.pkl")
+        caminho_rev = os.path.join(pasta, f"revisoes_{atual['versao']}_{versao}.csv")
+        if os.path.exists(caminho_ant) and not os.path.exists(caminho_rev):
+            revisoes = comparar_snapshots(pd.read_pickle(caminho_ant), df)
+            _gravar_atomico(
+                caminho_rev,
+                lambda c: revisoes.to_csv(c, sep=";", index=False, encoding="utf-8"),
+            )
+
+    registro = {
+        "versao": versao,
+        "anterior": atual["versao"] if atual else None,
+        "origem": origem,
+        "carregada_em": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    _gravar_atomico(
+        os.path.join(pasta, "atual.json"),
+        lambda c: _escrever_json(c, registro),
+    )
+
+    # mantém só as MAX_SNAPSHOTS bases mais recentes
+    bases = sorted(glob.glob(os.path.join(pasta, "base_*.pkl")), key=os.path.getmtime)
+    for antiga in bases[:-MAX_SNAPSHOTS]:
+        os.remove(antiga)
+
+    return versao
+
+
+def listar_revisoes(pasta=PASTA_SNAPSHOTS):
+    """
+    Comparações já calculadas, da mais recente para a mais antiga:
+    lista de dicionários com "anterior", "nova", "data" e "caminho".
+    """
+    comparacoes = []
+    for caminho in glob.glob(os.path.join(pasta, "revisoes_*_*.csv")):
+        _, anterior, nova = os.path.basename(caminho)[:-4].split("_")
+        comparacoes.append({
+            "anterior": anterior,
+            "nova": nova,
+            "data": datetime.datetime.fromtimestamp(os.path.getmtime(caminho)),
+            "caminho": caminho,
+        })
+    return sorted(comparacoes, key=lambda c: c["data"], reverse=True)
+
+
+def ler_revisoes(caminho):
+    return pd.read_csv(caminho, sep=";", encoding="utf-8")
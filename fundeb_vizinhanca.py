@@ -0,0 +1,255 @@
+# ================================================================
+# fundeb_vizinhanca.py – Vizinhança entre municípios e indicadores espaciais
+# (sem dependência do Streamlit)
+# ================================================================
+# O grafo de vizinhança é montado uma vez a partir do GeoJSON do mapa:
+# dois municípios são vizinhos quando compartilham fronteira, ou seja,
+# pelo menos MIN_VERTICES_FRONTEIRA vértices (coordenadas arredondadas em
+# CASAS_COORDENADAS casas) – um só vértice em comum é um encontro de
+# cantos, não uma fronteira. O grafo fica em formato CSR (indptr,
+# indices), a matriz de adjacência esparsa sem depender do scipy.
+#
+# Sobre ele, para qualquer indicador e ano:
+# - defasagem espacial: média do indicador nos vizinhos (matriz de pesos
+#   padronizada por linha vezes o vetor do indicador)
+# - I de Moran local (LISA) com pseudo p-valor por permutações
+#   condicionais: agrupamentos Alto-Alto (hotspots), Baixo-Baixo etc.
+import numpy as np
+import pandas as pd
+
+from fundeb_dados import INDICADORES_CRUZAMENTO
+
+CASAS_COORDENADAS = 6
+
+MIN_VERTICES_FRONTEIRA = 2
+
+# Indicadores oferecidos na seção; os booleanos viram a proporção de
+# vizinhos que recebem a complementação
+INDICADORES_VIZINHANCA = INDICADORES_CRUZAMENTO + ["Recebe_VAAT", "Recebe_VAAR"]
+
+PERMUTACOES_MORAN = 999
+SIGNIFICANCIA_MORAN = 0.05
+SEMENTE_MORAN = 2024
+
+# Permutações sorteadas por vez (limita a memória em bases grandes)
+PERMUTACOES_POR_BLOCO = 100
+
+AGRUPAMENTOS = [
+    "Alto-Alto", "Baixo-Baixo", "Alto-Baixo", "Baixo-Alto", "Não significativo", "Sem vizinhos", "Sem valor",
+]
+
+
+def _vertices(geometria):
+    """Anéis (arrays n x 2) de um Polygon ou MultiPolygon."""
+    if geometria is None:
+        return []
+    if geometria["type"] == "Polygon":
+        poligonos = [geometria["coordinates"]]
+    elif geometria["type"] == "MultiPolygon":
+        poligonos = geometria["coordinates"]
+    else:
+        return []
+    return [np.asarray(anel, dtype="float64")[:, :2] for poligono in poligonos for anel in poligono if len(anel)]
+
+
+class GrafoVizinhanca:
+    """Vizinhança entre os municípios `codigos` (CD_MUN), em CSR."""
+
+    def __init__(self, codigos, linhas, colunas):
+        self.codigos = np.asarray([str(c) for c in codigos], dtype=object)
+        n = len(self.codigos)
+        ordem = np.lexsort((colunas, linhas))
+        self.indices = np.asarray(colunas, dtype="int32")[ordem]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(linhas, minlength=n))]).astype("int64")
+        self._posicao = {c: i for i, c in enumerate(self.codigos)}
+
+    @classmethod
+    def do_geojson(cls, geojson, casas=CASAS_COORDENADAS, minimo=MIN_VERTICES_FRONTEIRA):
+        """Monta o grafo a partir das feições do mapa (propriedade CD_MUN)."""
+        codigos, chaves, donos = [], [], []
+        escala = 10 ** casas
+        for feicao in geojson["features"]:
+            i = len(codigos)
+            codigos.append(str(feicao["properties"]["CD_MUN"]))
+            for anel in _vertices(feicao.get("geometry")):
+                inteiros = np.round(anel * escala).astype("int64")
+                lon = inteiros[:, 0] + 180 * escala
+                lat = inteiros[:, 1] + 90 * escala
+                chaves.append(lon * (180 * escala + 1) + lat)
+                donos.append(np.full(len(anel), i, dtype="int64"))
+
+        n = len(codigos)
+        if not chaves:
+            return cls(codigos, np.zeros(0, dtype="int64"), np.zeros(0, dtype="int64"))
+        chave = np.concatenate(chaves)
+        dono = np.concatenate(donos)
+
+        # vértices únicos por município, ordenados por coordenada
+        ordem = np.lexsort((dono, chave))
+        chave, dono = chave[ordem], dono[ordem]
+        novo = np.ones(len(chave), dtype=bool)
+        novo[1:] = (chave[1:] != chave[:-1]) | (dono[1:] != dono[:-1])
+        chave, dono = chave[novo], dono[novo]
+
+        # pares de municípios que compartilham cada vértice (a < b)
+        pares = []
+        for d in range(1, len(chave)):
+            mesmo = chave[:-d] == chave[d:]
+            if not mesmo.any():
+                break
+            pares.append(dono[:-d][mesmo] * n + dono[d:][mesmo])
+        if not pares:
+            return cls(codigos, np.zeros(0, dtype="int64"), np.zeros(0, dtype="int64"))
+
+        par, contagem = np.unique(np.concatenate(pares), return_counts=True)
+        par = par[contagem >= minimo]
+        a, b = par // n, par % n
+        return cls(codigos, np.concatenate([a, b]), np.concatenate([b, a]))
+
+    @property
+    def n_vizinhos(self):
+        return np.diff(self.indptr)
+
+    @property
+    def n_pares(self):
+        return len(self.indices) // 2
+
+    def vizinhos(self, codigo):
+        """CD_MUN dos vizinhos do município (lista vazia se ele não está no mapa)."""
+        i = self._posicao.get(str(codigo))
+        if i is None:
+            return []
+        return list(self.codigos[self.indices[self.indptr[i]:self.indptr[i + 1]]])
+
+    def posicoes(self, codigos):
+        """Posição de cada código no grafo (-1 para os que não estão no mapa)."""
+        return np.array([self._posicao.get(str(c), -1) for c in codigos], dtype="int64")
+
+    def somar_vizinhos(self, x):
+        """
+        Soma de `x` nos vizinhos de cada município: produto da matriz de
+        adjacência por `x` (vetor ou matriz com uma linha por município).
+        """
+        x = np.asarray(x, dtype="float64")
+        soma = np.zeros((len(self.codigos),) + x.shape[1:])
+        tem = self.n_vizinhos > 0
+        if tem.any():
+            soma[tem] = np.add.reduceat(x[self.indices], self.indptr[:-1][tem], axis=0)
+        return soma
+
+    def defasagem(self, x):
+        """
+        Média de `x` nos vizinhos com valor (pesos padronizados por linha,
+        só entre vizinhos com valor); NaN para quem não tem nenhum.
+        """
+        x = np.asarray(x, dtype="float64")
+        validos = np.isfinite(x)
+        soma = self.somar_vizinhos(np.where(validos, x, 0.0))
+        n = self.somar_vizinhos(validos.astype("float64"))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, soma / n, np.nan)
+
+
+def _pseudo_p(grafo, z, local, permutacoes, semente):
+    """
+    Pseudo p-valor do I local por permutações condicionais: o valor de
+    cada município fica fixo e os dos seus k vizinhos são sorteados entre
+    os demais municípios com valor (com reposição, o que é uma boa
+    aproximação quando k é pequeno perto do total).
+    """
+    validos = np.flatnonzero(np.isfinite(z))
+    m = len(validos)
+    k = grafo.somar_vizinhos(np.isfinite(z).astype("float64")).astype("int64")
+    donos = validos[(k[validos] > 0)]
+    if m < 3 or not len(donos):
+        return np.full(len(z), np.nan)
+
+    z_validos = z[validos]
+    rank = np.full(len(z), -1, dtype="int64")
+    rank[validos] = np.arange(m)
+    k_donos = k[donos]
+    inicio = np.concatenate([[0], np.cumsum(k_donos)[:-1]])
+    proprio = np.repeat(rank[donos], k_donos)
+
+    rng = np.random.default_rng(semente)
+    extremos = np.zeros(len(donos), dtype="int64")
+    observado = local[donos]
+    for bloco in range(0, permutacoes, PERMUTACOES_POR_BLOCO):
+        p = min(PERMUTACOES_POR_BLOCO, permutacoes - bloco)
+        sorteio = rng.integers(0, m - 1, size=(p, len(proprio)))
+        sorteio += sorteio >= proprio  # nunca o próprio município
+        media = np.add.reduceat(z_validos[sorteio], inicio, axis=1) / k_donos
+        simulado = z[donos] * media
+        extremos += np.where(observado >= 0, simulado >= observado, simulado <= observado).sum(axis=0)
+
+    p_valor = np.full(len(z), np.nan)
+    p_valor[donos] = (extremos + 1) / (permutacoes + 1)
+    return p_valor
+
+
+def indicadores_espaciais(grafo, codigos, valores, permutacoes=PERMUTACOES_MORAN,
+                          semente=SEMENTE_MORAN, alfa=SIGNIFICANCIA_MORAN):
+    """
+    Indicadores espaciais de `valores` (na ordem de `codigos`, CD_MUN):
+    DataFrame com Valor, Vizinhos, Média dos vizinhos, Diferença para os
+    vizinhos, z, I local, p e Agrupamento. Municípios fora do mapa ficam
+    "Sem vizinhos".
+    """
+    codigos = pd.Series(codigos).astype(str).to_numpy()
+    valores = pd.Series(valores).astype("float64").to_numpy(na_value=np.nan)
+    posicao = grafo.posicoes(codigos)
+    no_mapa = posicao >= 0
+
+    x = np.full(len(grafo.codigos), np.nan)
+    x[posicao[no_mapa]] = valores[no_mapa]
+
+    validos = np.isfinite(x)
+    z = np.full(len(x), np.nan)
+    if validos.sum() > 1 and np.nanstd(x) > 0:
+        z[validos] = (x[validos] - x[validos].mean()) / x[validos].std()
+
+    media_viz = grafo.defasagem(x)
+    defasagem_z = grafo.defasagem(z)
+    local = z * defasagem_z
+    p = _pseudo_p(grafo, z, local, permutacoes, semente)
+
+    agrupamento = np.select(
+        [
+            ~validos,
+            ~np.isfinite(defasagem_z),
+            ~(p <= alfa),
+            (z >= 0) & (defasagem_z >= 0),
+            (z < 0) & (defasagem_z < 0),
+            z >= 0,
+        ],
+        ["Sem valor", "Sem vizinhos", "Não significativo", "Alto-Alto", "Baixo-Baixo", "Alto-Baixo"],
+        default="Baixo-Alto",
+    )
+
+    def alinhar(v):
+        saida = np.full(len(codigos), np.nan)
+        saida[no_mapa] = v[posicao[no_mapa]]
+        return saida
+
+    tabela = pd.DataFrame({
+        "Valor": valores,
+        "Vizinhos": alinhar(grafo.n_vizinhos.astype("float64")),
+        "Média dos vizinhos": alinhar(media_viz),
+        "z": alinhar(z),
+        "I local": alinhar(local),
+        "p": alinhar(p),
+    })
+    tabela["Diferença para os vizinhos"] = tabela["Valor"] - tabela["Média dos vizinhos"]
+    grupo = np.full(len(codigos), "Sem vizinhos", dtype=object)
+    grupo[no_mapa] = agrupamento[posicao[no_mapa]]
+    grupo[~np.isfinite(valores)] = "Sem valor"
+    tabela["Agrupamento"] = pd.Categorical(grupo, categories=AGRUPAMENTOS)
+    return tabela
+
+
+def moran_global(tabela):
+    """
+    I de Moran global: com z padronizado e pesos padronizados por linha,
+    é a média dos I locais dos municípios com vizinhos.
+    """
+    return float(np.nanmean(tabela["I local"])) if tabela["I local"].notna().any() else np.nan
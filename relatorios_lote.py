@@ -0,0 +1,293 @@
+# ================================================================
+# relatorios_lote.py – Relatórios estáticos por município e ano (HTML)
+# ================================================================
+# Uso:
+#   python relatorios_lote.py --saida relatorios
+#   python relatorios_lote.py --saida relatorios --anos 2024 --processos 8 --plotlyjs cdn
+#
+# Para cada (município, ano) gera um HTML com o diagnóstico do Fundeb
+# (gráfico + tabela de variações do BLOCO 5), o posicionamento em VAAT e
+# VAAR e os alertas automáticos que citam o município.
+#
+# - A base é lida uma única vez e compartilhada, somente leitura, com os
+#   processos do pool (herdada via fork quando disponível)
+# - Relatórios cujas entradas não mudaram desde a última execução são
+#   ignorados (ver manifesto.json na pasta de saída)
+import argparse
+import functools
+import hashlib
+import html
+import json
+import multiprocessing as mp
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from fundeb_dados import (
+    estatisticas_complementacao,
+    filtrar_anos_analise,
+    formatar_reais,
+    ler_base,
+    localizar_planilha,
+    regras_alerta,
+    serie_municipio,
+    tabela_variacoes,
+    tabela_variacoes_exibicao,
+)
+from fundeb_graficos import figura_fundeb_municipio, figura_reguinha
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+# Módulos cujo código entra na impressão digital dos relatórios
+MODULOS_RELATORIO = ["fundeb_dados.py", "fundeb_graficos.py", "relatorios_lote.py"]
+
+ESTILO_HTML = """
+body { font-family: 'Montserrat', sans-serif; color:#5F6169; margin: 32px auto; max-width: 1100px; }
+h1, h2 { color:#3A0057; }
+.cards { display:flex; gap:16px; flex-wrap:wrap; }
+.card { flex:1; min-width:150px; padding:16px; border-radius:12px; border:1px solid #E0E0E0;
+        text-align:center; color:#3A0057; background:#F3F3F3; }
+table { border-collapse: collapse; width:100%; font-size:13px; }
+td, th { border:1px solid #E0E0E0; padding:6px; text-align:center; }
+footer { margin-top:40px; text-align:center; color:#7E7E7E; font-size:13px; }
+"""
+
+# Base compartilhada com os processos do pool (somente leitura)
+_BASE = None
+
+
+def _inicializar_processo(df):
+    global _BASE
+    _BASE = df
+
+
+def nome_arquivo(codigo_ibge, municipio, ano):
+    slug = unicodedata.normalize("NFKD", str(municipio)).encode("ascii", "ignore").decode()
+    slug = "_".join(slug.lower().split())
+    return os.path.join(str(ano), f"{codigo_ibge}_{slug}.html")
+
+
+def versao_codigo(plotlyjs):
+    """Hash do código dos módulos do relatório (mudou o código, refaz tudo)."""
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha1(plotlyjs.encode())
+    for modulo in MODULOS_RELATORIO:
+        with open(os.path.join(pasta, modulo), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def impressoes_digitais(df, tarefas, plotlyjs):
+    """
+    Impressão digital das entradas de cada relatório, calculada de forma
+    vetorizada: hash das linhas do município (todos os anos, pelo Código
+    IBGE – nomes se repetem entre estados) + hash das
+    linhas do ano (distribuição de VAAT/VAAR e alertas) + anos da base +
+    versão do código.
+    """
+    h_linhas = pd.Series(
+        pd.util.hash_pandas_object(df, index=False).to_numpy(), index=df.index
+    )
+    h_mun = h_linhas.groupby(df["Código IBGE"].astype(int)).sum()
+    h_ano = h_linhas.groupby(df["ANO"].astype(int)).sum()
+    anos = ",".join(str(a) for a in sorted(h_ano.index))
+    versao = versao_codigo(plotlyjs)
+
+    return [
+        hashlib.sha1(
+            f"{versao}|{anos}|{int(h_mun[codigo]):016x}|{int(h_ano[ano]):016x}".encode()
+        ).hexdigest()
+        for codigo, _, ano, _ in tarefas
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _alertas_do_ano(ano):
+    """Regras de alerta do ano (municípios pelo Código IBGE), uma vez por processo."""
+    df_ano = _BASE[_BASE["ANO"] == ano]
+    return regras_alerta(_BASE, df_ano, ano, chave="Código IBGE")
+
+
+def _html_cards(estat, rotulo):
+    if estat is None:
+        return f"<p>Nenhum município recebeu {rotulo} no ano.</p>"
+
+    if estat["posicao"] is not None:
+        posicao = f"{estat['posicao']}º de {estat['n_recebem']} que recebem"
+    else:
+        posicao = f"Não recebeu ({estat['n_recebem']} municípios recebem)"
+
+    cards = [
+        ("Município", formatar_reais(estat["valor_municipio"])),
+        ("Posição", posicao),
+        ("Mínimo", formatar_reais(estat["minimo"])),
+        ("Mediana", formatar_reais(estat["mediana"])),
+        ("Média", formatar_reais(estat["media"])),
+        ("Máximo", formatar_reais(estat["maximo"])),
+    ]
+    return '<div class="cards">' + "".join(
+        f'<div class="card"><div>{html.escape(t)}</div><h3>{html.escape(v)}</h3></div>'
+        for t, v in cards
+    ) + "</div>"
+
+
+def html_relatorio(df, codigo, municipio, ano, plotlyjs="inline"):
+    """
+    HTML autocontido (ou com plotly.js via CDN) do relatório do município
+    (`codigo` IBGE; o nome é só o título) no ano.
+    """
+    df_mun = serie_municipio(df, municipio, codigo)
+    df_ano = df[df["ANO"] == ano]
+
+    incluir_js = {"inline": True, "cdn": "cdn"}[plotlyjs]
+
+    def fig_html(fig):
+        nonlocal incluir_js
+        trecho = fig.to_html(full_html=False, include_plotlyjs=incluir_js)
+        incluir_js = False  # plotly.js só no primeiro gráfico
+        return trecho
+
+    partes = [
+        f"<h1>{html.escape(str(municipio))} – Fundeb, VAAT e VAAR ({ano})</h1>",
+        "<h2>Fundeb – diagnóstico</h2>",
+        fig_html(figura_fundeb_municipio(df_mun, municipio)),
+        tabela_variacoes_exibicao(tabela_variacoes(df_mun)).to_html(),
+        "<p><small>Fundeb base = receita do Fundeb antes das complementações. "
+        "Complementações = VAAF + VAAT + VAAR. "
+        "Fundeb total = Fundeb base + complementações.</small></p>",
+    ]
+
+    for coluna, rotulo in [("Compl_VAAT", "VAAT"), ("Compl_VAAR", "VAAR")]:
+        estat = estatisticas_complementacao(df_ano, coluna, municipio, codigo)
+        partes.append(f"<h2>Complementação {rotulo} – posicionamento em {ano}</h2>")
+        partes.append(_html_cards(estat, rotulo))
+        if estat is not None:
+            partes.append(fig_html(figura_reguinha(estat, rotulo, municipio)))
+
+    alertas = [
+        f"<li>{icone} {html.escape(titulo)}</li>"
+        for icone, titulo, municipios in _alertas_do_ano(ano)
+        if str(codigo) in municipios
+    ]
+    partes.append("<h2>Alertas automáticos</h2>")
+    partes.append(
+        f"<ul>{''.join(alertas)}</ul>" if alertas
+        else "<p>Nenhum alerta para o município com as regras atuais.</p>"
+    )
+
+    return (
+        "<!DOCTYPE html><html lang='pt-br'><head><meta charset='utf-8'>"
+        f"<title>{html.escape(str(municipio))} – {ano}</title>"
+        f"<style>{ESTILO_HTML}</style></head><body>"
+        + "".join(partes)
+        + "<footer>Desenvolvido por <b>Zetta Inteligência em Dados</b> · "
+          "Painel Fundeb, Complementações & ICMS</footer></body></html>"
+    )
+
+
+def _gerar(tarefa):
+    """Executado nos processos do pool: gera e grava um relatório."""
+    codigo, municipio, ano, destino, plotlyjs = tarefa
+    conteudo = html_relatorio(_BASE, codigo, municipio, ano, plotlyjs)
+
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    os.replace(temporario, destino)
+    return destino
+
+
+def carregar_manifesto(pasta):
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_manifesto(pasta, manifesto):
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    with open(f"{caminho}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(f"{caminho}.tmp", caminho)
+
+
+def main():
+    global _BASE
+
+    parser = argparse.ArgumentParser(description="Gera relatórios HTML por município e ano.")
+    parser.add_argument("--saida", default="relatorios", help="pasta de saída")
+    parser.add_argument("--planilha", default=None, help="caminho da planilha (padrão: loa.xlsx)")
+    parser.add_argument("--anos", type=int, nargs="*", help="anos a gerar (padrão: todos)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="nº de processos")
+    parser.add_argument("--plotlyjs", choices=["inline", "cdn"], default="inline",
+                        help="inline = HTML autocontido; cdn = arquivos menores")
+    parser.add_argument("--forcar", action="store_true", help="refaz todos os relatórios")
+    args = parser.parse_args()
+
+    caminho = args.planilha or localizar_planilha()
+    if caminho is None or not os.path.exists(caminho):
+        parser.error("planilha não encontrada (use --planilha)")
+
+    t0 = time.perf_counter()
+    df, _ = ler_base(caminho)
+    df = filtrar_anos_analise(df)
+    if args.anos:
+        anos_sel = set(args.anos)
+    else:
+        anos_sel = set(int(a) for a in df["ANO"].unique())
+    t_carga = time.perf_counter() - t0
+
+    chaves = df.loc[
+        df["ANO"].isin(anos_sel) & df["Código IBGE"].notna(), ["Código IBGE", "MUNICÍPIO", "ANO", "Codigo_IBGE_str"]
+    ].drop_duplicates(["Código IBGE", "ANO"])
+    tarefas = [
+        (int(codigo), str(mun), int(ano), nome_arquivo(cod, mun, int(ano)))
+        for codigo, mun, ano, cod in chaves.itertuples(index=False)
+    ]
+    impressoes = impressoes_digitais(df, tarefas, args.plotlyjs)
+
+    manifesto = carregar_manifesto(args.saida)
+    pendentes = [
+        (codigo, mun, ano, os.path.join(args.saida, arquivo), args.plotlyjs)
+        for (codigo, mun, ano, arquivo), imp in zip(tarefas, impressoes)
+        if args.forcar
+        or manifesto.get(arquivo) != imp
+        or not os.path.exists(os.path.join(args.saida, arquivo))
+    ]
+    print(f"Base carregada em {t_carga:.1f} s: {len(tarefas)} relatórios, "
+          f"{len(tarefas) - len(pendentes)} sem alteração, {len(pendentes)} a gerar.")
+
+    t0 = time.perf_counter()
+    if pendentes:
+        processos = max(1, min(args.processos or 1, len(pendentes)))
+        if "fork" in mp.get_all_start_methods():
+            # processos filhos herdam a base sem cópia (copy-on-write)
+            _BASE = df
+            pool = ProcessPoolExecutor(processos, mp_context=mp.get_context("fork"))
+        else:
+            pool = ProcessPoolExecutor(processos, initializer=_inicializar_processo, initargs=(df,))
+
+        lote = max(1, len(pendentes) // (processos * 4))
+        with pool:
+            for i, _ in enumerate(pool.map(_gerar, pendentes, chunksize=lote), start=1):
+                if i % 100 == 0 or i == len(pendentes):
+                    decorrido = time.perf_counter() - t0
+                    print(f"  {i}/{len(pendentes)} ({i / decorrido:.1f} relatórios/s)")
+
+    decorrido = time.perf_counter() - t0
+    manifesto.update({arquivo: imp for (_, _, _, arquivo), imp in zip(tarefas, impressoes)})
+    os.makedirs(args.saida, exist_ok=True)
+    salvar_manifesto(args.saida, manifesto)
+
+    vazao = len(pendentes) / decorrido if decorrido > 0 else 0.0
+    print(f"{len(pendentes)} relatórios gerados em {decorrido:.1f} s "
+          f"({vazao:.1f} relatórios/s) em {args.saida}/")
+
+
+if __name__ == "__main__":
+    main()
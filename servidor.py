@@ -0,0 +1,144 @@
+# ================================================================
+# servidor.py – Sobe o painel com caches aquecidos e sinal de prontidão
+# ================================================================
+# Uso:
+#   python servidor.py
+#   python servidor.py --anos-aquecimento 3 --porta-prontidao 8599 -- --server.port 8501
+#
+# Equivale a `streamlit run fundeb.py`, mas, no mesmo processo:
+# - assim que o runtime do Streamlit existe, uma thread em segundo plano
+#   aquece os caches da abertura do painel (ver fundeb_cache.aquecer):
+#   base, mapa, agregados dos últimos anos e gráfico da visão geral
+# - um endpoint HTTP de prontidão (GET /pronto na --porta-prontidao)
+#   responde 503 enquanto o aquecimento roda (ou se ele falhou) e 200
+#   depois dele – use-o no
+#   balanceador de carga para só enviar tráfego a workers aquecidos
+#   (o /_stcore/health do Streamlit responde 200 antes disso)
+# - depois do aquecimento, a recarga a quente (fundeb_cache, BLOCO 2f)
+#   passa a vigiar a planilha; o /pronto informa a versão vigente
+#
+# Os argumentos após "--" vão direto para o `streamlit run`.
+# Variáveis de ambiente: FUNDEB_ANOS_AQUECIMENTO, FUNDEB_PORTA_PRONTIDAO.
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_APP = os.path.join(PASTA_APP, "fundeb.py")
+
+# Estado do aquecimento, lido pelo endpoint de prontidão
+_estado = {"pronto": False, "situacao": "aquecendo", "etapas": [], "versao_falhou": None}
+
+log = logging.getLogger("fundeb.servidor")
+
+
+class _Prontidao(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/pronto":
+            self.send_error(404)
+            return
+        versao = _versao()
+        # aquecimento falhou, mas a recarga a quente já trocou para uma versão boa
+        recuperado = _estado["versao_falhou"] is not None and versao.get("versao_dados") not in (
+            None, _estado["versao_falhou"]
+        )
+        pronto = _estado["pronto"] or recuperado
+        corpo = json.dumps({**_estado, "pronto": pronto, **versao}, ensure_ascii=False).encode("utf-8")
+        self.send_response(200 if pronto else 503)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass  # sondagens frequentes do balanceador não vão para o log
+
+
+def _versao():
+    """Versão vigente dos dados (e recarga em andamento), se o painel já carregou."""
+    fundeb_cache = sys.modules.get("fundeb_cache")
+    if fundeb_cache is None:
+        return {}
+    estado = fundeb_cache.estado_versao()
+    return {
+        "versao_dados": estado["vigente"],
+        "recarregando": estado["preparando"],
+        "recarga_falhou": estado["erro"],
+    }
+
+
+def servir_prontidao(porta):
+    servidor = ThreadingHTTPServer(("0.0.0.0", porta), _Prontidao)
+    threading.Thread(target=servidor.serve_forever, name="prontidao", daemon=True).start()
+    return servidor
+
+
+def aquecer_em_segundo_plano(n_anos):
+    """Espera o runtime do Streamlit e aquece os caches do painel."""
+    from streamlit import runtime
+
+    while not runtime.exists():
+        time.sleep(0.1)
+
+    from fundeb_cache import aquecer, observador_dados, silenciar_contexto_ausente
+
+    # a thread não tem ScriptRunContext (não é uma sessão): aviso esperado
+    # só nela, e não no processo inteiro
+    silenciar_contexto_ausente()
+
+    t0 = time.perf_counter()
+    try:
+        etapas = aquecer(n_anos)
+    except Exception as erro:
+        # o worker segue de pé (o painel mostra o erro ao usuário), mas o
+        # /pronto continua 503 até uma recarga a quente trazer dados válidos
+        _estado["situacao"] = f"aquecimento falhou: {erro}"
+        _estado["versao_falhou"] = _versao().get("versao_dados")
+        log.warning("aquecimento falhou em %.1f s: %s", time.perf_counter() - t0, erro)
+    else:
+        _estado["etapas"] = [[nome, round(seg, 3)] for nome, seg in etapas]
+        _estado["situacao"] = "ok"
+        _estado["pronto"] = True
+        log.info("aquecimento em %.1f s", time.perf_counter() - t0)
+    observador_dados(n_anos=n_anos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sobe o painel Fundeb com caches aquecidos.")
+    parser.add_argument("--anos-aquecimento", type=int,
+                        default=int(os.environ.get("FUNDEB_ANOS_AQUECIMENTO", 2)),
+                        help="nº de anos mais recentes da visão geral aquecidos no boot")
+    parser.add_argument("--porta-prontidao", type=int,
+                        default=int(os.environ.get("FUNDEB_PORTA_PRONTIDAO", 8599)),
+                        help="porta do endpoint GET /pronto")
+    parser.add_argument("args_streamlit", nargs=argparse.REMAINDER,
+                        help="argumentos repassados ao `streamlit run` (após --)")
+    args = parser.parse_args()
+
+    extras = args.args_streamlit[1:] if args.args_streamlit[:1] == ["--"] else args.args_streamlit
+
+    # caminhos relativos do painel (planilha, mapa, assets) partem da pasta do app
+    os.chdir(PASTA_APP)
+    sys.path.insert(0, PASTA_APP)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    servir_prontidao(args.porta_prontidao)
+    threading.Thread(
+        target=aquecer_em_segundo_plano, args=(args.anos_aquecimento,),
+        name="aquecimento", daemon=True,
+    ).start()
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", ARQUIVO_APP, *extras]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()